@@ -0,0 +1,89 @@
+"""
+Wall-clock time to fetch a symbol universe, sequential vs async fetcher
+
+Both feeds hit a local mock Alpha Vantage server that adds a fixed delay per
+request, standing in for API round-trip time.
+
+Run from the repo root:
+    python -m benchmarks.bench_async_feed --symbols 500 --delay 0.02
+"""
+import argparse
+import asyncio
+import logging
+import threading
+import time
+
+from aiohttp import web
+
+from src.data_feed_service.async_live_feed import AsyncAlphaVantageDataFeed
+from src.data_feed_service.live_feed import AlphaVantageDataFeed
+
+
+def daily_response(symbol, n_days=100):
+    series = {}
+    for i in range(n_days):
+        date = f"2025-{1 + i // 28:02d}-{1 + i % 28:02d}"
+        series[date] = {"1. open": "100.0", "2. high": "101.0", "3. low": "99.0",
+                        "4. close": f"{100 + i * 0.1:.2f}", "5. volume": "1000"}
+    return {"Meta Data": {"2. Symbol": symbol}, "Time Series (Daily)": series}
+
+
+def start_mock_server(delay):
+    """Run a mock Alpha Vantage endpoint in a background thread, returns its URL"""
+    payload = daily_response("MOCK")
+
+    async def handle(request):
+        await asyncio.sleep(delay)
+        return web.json_response(payload)
+
+    ready = threading.Event()
+    state = {}
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        app = web.Application()
+        app.router.add_get('/query', handle)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        loop.run_until_complete(site.start())
+        state['port'] = site._server.sockets[0].getsockname()[1]
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return f"http://127.0.0.1:{state['port']}/query"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alpha Vantage fetcher benchmark")
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--delay', type=float, default=0.02, help='Seconds per mock request')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--skip-sequential', action='store_true')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    url = start_mock_server(args.delay)
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+
+    if not args.skip_sequential:
+        start = time.perf_counter()
+        ticks = AlphaVantageDataFeed(symbols=symbols, api_key="bench", base_url=url).fetch_data()
+        sequential = time.perf_counter() - start
+        print(f"sequential: {sequential:7.2f}s for {len(ticks)} symbols")
+
+    # quota set high so the mock server latency, not the limiter, is measured
+    feed = AsyncAlphaVantageDataFeed(symbols=symbols, api_key="bench", base_url=url,
+                                     requests_per_minute=10 ** 6, burst=args.concurrency,
+                                     max_concurrency=args.concurrency)
+    start = time.perf_counter()
+    ticks = feed.fetch_data()
+    concurrent = time.perf_counter() - start
+    print(f"async x{args.concurrency}: {concurrent:7.2f}s for {len(ticks)} symbols")
+
+
+if __name__ == "__main__":
+    main()
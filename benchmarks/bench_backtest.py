@@ -0,0 +1,54 @@
+"""
+Ticks/minute for the in-process backtest engine
+
+Replays synthetic random-walk bars for --symbols symbols through
+BacktestEngine (merge -> SMACalculator -> SimulatedExchange) and reports
+the sustained tick rate.
+
+Run from the repo root:
+    python -m benchmarks.bench_backtest --symbols 50 --bars 20000
+"""
+import argparse
+import logging
+
+import numpy as np
+
+from src.backtest.engine import BacktestEngine
+from src.common.tick_columns import TickColumns
+
+
+def make_columns(symbols, bars, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = 1_000_000_000 + np.arange(bars, dtype=np.int64) * 86400
+    nan = np.full(bars, np.nan)
+    columns = {}
+    for i in range(symbols):
+        symbol = f"SYM{i:04d}"
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+        columns[symbol] = TickColumns(symbol, timestamps, nan, nan, nan, prices,
+                                      np.zeros(bars, dtype=np.int64))
+    return columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest engine benchmark")
+    parser.add_argument('--symbols', type=int, default=50, help='Number of symbols')
+    parser.add_argument('--bars', type=int, default=20000, help='Bars per symbol')
+    parser.add_argument('--short-window', type=int, default=20)
+    parser.add_argument('--long-window', type=int, default=100)
+    args = parser.parse_args()
+
+    logging.getLogger('simulated_exchange').setLevel(logging.CRITICAL)
+    columns = make_columns(args.symbols, args.bars)
+
+    engine = BacktestEngine(short_window=args.short_window, long_window=args.long_window,
+                            initial_cash=1e9, trade_quantity=10)
+    result = engine.run(columns)
+
+    print(f"{result.ticks:,} ticks in {result.elapsed:.2f}s: {result.ticks_per_second:,.0f} ticks/s "
+          f"({result.ticks_per_second * 60 / 1e6:.1f}M ticks/min), "
+          f"{len(result.signals)} signals, {len(result.executions)} executions")
+
+
+if __name__ == "__main__":
+    main()
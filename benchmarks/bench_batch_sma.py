@@ -0,0 +1,67 @@
+"""
+Ticks/sec of BatchSMAEngine against one SMACalculator per symbol
+
+Run from the repo root:
+    python -m benchmarks.bench_batch_sma --symbols 2000 --bars 250
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.processing_service.batch_sma import BatchSMAEngine
+from src.processing_service.sma_calculator import SMACalculator
+
+
+def make_prices(n_symbols, n_bars, seed=0):
+    # random walk per symbol, shape (bars, symbols)
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0, 1, size=(n_bars, n_symbols))
+    return 100.0 + np.cumsum(steps, axis=0)
+
+
+def bench_calculators(symbols, prices, short_window, long_window):
+    calculators = {s: SMACalculator(short_window, long_window) for s in symbols}
+    rows = prices.tolist()
+
+    start = time.perf_counter()
+    for row in rows:
+        for symbol, price in zip(symbols, row):
+            calc = calculators[symbol]
+            calc.update(price)
+            calc.detect_crossover()
+    return time.perf_counter() - start
+
+
+def bench_engine(symbols, prices, short_window, long_window):
+    engine = BatchSMAEngine(short_window, long_window, initial_capacity=len(symbols))
+    slots = engine.slots_for(symbols)
+
+    start = time.perf_counter()
+    for row in prices:
+        engine.update_slots(slots, row)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch SMA engine benchmark")
+    parser.add_argument('--symbols', type=int, default=2000)
+    parser.add_argument('--bars', type=int, default=250)
+    parser.add_argument('--short-window', type=int, default=50)
+    parser.add_argument('--long-window', type=int, default=100)
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    prices = make_prices(args.symbols, args.bars)
+    n_ticks = args.symbols * args.bars
+
+    calc_time = bench_calculators(symbols, prices, args.short_window, args.long_window)
+    engine_time = bench_engine(symbols, prices, args.short_window, args.long_window)
+
+    print(f"{n_ticks} ticks ({args.symbols} symbols x {args.bars} bars)")
+    print(f"SMACalculator:  {n_ticks / calc_time:>14,.0f} ticks/sec")
+    print(f"BatchSMAEngine: {n_ticks / engine_time:>14,.0f} ticks/sec  ({calc_time / engine_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Shared-history indicator set vs separate per-indicator windows
+
+Feeds the same ticks to one IndicatorSet of six windowed indicators and to
+the same six indicators each in a set of its own, i.e. each holding its own
+copy of the window like one SMACalculator per indicator, and reports
+ticks/s and resident bytes per symbol.
+
+Run from the repo root:
+    python -m benchmarks.bench_indicators --symbols 200 --ticks 2000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.processing_service.indicators import (SMA, Bollinger, IndicatorSet, RollingMax, RollingMin,
+                                               RollingVariance)
+
+def make_indicators():
+    return {
+        'sma20': SMA(20), 'sma50': SMA(50), 'sma100': SMA(100),
+        'bands': Bollinger(20), 'min': RollingMin(100), 'max': RollingMax(100),
+    }
+
+
+def shared_set():
+    return IndicatorSet(make_indicators())
+
+
+def separate_set():
+    # the same indicators, each in a set of its own, so each keeps its own window copy
+    return [IndicatorSet({name: indicator}) for name, indicator in make_indicators().items()]
+
+
+def run_shared(paths):
+    sets = [shared_set() for _ in paths]
+    start = time.perf_counter()
+    for indicators, path in zip(sets, paths):
+        update = indicators.update
+        for price in path:
+            update(price)
+    return time.perf_counter() - start, sets
+
+
+def run_separate(paths):
+    sets = [separate_set() for _ in paths]
+    start = time.perf_counter()
+    for calculators, path in zip(sets, paths):
+        updates = [calc.update for calc in calculators]
+        for price in path:
+            for update in updates:
+                update(price)
+    return time.perf_counter() - start, sets
+
+
+def resident_bytes(runner, paths):
+    tracemalloc.start()
+    _, sets = runner(paths)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del sets
+    return current / len(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indicator library benchmark")
+    parser.add_argument('--symbols', type=int, default=200, help='Number of symbols')
+    parser.add_argument('--ticks', type=int, default=2000, help='Ticks per symbol')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    paths = [(100 * np.exp(np.cumsum(rng.normal(0, 0.01, args.ticks)))).tolist() for _ in range(args.symbols)]
+    updates = args.symbols * args.ticks
+
+    shared_time, _ = run_shared(paths)
+    separate_time, _ = run_separate(paths)
+    shared_mem = resident_bytes(run_shared, paths)
+    separate_mem = resident_bytes(run_separate, paths)
+
+    print(f"shared history : {updates / shared_time:>11,.0f} ticks/s  {shared_mem:>9,.0f} B/symbol "
+          f"(one history for 6 indicators)")
+    print(f"separate copies: {updates / separate_time:>11,.0f} ticks/s  {separate_mem:>9,.0f} B/symbol "
+          f"(6 window copies)")
+
+
+if __name__ == "__main__":
+    main()
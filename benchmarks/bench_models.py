@@ -0,0 +1,114 @@
+"""
+Construction time and memory of the hot model types
+
+Compares the slotted models in src.common.models, with counter order ids
+and event-clock timestamps, against the previous plain dataclasses that
+drew a uuid4 and called datetime.now() per Order/Execution.
+
+Run from the repo root:
+    python -m benchmarks.bench_models --count 200000
+"""
+import argparse
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from src.common.clock import event_clock
+from src.common.models import Execution, Order, Tick
+
+
+# --- the models as they were before slots ---
+
+@dataclass
+class LegacyTick:
+    symbol: str
+    price: float
+    timestamp: int
+    open_price: Optional[float] = None
+    high_price: Optional[float] = None
+    low_price: Optional[float] = None
+    volume: Optional[int] = None
+
+@dataclass
+class LegacyOrder:
+    symbol: str
+    side: str
+    quantity: int
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    timestamp: int = field(default_factory=lambda: int(datetime.now().timestamp()))
+    order_type: str = "MARKET"
+    price: Optional[float] = None
+
+    def __post_init__(self):
+        if self.side not in ['BUY', 'SELL']:
+            raise ValueError(f"Invalid order side: {self.side}")
+        if self.quantity <= 0:
+            raise ValueError(f"Invalid order quantity: {self.quantity}")
+        if self.order_type not in ['MARKET', 'LIMIT']:
+            raise ValueError(f"Invalid order type: {self.order_type}")
+        if self.order_type == 'LIMIT' and self.price is None:
+            raise ValueError("Limit orders must specify a price")
+
+@dataclass
+class LegacyExecution:
+    order_id: str
+    symbol: str
+    side: str
+    quantity: int
+    price: float
+    timestamp: int = field(default_factory=lambda: int(datetime.now().timestamp()))
+    pnl: float = 0.0
+
+
+def make_ticks(cls, n):
+    return [cls("SYM", 100.0, 1700000000 + i, 99.5, 100.5, 99.0, 1000) for i in range(n)]
+
+def make_orders(cls, n):
+    return [cls("SYM", "BUY", 10) for _ in range(n)]
+
+def make_executions(cls, n):
+    return [cls("id", "SYM", "BUY", 10, 100.0) for _ in range(n)]
+
+
+def measure(factory, cls, n):
+    start = time.perf_counter()
+    objects = factory(cls, n)
+    elapsed = time.perf_counter() - start
+    del objects
+
+    tracemalloc.start()
+    objects = factory(cls, n)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return n / elapsed, current / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model construction benchmark")
+    parser.add_argument('--count', type=int, default=200000, help='Objects built per measurement')
+    args = parser.parse_args()
+
+    # a backtest drives the clock from tick timestamps
+    event_clock.set(1700000000)
+
+    cases = [
+        ('Tick', make_ticks, LegacyTick, Tick),
+        ('Order', make_orders, LegacyOrder, Order),
+        ('Execution', make_executions, LegacyExecution, Execution),
+    ]
+    for name, factory, legacy, current in cases:
+        old_rate, old_bytes = measure(factory, legacy, args.count)
+        new_rate, new_bytes = measure(factory, current, args.count)
+        print(f"{name:>9}: before {old_rate:>11,.0f}/s {old_bytes:>6.0f} B/obj   "
+              f"after {new_rate:>11,.0f}/s {new_bytes:>6.0f} B/obj   "
+              f"({new_rate / old_rate:.1f}x faster, {old_bytes / new_bytes:.1f}x smaller)")
+
+    event_clock.reset()
+
+
+if __name__ == "__main__":
+    main()
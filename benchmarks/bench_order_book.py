@@ -0,0 +1,101 @@
+"""
+Orders/sec for the limit order book at large book depths
+
+Measures inserts, cancels and tick-driven matching on a LimitOrderBook that
+already holds --depth resting orders, then end-to-end limit submissions and
+fills through SimulatedExchange.
+
+Run from the repo root:
+    python -m benchmarks.bench_order_book --depth 10000,100000
+"""
+import argparse
+import logging
+import random
+import time
+
+from src.common.models import Order, Portfolio
+from src.exchange_service.order_book import LimitOrderBook
+from src.exchange_service.simulated_exchange import SimulatedExchange
+
+
+def make_orders(n, rng, mid=100.0, spread=10.0):
+    orders = []
+    for _ in range(n):
+        side = 'BUY' if rng.random() < 0.5 else 'SELL'
+        # bids below mid, asks above, so the resting book does not cross
+        offset = round(rng.uniform(0.01, spread), 2)
+        price = mid - offset if side == 'BUY' else mid + offset
+        orders.append(Order(symbol="SYM", side=side, quantity=1, order_type="LIMIT", price=price))
+    return orders
+
+
+def rate(n, seconds):
+    return n / seconds if seconds > 0 else float('inf')
+
+
+def bench_book(depth, ops, rng):
+    book = LimitOrderBook("SYM")
+    for order in make_orders(depth, rng):
+        book.add(order)
+
+    new_orders = make_orders(ops, rng)
+    start = time.perf_counter()
+    for order in new_orders:
+        book.add(order)
+    insert = rate(ops, time.perf_counter() - start)
+
+    victims = [o.id for o in rng.sample(new_orders, ops // 2)]
+    start = time.perf_counter()
+    for order_id in victims:
+        book.cancel(order_id)
+    cancel = rate(len(victims), time.perf_counter() - start)
+
+    # ticks drifting just inside the book each fill a few orders
+    filled = 0
+    start = time.perf_counter()
+    for i in range(ops):
+        price = 100.0 + (5.0 if i % 2 else -5.0) * rng.random()
+        filled += len(book.match(price))
+    match = rate(ops, time.perf_counter() - start)
+
+    return insert, cancel, match, filled
+
+
+def bench_exchange(depth, rng):
+    exchange = SimulatedExchange(portfolio=Portfolio(cash=1e12))
+    exchange.update_market_price("SYM", 100.0)
+    exchange.portfolio.holdings["SYM"] = 10 ** 9
+    orders = make_orders(depth, rng)
+
+    start = time.perf_counter()
+    for order in orders:
+        exchange.submit_order(order)
+    submit = rate(depth, time.perf_counter() - start)
+
+    # sweep the price down and back up through the whole book
+    start = time.perf_counter()
+    fills = len(exchange.update_market_price("SYM", 89.0)) + len(exchange.update_market_price("SYM", 111.0))
+    fill = rate(fills, time.perf_counter() - start)
+    return submit, fill
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Limit order book benchmark")
+    parser.add_argument('--depth', type=str, default='10000,100000',
+        help='Comma-separated resting book depths')
+    parser.add_argument('--ops', type=int, default=20000, help='Operations per measurement')
+    args = parser.parse_args()
+
+    logging.getLogger('simulated_exchange').setLevel(logging.CRITICAL)
+    rng = random.Random(0)
+
+    for depth in [int(d) for d in args.depth.split(',')]:
+        insert, cancel, match, filled = bench_book(depth, args.ops, rng)
+        submit, fill = bench_exchange(depth, rng)
+        print(f"depth {depth:>7}: insert {insert:>11,.0f}/s  cancel {cancel:>11,.0f}/s  "
+              f"match {match:>11,.0f} ticks/s ({filled} fills)")
+        print(f"{'':>14} exchange submit {submit:>11,.0f} orders/s  fill {fill:>11,.0f} orders/s")
+
+
+if __name__ == "__main__":
+    main()
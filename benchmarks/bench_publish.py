@@ -0,0 +1,55 @@
+"""
+Tick publishing throughput, one PUBLISH per tick against pipelined batches
+
+Runs against benchmarks.loopback_redis, a local RESP stand-in, so no Redis
+server is needed. --latency adds a per-reply delay to emulate a remote server.
+
+Run from the repo root:
+    python -m benchmarks.bench_publish --ticks 20000 --batch-sizes 1,100,500
+"""
+import argparse
+import logging
+
+import redis
+
+from src.common.models import Tick
+from src.data_feed_service.main import publish_ticks_to_redis
+from .loopback_redis import LoopbackRedis
+
+
+def make_ticks(n_symbols, n_bars):
+    ticks = {}
+    for s in range(n_symbols):
+        symbol = f"SYM{s}"
+        ticks[symbol] = [Tick(symbol=symbol, price=100.0 + i * 0.01, timestamp=946684800 + i * 86400,
+                              open_price=100.0, high_price=101.0, low_price=99.0, volume=1000)
+                         for i in range(n_bars)]
+    return ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Redis tick publishing benchmark")
+    parser.add_argument('--ticks', type=int, default=20000)
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--batch-sizes', type=str, default='1,10,100,500,2000')
+    parser.add_argument('--format', choices=['json', 'binary'], default='json')
+    parser.add_argument('--latency', type=float, default=0.0,
+        help='Seconds of emulated network latency per reply')
+    args = parser.parse_args()
+
+    logging.getLogger('data_feed_service').setLevel(logging.WARNING)
+    ticks = make_ticks(args.symbols, args.ticks // args.symbols)
+
+    with LoopbackRedis(latency=args.latency) as server:
+        client = redis.Redis(host=server.host, port=server.port)
+        baseline = None
+        for batch_size in [int(b) for b in args.batch_sizes.split(',')]:
+            stats = publish_ticks_to_redis(ticks, redis_client=client, batch_size=batch_size,
+                                           message_format=args.format)
+            baseline = baseline or stats.ticks_per_second
+            print(f"batch_size={batch_size:>5}: {stats.ticks_per_second:>12,.0f} ticks/s "
+                  f"in {stats.batches:>6} round-trips  ({stats.ticks_per_second / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
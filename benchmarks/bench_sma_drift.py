@@ -0,0 +1,71 @@
+"""
+Cost and accuracy of the SMACalculator running-sum modes
+
+Streams a multi-million-tick random walk (with occasional outsized prints,
+which are what leave rounding error behind in a running sum) through the
+plain, compensated and periodically resummed calculators, and reports
+updates/s plus the drift of each mode's sums from an exact math.fsum of
+the window, sampled along the way.
+
+Run from the repo root:
+    python -m benchmarks.bench_sma_drift --ticks 5000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.processing_service.sma_calculator import SMACalculator
+
+
+def make_prices(n, seed=0):
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    spikes = rng.random(n) < 1e-3
+    prices[spikes] *= 1e6
+    return prices.tolist()
+
+
+def run(prices, short_window, long_window, samples, **options):
+    calc = SMACalculator(short_window, long_window, **options)
+    every = max(1, len(prices) // samples)
+    worst = 0.0
+    elapsed = 0.0
+
+    for start in range(0, len(prices), every):
+        chunk = prices[start:start + every]
+        begin = time.perf_counter()
+        for price in chunk:
+            calc.update(price)
+        elapsed += time.perf_counter() - begin
+        worst = max(worst, *calc.drift())
+
+    return len(prices) / elapsed, worst, max(calc.drift())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SMACalculator drift benchmark")
+    parser.add_argument('--ticks', type=int, default=5000000, help='Ticks streamed per mode')
+    parser.add_argument('--short-window', type=int, default=50)
+    parser.add_argument('--long-window', type=int, default=200)
+    parser.add_argument('--resum-interval', type=int, default=10000)
+    parser.add_argument('--samples', type=int, default=200, help='Drift measurements along the stream')
+    args = parser.parse_args()
+
+    prices = make_prices(args.ticks)
+    modes = [
+        ('plain', {}),
+        ('compensated', {'compensated': True}),
+        (f'resum/{args.resum_interval}', {'resum_interval': args.resum_interval}),
+    ]
+
+    baseline = None
+    for name, options in modes:
+        rate, worst, final = run(prices, args.short_window, args.long_window, args.samples, **options)
+        baseline = baseline or rate
+        print(f"{name:>14}: {rate:>11,.0f} ticks/s ({baseline / rate:.2f}x time)  "
+              f"worst drift {worst:.3e}  final drift {final:.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Synthetic OHLCV generators shared by the benchmarks
+
+Bars follow a geometric random walk with overnight gaps, intraday ranges
+that contain the open and close, and lognormal volume, so parsers and
+indicators see realistic magnitudes. Everything is seeded for repeatable runs.
+"""
+import os
+import csv
+from datetime import datetime, timedelta
+from typing import Dict
+
+import numpy as np
+
+from src.common.models import Tick
+
+START_DATE = datetime(2000, 1, 3)
+
+
+def make_bars(symbols: int, bars: int, seed: int = 0) -> Dict[str, Dict[str, np.ndarray]]:
+    """symbol -> {'timestamp', 'open', 'high', 'low', 'close', 'volume'} arrays, oldest first"""
+    rng = np.random.default_rng(seed)
+    # calendar days rather than multiples of 86400s so dates survive DST changes
+    timestamps = np.array([int((START_DATE + timedelta(days=i)).timestamp()) for i in range(bars)], dtype=np.int64)
+    result = {}
+    for i in range(symbols):
+        start = rng.uniform(10, 500)
+        close = start * np.exp(np.cumsum(rng.normal(0.0002, 0.018, bars)))
+        previous = np.concatenate(([start], close[:-1]))
+        open_ = previous * np.exp(rng.normal(0, 0.004, bars))
+        body_high = np.maximum(open_, close)
+        body_low = np.minimum(open_, close)
+        high = body_high * (1 + np.abs(rng.normal(0, 0.008, bars)))
+        low = body_low * (1 - np.abs(rng.normal(0, 0.008, bars)))
+        volume = rng.lognormal(14, 0.6, bars).astype(np.int64)
+        result[f"SYM{i:04d}"] = {
+            'timestamp': timestamps,
+            'open': np.round(open_, 2),
+            'high': np.round(high, 2),
+            'low': np.round(low, 2),
+            'close': np.round(close, 2),
+            'volume': volume,
+        }
+    return result
+
+
+def _dates(timestamps):
+    return [datetime.fromtimestamp(int(t)).strftime('%Y-%m-%d') for t in timestamps]
+
+
+def write_csvs(directory: str, bars: Dict[str, Dict[str, np.ndarray]]) -> Dict[str, str]:
+    """Write one CSV per symbol, newest first like Alpha Vantage exports; returns symbol -> path"""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for symbol, columns in bars.items():
+        path = paths[symbol] = os.path.join(directory, f"{symbol}.csv")
+        rows = zip(_dates(columns['timestamp']), columns['open'], columns['high'],
+                   columns['low'], columns['close'], columns['volume'])
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['date', 'open', 'high', 'low', 'close', 'volume'])
+            writer.writerows(reversed(list(rows)))
+    return paths
+
+
+def alpha_vantage_payload(columns: Dict[str, np.ndarray]) -> dict:
+    """TIME_SERIES_DAILY response body for one symbol, newest first"""
+    series = {}
+    for date, o, h, l, c, v in reversed(list(zip(_dates(columns['timestamp']), columns['open'], columns['high'],
+                                                  columns['low'], columns['close'], columns['volume']))):
+        series[date] = {'1. open': f"{o:.4f}", '2. high': f"{h:.4f}", '3. low': f"{l:.4f}",
+                        '4. close': f"{c:.4f}", '5. volume': str(v)}
+    return {'Meta Data': {}, 'Time Series (Daily)': series}
+
+
+def make_ticks(bars: Dict[str, Dict[str, np.ndarray]]) -> Dict[str, list]:
+    """symbol -> list of Tick, oldest first"""
+    ticks = {}
+    for symbol, columns in bars.items():
+        ticks[symbol] = [
+            Tick(symbol=symbol, price=float(c), timestamp=int(t), open_price=float(o),
+                 high_price=float(h), low_price=float(l), volume=int(v))
+            for t, o, h, l, c, v in zip(columns['timestamp'], columns['open'], columns['high'],
+                                        columns['low'], columns['close'], columns['volume'])
+        ]
+    return ticks
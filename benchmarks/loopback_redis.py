@@ -0,0 +1,110 @@
+"""
+Minimal RESP server on loopback, a stand-in for Redis in benchmarks
+
+Answers every command without storing anything (PUBLISH returns 0
+subscribers), so client-side costs and round-trips are all that is measured.
+An optional per-read delay emulates network latency to a real server.
+"""
+import socket
+import threading
+import time
+
+
+def _parse_command(buf, pos):
+    # returns (args, new_pos) or (None, pos) if the buffer holds a partial command
+    if pos >= len(buf):
+        return None, pos
+    if buf[pos:pos + 1] != b'*':
+        # inline command, one per line
+        end = buf.find(b'\r\n', pos)
+        if end < 0:
+            return None, pos
+        return buf[pos:end].split(), end + 2
+
+    end = buf.find(b'\r\n', pos)
+    if end < 0:
+        return None, pos
+    count = int(buf[pos + 1:end])
+    pos = end + 2
+    args = []
+    for _ in range(count):
+        end = buf.find(b'\r\n', pos)
+        if end < 0:
+            return None, pos
+        length = int(buf[pos + 1:end])
+        start = end + 2
+        if len(buf) < start + length + 2:
+            return None, pos
+        args.append(buf[start:start + length])
+        pos = start + length + 2
+    return args, pos
+
+
+def _reply(args):
+    name = args[0].upper() if args else b''
+    if name in (b'PUBLISH', b'XACK', b'DEL', b'EXISTS'):
+        return b':0\r\n'
+    if name == b'PING':
+        return b'+PONG\r\n'
+    if name == b'XADD':
+        return b'$3\r\n0-1\r\n'
+    if name == b'GET':
+        return b'$-1\r\n'
+    return b'+OK\r\n'
+
+
+class LoopbackRedis:
+    """Threaded RESP server, use as a context manager to get (host, port)"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.commands = 0
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(('127.0.0.1', 0))
+        self._sock.listen()
+        self.host, self.port = self._sock.getsockname()
+        self._running = False
+
+    def __enter__(self):
+        self._running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._running = False
+        self._sock.close()
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        buf = b''
+        with conn:
+            while self._running:
+                try:
+                    data = conn.recv(1 << 16)
+                except OSError:
+                    return
+                if not data:
+                    return
+                buf += data
+                replies = []
+                pos = 0
+                while True:
+                    args, pos = _parse_command(buf, pos)
+                    if args is None:
+                        break
+                    replies.append(_reply(args))
+                buf = buf[pos:]
+                if replies:
+                    self.commands += len(replies)
+                    if self.latency:
+                        time.sleep(self.latency)
+                    conn.sendall(b''.join(replies))
@@ -0,0 +1,318 @@
+"""
+Reproducible benchmark suite for the feed, indicator and exchange hot paths
+
+Every case runs on the same seeded synthetic OHLCV data (--symbols x --bars,
+see benchmarks.data), is warmed up once, then timed --repeat times; the
+median run is reported as ns per operation. Publishing runs against
+benchmarks.loopback_redis, so no Redis server is needed.
+
+Results can be saved as JSON and compared with an earlier run: cases slower
+by more than --threshold percent are flagged and the exit status is 1, so
+the suite can gate a CI job.
+
+Run from the repo root:
+    python -m benchmarks.suite --output bench/baseline.json
+    python -m benchmarks.suite --compare bench/baseline.json --threshold 10
+    python -m benchmarks.suite --list
+"""
+import os
+import gc
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from typing import Callable, Dict, NamedTuple, Optional
+
+import redis
+
+from src.common.models import Order, Portfolio
+from src.data_feed_service.csv_feed import CSVDataFeed
+from src.data_feed_service.live_feed import AlphaVantageDataFeed
+from src.data_feed_service.main import publish_ticks_to_redis
+from src.exchange_service.simulated_exchange import SimulatedExchange
+from src.processing_service.sma_calculator import SMACalculator
+from .data import alpha_vantage_payload, make_bars, make_ticks, write_csvs
+from .loopback_redis import LoopbackRedis
+
+RESULTS_VERSION = 1
+QUIET_LOGGERS = ('csv_feed', 'live_feed', 'data_feed_service', 'simulated_exchange')
+
+
+class Case(NamedTuple):
+    run: Callable[[], object]
+    ops: int  # operations per run, e.g. ticks parsed or orders executed
+    setup: Optional[Callable[[], None]] = None  # untimed, before every run
+
+
+class Workload:
+    """Shared synthetic data and fixtures, built once per suite run"""
+
+    def __init__(self, symbols: int, bars: int, seed: int):
+        self.bars = make_bars(symbols, bars, seed)
+        self.ticks = make_ticks(self.bars)
+        self.tick_count = symbols * bars
+        self.tmp = tempfile.TemporaryDirectory(prefix='mercury-bench-')
+        self.server = LoopbackRedis()
+
+    def __enter__(self):
+        self.server.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.__exit__(*exc)
+        self.tmp.cleanup()
+        return False
+
+
+CASES: Dict[str, Callable[[Workload], Case]] = {}
+
+
+def case(name: str):
+    def register(build):
+        CASES[name] = build
+        return build
+    return register
+
+
+@case('feed.read_csv_data')
+def bench_read_csv_data(work: Workload) -> Case:
+    paths = write_csvs(os.path.join(work.tmp.name, 'csv'), work.bars)
+    feed = CSVDataFeed(csv_files=paths)
+
+    def run():
+        for symbol, path in paths.items():
+            feed.read_csv_data(symbol, path)
+    return Case(run, work.tick_count)
+
+
+@case('feed.process_daily_data')
+def bench_process_daily_data(work: Workload) -> Case:
+    payloads = {symbol: alpha_vantage_payload(columns) for symbol, columns in work.bars.items()}
+    feed = AlphaVantageDataFeed(symbols=list(payloads), api_key='bench')
+
+    def run():
+        for symbol, payload in payloads.items():
+            feed.process_daily_data(payload, symbol)
+    return Case(run, work.tick_count)
+
+
+@case('feed.publish_ticks_to_redis')
+def bench_publish_ticks(work: Workload) -> Case:
+    client = redis.Redis(host=work.server.host, port=work.server.port)
+
+    def run():
+        publish_ticks_to_redis(work.ticks, redis_client=client, batch_size=500, message_format='json')
+    return Case(run, work.tick_count)
+
+
+@case('sma.update')
+def bench_sma_update(work: Workload) -> Case:
+    closes = [columns['close'].tolist() for columns in work.bars.values()]
+
+    def run():
+        for prices in closes:
+            calc = SMACalculator(short_window=20, long_window=100)
+            update = calc.update
+            for price in prices:
+                update(price)
+    return Case(run, work.tick_count)
+
+
+@case('exchange.execute_order')
+def bench_execute_order(work: Workload) -> Case:
+    last = {symbol: float(columns['close'][-1]) for symbol, columns in work.bars.items()}
+    # buy then sell each symbol in turn, so every order fills
+    orders = []
+    for i in range(work.tick_count // 2):
+        symbol = list(last)[i % len(last)]
+        orders.append(Order(symbol=symbol, side='BUY', quantity=10, id=f"b{i}", timestamp=0))
+        orders.append(Order(symbol=symbol, side='SELL', quantity=10, id=f"s{i}", timestamp=0))
+    state = {}
+
+    def setup():
+        exchange = SimulatedExchange(portfolio=Portfolio(cash=1e12))
+        for symbol, price in last.items():
+            exchange.update_market_price(symbol, price)
+        state['exchange'] = exchange
+
+    def run():
+        execute = state['exchange'].execute_order
+        for order in orders:
+            execute(order)
+    return Case(run, len(orders), setup)
+
+
+@case('portfolio.get_total_value')
+def bench_get_total_value(work: Workload) -> Case:
+    prices = {symbol: float(columns['close'][-1]) for symbol, columns in work.bars.items()}
+    portfolio = Portfolio(cash=1e6, holdings={symbol: 100 for symbol in prices})
+    calls = max(1, work.tick_count // len(prices))
+
+    def run():
+        for _ in range(calls):
+            portfolio.get_total_value(prices)
+    return Case(run, calls)
+
+
+@case('portfolio.mark_price')
+def bench_mark_price(work: Workload) -> Case:
+    # the per-tick path: mark one symbol, read the incrementally kept total
+    portfolio = Portfolio(cash=1e6, holdings={symbol: 100 for symbol in work.bars})
+    marks = [(tick.symbol, tick.price) for ticks in work.ticks.values() for tick in ticks]
+    for symbol, ticks in work.ticks.items():
+        portfolio.mark_price(symbol, ticks[0].price)
+
+    def run():
+        mark = portfolio.mark_price
+        value = portfolio.get_total_value
+        for symbol, price in marks:
+            mark(symbol, price)
+            value()
+    return Case(run, len(marks))
+
+
+def measure(built: Case, repeat: int) -> dict:
+    runs = []
+    for i in range(repeat + 1):
+        if built.setup is not None:
+            built.setup()
+        gc.collect()
+        start = time.perf_counter()
+        built.run()
+        elapsed = time.perf_counter() - start
+        if i:  # the first run is a warm-up
+            runs.append(elapsed)
+
+    median = statistics.median(runs)
+    return {
+        'ops': built.ops,
+        'runs_s': runs,
+        'median_s': median,
+        'min_s': min(runs),
+        'ns_per_op': median / built.ops * 1e9,
+        'ops_per_second': built.ops / median if median > 0 else 0.0,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(names, symbols: int, bars: int, seed: int, repeat: int) -> dict:
+    results = {}
+    with Workload(symbols, bars, seed) as work:
+        for name in names:
+            result = results[name] = measure(CASES[name](work), repeat)
+            print(f"{name:<30} {result['ns_per_op']:>10,.0f} ns/op  {result['ops_per_second']:>12,.0f} ops/s  "
+                  f"(median of {repeat}, spread {(max(result['runs_s']) / result['min_s'] - 1) * 100:.0f}%)")
+
+    return {
+        'version': RESULTS_VERSION,
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'symbols': symbols,
+            'bars': bars,
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Print each case's change against baseline
+
+    Returns:
+        Names of cases whose ns/op grew by more than threshold percent
+    """
+    sizes = ('symbols', 'bars', 'seed')
+    if any(current['meta'].get(k) != baseline['meta'].get(k) for k in sizes):
+        used = ', '.join(f"{k}={baseline['meta'].get(k)}" for k in sizes)
+        print(f"warning: baseline was run with different data ({used})")
+
+    print(f"\nagainst {baseline['meta'].get('commit') or 'baseline'} ({baseline['meta'].get('created')}), "
+          f"threshold {threshold:g}%:")
+    regressions = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f"  {name:<30} new")
+            continue
+        change = (result['ns_per_op'] / before['ns_per_op'] - 1) * 100
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        elif change < -threshold:
+            flag = '  improved'
+        print(f"  {name:<30} {before['ns_per_op']:>10,.0f} -> {result['ns_per_op']:>10,.0f} ns/op  "
+              f"{change:+6.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mercury benchmark suite")
+    parser.add_argument('--symbols', type=int, default=20, help='Synthetic symbols')
+    parser.add_argument('--bars', type=int, default=2500, help='Daily bars per symbol')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case, the median is reported')
+    parser.add_argument('--only', type=str, default=None,
+        help='Comma-separated case names or prefixes to run (e.g. feed,sma.update)')
+    parser.add_argument('--output', type=str, default=None, help='Write results to this JSON file')
+    parser.add_argument('--compare', type=str, default=None, help='Baseline results JSON to compare with')
+    parser.add_argument('--threshold', type=float, default=10.0,
+        help='Percent slowdown in ns/op flagged as a regression')
+    parser.add_argument('--list', action='store_true', help='List the cases and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        print('\n'.join(CASES))
+        return 0
+
+    names = list(CASES)
+    if args.only:
+        wanted = [w.strip() for w in args.only.split(',')]
+        names = [n for n in names if any(n == w or n.startswith(w + '.') for w in wanted)]
+        if not names:
+            parser.error(f"No cases match {args.only}, see --list")
+
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.CRITICAL)
+
+    current = run_suite(names, args.symbols, args.bars, args.seed, max(1, args.repeat))
+
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) past {args.threshold:g}%: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import os
+import logging
+import argparse
+from dotenv import load_dotenv
+
+from .sweep import run_sweep, window_grid
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('backtest')
+
+load_dotenv()
+
+def parse_windows(value):
+    return [int(w) for w in value.split(',') if w.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description="SMA Crossover Backtester")
+    parser.add_argument('--symbols', type=str, default='IBM,AAPL,MSFT',
+        help='Comma-separated list of stock symbols to backtest')
+    parser.add_argument('--short-windows', type=parse_windows, default=[10, 20, 50],
+        help='Comma-separated short SMA windows to sweep')
+    parser.add_argument('--long-windows', type=parse_windows, default=[50, 100, 200],
+        help='Comma-separated long SMA windows to sweep')
+    parser.add_argument('--cash', type=float, default=10000.0,
+        help='Initial portfolio cash')
+    parser.add_argument('--quantity', type=int, default=10,
+        help='Shares bought on each golden cross')
+    parser.add_argument('--workers', type=int, default=None,
+        help='Worker processes for the sweep (default: all cores)')
+    parser.add_argument('--top', type=int, default=10,
+        help='Number of ranked results to print')
+    args = parser.parse_args()
+
+    symbols = [s.strip() for s in args.symbols.split(',')]
+    csv_dir = os.getenv('CSV_DATA_DIR', 'data')
+    csv_files = {symbol: f"{csv_dir}/{symbol}.csv" for symbol in symbols}
+
+    grid = window_grid(args.short_windows, args.long_windows)
+    logger.info(f"Sweeping {len(grid)} window pairs over {len(symbols)} symbols")
+    results = run_sweep(csv_files, grid, initial_cash=args.cash,
+                        trade_quantity=args.quantity, workers=args.workers)
+
+    print(f"{'short':>6} {'long':>6} {'final value':>14} {'trades':>7}")
+    for result in results[:args.top]:
+        print(f"{result.short_window:>6} {result.long_window:>6} "
+              f"{result.final_value:>14.2f} {result.trade_count:>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+from typing import Dict, Optional
+
+from src.common.models import Order
+
+
+def order_for_signal(signal: str, symbol: str, holdings: Dict[str, int],
+                     quantity: int, timestamp: int) -> Optional[Order]:
+    """
+    Long-only SMA crossover strategy shared by the backtesters
+
+    A golden cross opens a position of `quantity` shares when flat, a death
+    cross closes the whole position. Anything else produces no order.
+
+    Args:
+        signal: 'BUY', 'SELL' or '' as returned by SMACalculator.detect_crossover
+        symbol: Stock symbol the signal is for
+        holdings: Current portfolio holdings (symbol -> quantity)
+        quantity: Shares to buy on a golden cross
+        timestamp: Timestamp of the tick that produced the signal
+
+    Returns:
+        Order to send to the exchange, or None
+    """
+    held = holdings.get(symbol, 0)
+
+    if signal == 'BUY' and held == 0:
+        return Order(symbol=symbol, side='BUY', quantity=quantity, timestamp=timestamp)
+
+    if signal == 'SELL' and held > 0:
+        return Order(symbol=symbol, side='SELL', quantity=held, timestamp=timestamp)
+
+    return None
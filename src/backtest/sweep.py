@@ -0,0 +1,202 @@
+import os
+import logging
+from dataclasses import dataclass
+from multiprocessing import Pool, shared_memory, util
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.common.clock import event_clock
+from src.common.models import Portfolio
+from src.data_feed_service.csv_feed import CSVDataFeed
+from src.exchange_service.simulated_exchange import SimulatedExchange
+from src.processing_service.batch_sma import SIGNAL_NAMES
+from src.processing_service.sma_series import crossover_series, sma_series
+from .strategy import order_for_signal
+
+logger = logging.getLogger('parameter_sweep')
+
+# layout entry: (symbol, offset, length) into the shared timestamp/price arrays
+Layout = List[Tuple[str, int, int]]
+
+
+@dataclass
+class SweepResult:
+    """Outcome of one (short_window, long_window) combination"""
+    short_window: int
+    long_window: int
+    final_value: float
+    trade_count: int
+
+
+class SharedPriceSeries:
+    """
+    Per-symbol timestamp and close-price arrays packed into one shared memory block
+
+    The parent creates the block once; workers attach by name and get zero-copy
+    NumPy views, so the series are never pickled to each worker.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, layout: Layout, owner: bool):
+        self.shm = shm
+        self.layout = layout
+        self.owner = owner
+
+        total = sum(length for _, _, length in layout)
+        self.timestamps = np.ndarray((total,), dtype=np.int64, buffer=shm.buf)
+        self.prices = np.ndarray((total,), dtype=np.float64, buffer=shm.buf, offset=total * 8)
+
+    @classmethod
+    def create(cls, series: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> 'SharedPriceSeries':
+        layout: Layout = []
+        offset = 0
+        for symbol, (timestamps, _) in series.items():
+            layout.append((symbol, offset, len(timestamps)))
+            offset += len(timestamps)
+
+        # 8 bytes of timestamp + 8 bytes of price per bar (SharedMemory refuses size 0)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, offset * 16))
+        shared = cls(shm, layout, owner=True)
+        for (symbol, start, length), (timestamps, prices) in zip(layout, series.values()):
+            shared.timestamps[start:start + length] = timestamps
+            shared.prices[start:start + length] = prices
+        return shared
+
+    @classmethod
+    def attach(cls, name: str, layout: Layout) -> 'SharedPriceSeries':
+        return cls(shared_memory.SharedMemory(name=name), layout, owner=False)
+
+    def items(self):
+        for symbol, start, length in self.layout:
+            yield symbol, self.timestamps[start:start + length], self.prices[start:start + length]
+
+    def close(self) -> None:
+        # drop the views before closing, SharedMemory refuses to close with exported buffers
+        del self.timestamps, self.prices
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def window_grid(short_windows: Iterable[int], long_windows: Iterable[int]) -> List[Tuple[int, int]]:
+    """All (short, long) pairs where the short window is actually shorter"""
+    return [(s, l) for s in short_windows for l in long_windows if s < l]
+
+
+def load_price_series(csv_files: Dict[str, str]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Load each symbol with CSVDataFeed and return symbol -> (timestamps, close prices)"""
+    feed = CSVDataFeed(csv_files=csv_files, columnar=True)
+    return {symbol: (columns.timestamps, columns.prices) for symbol, columns in feed.fetch_data().items()}
+
+
+def evaluate_windows(series: SharedPriceSeries, short_window: int, long_window: int,
+                     initial_cash: float, trade_quantity: int) -> SweepResult:
+    """
+    Replay one window pair through SimulatedExchange/Portfolio
+
+    Signals for every symbol are computed with the whole-series SMA functions,
+    then merged in timestamp order so all symbols trade against one portfolio.
+    """
+    events = []
+    last_prices = {}
+    for rank, (symbol, timestamps, prices) in enumerate(series.items()):
+        if len(prices) == 0:
+            continue
+        last_prices[symbol] = float(prices[-1])
+
+        signals = crossover_series(*sma_series(prices, short_window, long_window))
+        for i in np.flatnonzero(signals):
+            events.append((int(timestamps[i]), rank, symbol, float(prices[i]), SIGNAL_NAMES[int(signals[i])]))
+
+    events.sort()
+
+    portfolio = Portfolio(cash=initial_cash)
+    exchange = SimulatedExchange(portfolio=portfolio)
+    trade_count = 0
+
+    with event_clock.replay():
+        for timestamp, _, symbol, price, signal in events:
+            event_clock.advance(timestamp)
+            exchange.update_market_price(symbol, price)
+            order = order_for_signal(signal, symbol, portfolio.holdings, trade_quantity, timestamp)
+            if order is not None and exchange.execute_order(order) is not None:
+                trade_count += 1
+
+    return SweepResult(
+        short_window=short_window,
+        long_window=long_window,
+        final_value=portfolio.get_total_value(last_prices),
+        trade_count=trade_count
+    )
+
+
+# per-worker state, set once by the pool initializer
+_worker_series: Optional[SharedPriceSeries] = None
+_worker_params: Tuple[float, int] = (0.0, 0)
+
+
+def _init_worker(shm_name: str, layout: Layout, initial_cash: float, trade_quantity: int) -> None:
+    global _worker_series, _worker_params
+    _worker_series = SharedPriceSeries.attach(shm_name, layout)
+    _worker_params = (initial_cash, trade_quantity)
+    # pool workers leave through os._exit, which skips atexit but runs multiprocessing finalizers
+    util.Finalize(None, _close_worker, exitpriority=10)
+
+    # per-fill logging from thousands of replays would dominate the run time
+    logging.getLogger('simulated_exchange').setLevel(logging.CRITICAL)
+
+
+def _close_worker() -> None:
+    global _worker_series
+    if _worker_series is not None:
+        _worker_series.close()
+        _worker_series = None
+
+
+def _evaluate_in_worker(pair: Tuple[int, int]) -> SweepResult:
+    assert _worker_series is not None, "worker was not initialized"
+    return evaluate_windows(_worker_series, pair[0], pair[1], *_worker_params)
+
+
+def rank_results(results: Iterable[SweepResult]) -> List[SweepResult]:
+    """Best final value first, fewer trades breaking ties"""
+    return sorted(results, key=lambda r: (-r.final_value, r.trade_count, r.short_window, r.long_window))
+
+
+def run_sweep(csv_files: Dict[str, str], window_pairs: Sequence[Tuple[int, int]],
+              initial_cash: float = 10000.0, trade_quantity: int = 10,
+              workers: Optional[int] = None) -> List[SweepResult]:
+    """
+    Evaluate every window pair on the given symbols across a process pool
+
+    Args:
+        csv_files: Dict mapping symbol to CSV file path, as for CSVDataFeed
+        window_pairs: (short_window, long_window) combinations to evaluate
+        initial_cash: Starting cash of each simulated portfolio
+        trade_quantity: Shares bought on each golden cross
+        workers: Number of worker processes, defaults to os.cpu_count()
+
+    Returns:
+        List of SweepResult ranked by final portfolio value
+    """
+    workers = workers or os.cpu_count() or 1
+    shared = SharedPriceSeries.create(load_price_series(csv_files))
+
+    try:
+        if workers == 1 or len(window_pairs) <= 1:
+            results = [evaluate_windows(shared, s, l, initial_cash, trade_quantity) for s, l in window_pairs]
+        else:
+            # a few chunks per worker keeps them busy without per-task IPC overhead
+            chunksize = max(1, len(window_pairs) // (workers * 4))
+            initargs = (shared.shm.name, shared.layout, initial_cash, trade_quantity)
+            with Pool(processes=workers, initializer=_init_worker, initargs=initargs) as pool:
+                results = list(pool.imap_unordered(_evaluate_in_worker, window_pairs, chunksize=chunksize))
+                # let the workers exit on their own so they close their shared memory handles;
+                # leaving the with block alone would terminate them
+                pool.close()
+                pool.join()
+    finally:
+        shared.close()
+
+    logger.info(f"Evaluated {len(results)} window pairs on {len(shared.layout)} symbols with {workers} workers")
+    return rank_results(results)
@@ -0,0 +1,57 @@
+"""
+Event clock used for model timestamps
+
+Orders and executions are stamped with the time of the event being
+processed rather than a wall-clock lookup. Services and backtests advance
+the clock from tick timestamps; until it has been advanced it falls back to
+wall-clock seconds, so live use without a driver behaves as before.
+"""
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class EventClock:
+    """Latest event time in epoch seconds"""
+
+    def __init__(self):
+        self._now: Optional[int] = None
+
+    def advance(self, timestamp: int) -> None:
+        """Move the clock forward to timestamp, earlier timestamps are ignored"""
+        if self._now is None or timestamp > self._now:
+            self._now = timestamp
+
+    def set(self, timestamp: int) -> None:
+        """Set the clock to timestamp, even if it is earlier than the current time"""
+        self._now = timestamp
+
+    def reset(self) -> None:
+        """Go back to wall-clock time until the clock is advanced again"""
+        self._now = None
+
+    @contextmanager
+    def replay(self) -> Iterator['EventClock']:
+        """Run a block from an undriven clock, then put back whatever time it had before"""
+        previous = self._now
+        self._now = None
+        try:
+            yield self
+        finally:
+            self._now = previous
+
+    @property
+    def driven(self) -> bool:
+        return self._now is not None
+
+    def now(self) -> int:
+        now = self._now
+        return int(time.time()) if now is None else now
+
+
+# process-wide clock read by the model defaults
+event_clock = EventClock()
+
+
+def now() -> int:
+    return event_clock.now()
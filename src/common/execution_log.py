@@ -0,0 +1,226 @@
+import os
+import uuid
+import weakref
+import logging
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+from .models import Execution
+
+logger = logging.getLogger('execution_log')
+
+SIDE_CODES = {'BUY': 1, 'SELL': -1}
+SIDE_NAMES = {1: 'BUY', -1: 'SELL'}
+
+
+def get_retention() -> Optional[int]:
+    """Executions a portfolio keeps in memory, from EXECUTION_RETENTION (unset or 0 for no limit)"""
+    retention = int(os.getenv('EXECUTION_RETENTION', 0))
+    return retention if retention > 0 else None
+
+
+def get_spill_dir() -> Optional[str]:
+    return os.getenv('EXECUTION_SPILL_DIR') or None
+
+
+def _remove_segments(paths: List[str]) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"Could not remove execution segment {path}: {str(e)}")
+    paths.clear()
+
+
+class ExecutionLog:
+    """
+    Columnar, append-only record of executions
+
+    Each Execution field lives in its own typed array and symbols are interned,
+    so a fill costs a few dozen bytes instead of a dataclass instance. It keeps
+    the list API the portfolio code uses (append, len, iteration, indexing),
+    building Execution objects on access.
+
+    With a retention limit, the oldest fills beyond it are moved out of memory
+    in segments: written to spill_dir when one is given, otherwise discarded.
+    Spilled segments are deleted by close(), or else when the log is garbage
+    collected or the interpreter exits.
+    """
+
+    def __init__(self, executions: Optional[Iterable[Execution]] = None,
+                 retention: Optional[int] = None, spill_dir: Optional[str] = None,
+                 segment_size: Optional[int] = None):
+        """
+        Initialize the log
+
+        Args:
+            executions: Executions to start with
+            retention: Maximum executions kept in memory, None for no limit
+            spill_dir: Directory for spilled segments, None to drop old fills instead
+            segment_size: Executions moved out of memory at a time (defaults to retention)
+        """
+        if retention is not None and retention < 1:
+            raise ValueError("Retention must be at least 1 execution")
+
+        self.retention = retention
+        self.spill_dir = spill_dir
+        self.segment_size = segment_size or retention
+
+        self._symbols: List[str] = []
+        self._symbol_codes: Dict[str, int] = {}
+
+        self._order_ids: List[str] = []
+        self._symbol_col = array('l')
+        self._side_col = array('b')
+        self._quantity_col = array('q')
+        self._price_col = array('d')
+        self._timestamp_col = array('q')
+        self._pnl_col = array('d')
+
+        self._segments: List[str] = []  # spill file paths, oldest first
+        self._segment_lengths: List[int] = []
+        self._segment_cache = (None, None)  # (path, loaded columns)
+        self._prefix = uuid.uuid4().hex[:12]
+
+        self.dropped = 0  # executions discarded by retention without a spill_dir
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        # holds the segment list, not the log, so the log can still be collected
+        self._cleanup = weakref.finalize(self, _remove_segments, self._segments)
+
+        for execution in executions or ():
+            self.append(execution)
+
+    # --- list-like API ---
+
+    def append(self, execution: Execution) -> None:
+        code = self._symbol_codes.get(execution.symbol)
+        if code is None:
+            code = self._symbol_codes[execution.symbol] = len(self._symbols)
+            self._symbols.append(execution.symbol)
+
+        self._order_ids.append(execution.order_id)
+        self._symbol_col.append(code)
+        self._side_col.append(SIDE_CODES[execution.side])
+        self._quantity_col.append(execution.quantity)
+        self._price_col.append(execution.price)
+        self._timestamp_col.append(execution.timestamp)
+        self._pnl_col.append(execution.pnl)
+
+        if self.retention is not None and len(self._order_ids) > self.retention:
+            self._evict(min(self.segment_size, len(self._order_ids)))
+
+    def extend(self, executions: Iterable[Execution]) -> None:
+        for execution in executions:
+            self.append(execution)
+
+    @property
+    def in_memory(self) -> int:
+        return len(self._order_ids)
+
+    @property
+    def spilled(self) -> int:
+        return sum(self._segment_lengths)
+
+    def __len__(self) -> int:
+        return self.spilled + self.in_memory
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator[Execution]:
+        for path in self._segments:
+            yield from self._iter_columns(self._load_segment(path))
+        yield from self._iter_columns(self._memory_columns())
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Execution, List[Execution]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("execution log index out of range")
+
+        for path, seg_length in zip(self._segments, self._segment_lengths):
+            if index < seg_length:
+                return self._row(self._load_segment(path), index)
+            index -= seg_length
+        return self._row(self._memory_columns(), index)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ExecutionLog, list)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ExecutionLog({len(self)} executions, {self.in_memory} in memory, {len(self._segments)} segments)"
+
+    # --- columns ---
+
+    def _memory_columns(self):
+        return (self._order_ids, self._symbol_col, self._side_col, self._quantity_col,
+                self._price_col, self._timestamp_col, self._pnl_col)
+
+    def _row(self, columns, i) -> Execution:
+        order_ids, symbols, sides, quantities, prices, timestamps, pnls = columns
+        return Execution(
+            order_id=str(order_ids[i]),
+            symbol=self._symbols[int(symbols[i])],
+            side=SIDE_NAMES[int(sides[i])],
+            quantity=int(quantities[i]),
+            price=float(prices[i]),
+            timestamp=int(timestamps[i]),
+            pnl=float(pnls[i])
+        )
+
+    def _iter_columns(self, columns) -> Iterator[Execution]:
+        order_ids, symbols, sides, quantities, prices, timestamps, pnls = columns
+        names = self._symbols
+        for order_id, symbol, side, quantity, price, timestamp, pnl in zip(
+                order_ids, symbols, sides, quantities, prices, timestamps, pnls):
+            yield Execution(order_id=str(order_id), symbol=names[int(symbol)], side=SIDE_NAMES[int(side)],
+                            quantity=int(quantity), price=float(price), timestamp=int(timestamp), pnl=float(pnl))
+
+    def _evict(self, n: int) -> None:
+        # move the oldest n in-memory executions to a segment file, or drop them
+        if self.spill_dir:
+            path = os.path.join(self.spill_dir, f"executions-{self._prefix}-{len(self._segments):06d}.npz")
+            np.savez(
+                path,
+                order_id=np.array(self._order_ids[:n], dtype=str),
+                symbol=np.asarray(self._symbol_col[:n], dtype=np.int32),
+                side=np.asarray(self._side_col[:n], dtype=np.int8),
+                quantity=np.asarray(self._quantity_col[:n], dtype=np.int64),
+                price=np.asarray(self._price_col[:n], dtype=np.float64),
+                timestamp=np.asarray(self._timestamp_col[:n], dtype=np.int64),
+                pnl=np.asarray(self._pnl_col[:n], dtype=np.float64)
+            )
+            self._segments.append(path)
+            self._segment_lengths.append(n)
+            logger.debug(f"Spilled {n} executions to {path}")
+        else:
+            self.dropped += n
+
+        del self._order_ids[:n]
+        for column in self._memory_columns()[1:]:
+            del column[:n]
+
+    def _load_segment(self, path: str):
+        cached_path, columns = self._segment_cache
+        if cached_path != path:
+            with np.load(path) as data:
+                columns = tuple(data[name] for name in
+                                ('order_id', 'symbol', 'side', 'quantity', 'price', 'timestamp', 'pnl'))
+            self._segment_cache = (path, columns)
+        return columns
+
+    def close(self) -> None:
+        """Delete spilled segment files"""
+        _remove_segments(self._segments)
+        self._segment_lengths.clear()
+        self._segment_cache = (None, None)
@@ -0,0 +1,309 @@
+"""
+Opt-in counters and latency histograms for the services' hot paths
+
+Instrumented code checks metrics.enabled before reading a clock, so with
+metrics off (the default) a measured step costs one attribute lookup.
+Durations are recorded in nanoseconds into HDR-style histograms that keep
+every value to within 1% in a few KB, however many are recorded.
+
+Enabled metrics are written as JSON to a file every few seconds and/or
+served for scraping over HTTP (Prometheus text on /metrics, JSON on
+/metrics.json). Services turn them on from METRICS_FILE / METRICS_PORT or
+their --metrics-file / --metrics-port flags.
+
+When metrics are on, publishers also stamp messages with origin_ns (see
+wire.py): the wall-clock time the originating tick was published. Signals
+and executions carry their tick's origin forward, so each service can
+record how long after the tick its output went out.
+"""
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+logger = logging.getLogger('metrics')
+
+SUB_BITS = 7  # buckets per power of two are 2**(SUB_BITS - 1), i.e. under 1% apart
+SUB_COUNT = 1 << SUB_BITS
+HALF_COUNT = SUB_COUNT >> 1
+
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+PROMETHEUS_PREFIX = 'mercury_'
+
+
+def _bucket_value(index: int) -> int:
+    # middle of the range of values counted in bucket index
+    if index < SUB_COUNT:
+        return index
+    shift, offset = divmod(index - SUB_COUNT, HALF_COUNT)
+    shift += 1
+    return ((offset + HALF_COUNT) << shift) + (1 << shift >> 1)
+
+
+class Histogram:
+    """
+    Log-linear histogram of non-negative integers (nanoseconds here)
+
+    Values below 2**SUB_BITS are counted exactly; above that each power of
+    two is split into equal buckets, the layout HdrHistogram uses.
+    """
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts: List[int] = []
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        # bucket: the value itself below SUB_COUNT, else its power of two and top SUB_BITS - 1 bits
+        if value < SUB_COUNT:
+            value = int(value) if value > 0 else 0
+            index = value
+        else:
+            value = int(value)
+            shift = value.bit_length() - SUB_BITS
+            index = SUB_COUNT + (shift - 1) * HALF_COUNT + (value >> shift) - HALF_COUNT
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: 'Histogram') -> None:
+        if not other.count:
+            return
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, n in enumerate(other.counts):
+            self.counts[index] += n
+        self.min = other.min if not self.count else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> int:
+        """Value at or below which percent of the recorded values fall"""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index, n in enumerate(list(self.counts)):
+            seen += n
+            if seen >= rank:
+                return min(max(_bucket_value(index), self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        summary = {'count': self.count, 'min': self.min, 'max': self.max, 'mean': self.mean}
+        for percent in PERCENTILES:
+            summary[f"p{percent:g}"] = self.percentile(percent)
+        return summary
+
+
+class Metrics:
+    """Process-wide registry of named counters and histograms"""
+
+    def __init__(self):
+        self.enabled = False
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.started = time.time()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._writer: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.path: Optional[str] = None
+
+    # --- recording ---
+
+    def incr(self, name: str, n: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, value: int) -> None:
+        """Record value (nanoseconds for durations) in histogram name, callers check enabled first"""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.record(value)
+
+    def timer(self, name: str):
+        """Context manager timing its block into histogram name, a no-op while disabled"""
+        return _Timer(self, name) if self.enabled else nullcontext()
+
+    # --- lifecycle ---
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.time()
+
+    def configure(self, path: Optional[str] = None, port: Optional[int] = None,
+                  interval: float = 10.0, host: str = '0.0.0.0') -> bool:
+        """
+        Enable metrics if a file or a port is given
+
+        Args:
+            path: JSON file rewritten every interval seconds and at exit
+            port: Port to serve /metrics and /metrics.json on
+            interval: Seconds between file writes
+            host: Interface the scrape endpoint listens on
+
+        Returns:
+            True if metrics were enabled
+        """
+        if not path and not port:
+            return False
+
+        self.enable()
+        if port:
+            self.serve(port, host)
+        if path:
+            self.path = path
+            self._stop.clear()
+            self._writer = threading.Thread(target=self._write_loop, args=(interval,),
+                                            name='metrics-writer', daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+            logger.info(f"Writing metrics to {path} every {interval:g}s")
+        return True
+
+    def close(self) -> None:
+        """Stop the writer and endpoint, writing the file one last time"""
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join(timeout=5.0)
+            self._writer = None
+        if self.path:
+            self.dump(self.path)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _write_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.dump(self.path)
+            except OSError as e:
+                logger.error(f"Error writing metrics to {self.path}: {str(e)}")
+
+    # --- output ---
+
+    def snapshot(self) -> dict:
+        return {
+            'pid': os.getpid(),
+            'started': self.started,
+            'time': time.time(),
+            'counters': dict(self.counters),
+            'histograms_ns': {name: histogram.summary()
+                              for name, histogram in sorted(self.histograms.items())},
+        }
+
+    def dump(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def render_prometheus(self) -> str:
+        """Counters and histograms in the Prometheus text format, durations in seconds"""
+        lines = []
+        for name, value in sorted(self.counters.items()):
+            metric = _metric_name(name) + '_total'
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        for name, histogram in sorted(self.histograms.items()):
+            metric = _metric_name(name) + '_seconds'
+            lines.append(f"# TYPE {metric} summary")
+            for percent in PERCENTILES:
+                lines.append(f'{metric}{{quantile="{percent / 100:g}"}} {histogram.percentile(percent) / 1e9:.9f}')
+            lines.append(f"{metric}_sum {histogram.total / 1e9:.9f}")
+            lines.append(f"{metric}_count {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int, host: str = '0.0.0.0') -> ThreadingHTTPServer:
+        """Serve the scrape endpoint from a background thread"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = registry.render_prometheus(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, content_type = json.dumps(registry.snapshot()), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name='metrics-endpoint', daemon=True).start()
+        logger.info(f"Serving metrics on http://{host}:{self._server.server_port}/metrics")
+        return self._server
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics: Metrics, name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter_ns() - self.start)
+        return False
+
+
+def _metric_name(name: str) -> str:
+    return PROMETHEUS_PREFIX + ''.join(c if c.isalnum() else '_' for c in name)
+
+
+def get_metrics_file() -> Optional[str]:
+    return os.getenv('METRICS_FILE') or None
+
+
+def get_metrics_port() -> Optional[int]:
+    port = os.getenv('METRICS_PORT')
+    return int(port) if port else None
+
+
+# process-wide registry the services record into
+metrics = Metrics()
@@ -1,10 +1,35 @@
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Union
-from datetime import datetime
+import os
 import uuid
+import itertools
+from dataclasses import InitVar, dataclass, field
+from typing import Dict, List, Optional, Any, Union, TYPE_CHECKING
 
+from .clock import now
 
-@dataclass
+if TYPE_CHECKING:
+    from .execution_log import ExecutionLog
+
+
+# order ids are a per-process random prefix plus a counter: unique across
+# processes, increasing within one, and far cheaper than a uuid4 per order
+_order_id_prefix = uuid.uuid4().hex[:12]
+_order_id_counter = itertools.count(1)
+
+def _reset_order_ids() -> None:
+    # forked workers would otherwise hand out their parent's ids
+    global _order_id_prefix, _order_id_counter
+    _order_id_prefix = uuid.uuid4().hex[:12]
+    _order_id_counter = itertools.count(1)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_order_ids)
+
+def next_order_id() -> str:
+    return f"{_order_id_prefix}-{next(_order_id_counter)}"
+
+
+
+@dataclass(slots=True)
 class Tick:
     "Represents single price tick for symbol"
     symbol: str
@@ -15,7 +40,7 @@ class Tick:
     low_price: Optional[float] = None
     volume: Optional[int] = None
 
-@dataclass
+@dataclass(slots=True)
 class Signal:
     """Represents a trading signal"""
     symbol: str
@@ -23,14 +48,14 @@ class Signal:
     timestamp: int
     data: Dict[str, Any] = field(default_factory=dict)
 
-@dataclass
+@dataclass(slots=True)
 class Order:
     """Represents a trading order"""
     symbol : str
     side : str #either buy or sell
     quantity : int
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
-    timestamp: int = field(default_factory=lambda: int(datetime.now().timestamp()))
+    id: str = field(default_factory=next_order_id)
+    timestamp: int = field(default_factory=now)
     order_type : str = "MARKET" #default to market order
     price : Optional[float] = None # only for limit orders so make optional
 
@@ -51,7 +76,12 @@ class Order:
         if self.order_type == 'LIMIT' and self.price is None:
             raise ValueError("Limit orders must specify a price")
     
-@dataclass
+@dataclass(slots=True)
+class OrderCancel:
+    """Request to cancel a resting limit order"""
+    order_id: str
+
+@dataclass(slots=True)
 class Execution:
     """Represents an executed order"""
     order_id: str
@@ -59,42 +89,162 @@ class Execution:
     side: str
     quantity: int
     price: float
-    timestamp: int = field(default_factory=lambda: int(datetime.now().timestamp()))
+    timestamp: int = field(default_factory=now)
     pnl: float = 0.0
 
+def _new_execution_log(retention: Optional[int] = None, spill_dir: Optional[str] = None) -> 'ExecutionLog':
+    # imported here because execution_log depends on Execution above
+    from .execution_log import ExecutionLog, get_retention, get_spill_dir
+    return ExecutionLog(retention=retention or get_retention(), spill_dir=spill_dir or get_spill_dir())
+
 @dataclass
 class Portfolio:
-    """Represents a trading portfolio"""
+    """
+    Represents a trading portfolio
+
+    Holdings value, per-symbol exposure and PnL are kept up to date as prices
+    arrive (mark_price) and executions land (update_after_execution), so
+    reading them is O(1). Change holdings through update_after_execution, or
+    call revalue() after editing them directly.
+
+    Unless a trade_history is passed in, fills go to an ExecutionLog keeping
+    history_retention of them in memory and spilling older ones to
+    history_spill_dir (defaults: $EXECUTION_RETENTION, $EXECUTION_SPILL_DIR,
+    i.e. unbounded when unset).
+    """
     cash: float
     holdings: Dict[str, int] = field(default_factory=dict)  # symbol -> quantity
-    trade_history: List[Execution] = field(default_factory=list)
-    
+    trade_history: 'ExecutionLog' = None  # list-like, columnar
+    prices: Dict[str, float] = field(default_factory=dict, compare=False, repr=False)  # symbol -> last mark
+    cost_basis: Dict[str, float] = field(default_factory=dict, compare=False, repr=False)  # symbol -> avg cost
+    realized_pnl: float = field(default=0.0, compare=False)
+
+    _holdings_value: float = field(default=0.0, init=False, compare=False, repr=False)
+    _cost_value: float = field(default=0.0, init=False, compare=False, repr=False)
+    _unpriced: set = field(default_factory=set, init=False, compare=False, repr=False)
+
+    history_retention: InitVar[Optional[int]] = None
+    history_spill_dir: InitVar[Optional[str]] = None
+
+    def __post_init__(self, history_retention, history_spill_dir):
+        if self.trade_history is None:
+            self.trade_history = _new_execution_log(history_retention, history_spill_dir)
+        self.revalue()
+
+    def revalue(self) -> None:
+        """Recompute the running totals from holdings, prices and cost basis"""
+        for symbol in self.holdings:
+            # positions that predate tracking get their first mark as cost
+            if symbol not in self.cost_basis and symbol in self.prices:
+                self.cost_basis[symbol] = self.prices[symbol]
+
+        self._unpriced = {symbol for symbol in self.holdings if symbol not in self.prices}
+        self._holdings_value = sum(
+            quantity * self.prices[symbol]
+            for symbol, quantity in self.holdings.items() if symbol in self.prices
+        )
+        self._cost_value = sum(
+            quantity * self.cost_basis[symbol]
+            for symbol, quantity in self.holdings.items() if symbol in self.cost_basis
+        )
+
+    def mark_price(self, symbol: str, price: float) -> None:
+        """Record the latest market price for symbol and revalue its position"""
+        old_price = self.prices.get(symbol)
+        self.prices[symbol] = price
+
+        quantity = self.holdings.get(symbol)
+        if not quantity:
+            return
+
+        if old_price is None:
+            self._unpriced.discard(symbol)
+            self._holdings_value += quantity * price
+            if symbol not in self.cost_basis:
+                self.cost_basis[symbol] = price
+                self._cost_value += quantity * price
+        else:
+            self._holdings_value += quantity * (price - old_price)
+
     def update_after_execution(self, execution: Execution) -> None: 
-        if execution.side == 'BUY': 
-            cost = execution.price * execution.quantity
-            self.cash -= cost
+        symbol = execution.symbol
+        held = self.holdings.get(symbol, 0)
 
-            if execution.symbol in self.holdings: 
-                self.holdings[execution.symbol] += execution.quantity
-            else: 
-                self.holdings[execution.symbol] = execution.quantity
+        if execution.side == 'SELL' and symbol not in self.holdings: 
+            raise ValueError(f"Cannot sell {symbol}: Not in Potfolio")
 
-        elif execution.side == 'SELL': 
-            proceeds = execution.price * execution.quantity
-            self.cash += proceeds
+        if execution.side in ('BUY', 'SELL'):
+            # take the current position out of the totals, put the new one back below
+            old_price = self.prices.get(symbol)
+            # an unmarked position from the constructor has no basis yet: it takes the fill price
+            avg_cost = self.cost_basis.get(symbol)
+            if held:
+                if old_price is not None:
+                    self._holdings_value -= held * old_price
+                if avg_cost is not None:
+                    self._cost_value -= held * avg_cost
+            if avg_cost is None:
+                avg_cost = execution.price
 
-            if execution.symbol in self.holdings: 
-                self.holdings[execution.symbol] -= execution.quantity
+            if execution.side == 'BUY': 
+                self.cash -= execution.price * execution.quantity
+                quantity = held + execution.quantity
+                avg_cost = (held * avg_cost + execution.quantity * execution.price) / quantity
+            else: 
+                self.cash += execution.price * execution.quantity
+                quantity = held - execution.quantity
+                execution.pnl = (execution.price - avg_cost) * min(execution.quantity, held)
+                self.realized_pnl += execution.pnl
 
-                if self.holdings[execution.symbol] <= 0: 
-                    del self.holdings[execution.symbol]
+            # a fill is a fresh market price for the symbol
+            self.prices[symbol] = execution.price
+            self._unpriced.discard(symbol)
+
+            if quantity > 0:
+                self.holdings[symbol] = quantity
+                self.cost_basis[symbol] = avg_cost
+                self._holdings_value += quantity * execution.price
+                self._cost_value += quantity * avg_cost
             else: 
-                raise ValueError(f"Cannot sell {execution.symbol}: Not in Potfolio")
+                del self.holdings[symbol]
+                self.cost_basis.pop(symbol, None)
             
         self.trade_history.append(execution)
 
-    def get_total_value(self, current_prices: Dict[str, float]) -> float:
+    def _require_prices(self) -> None:
+        if self._unpriced:
+            raise ValueError(f"Missing prices for: {', '.join(sorted(self._unpriced))}")
+
+    @property
+    def holdings_value(self) -> float:
+        self._require_prices()
+        return self._holdings_value
+
+    @property
+    def total_value(self) -> float:
+        """Cash plus holdings at their latest marks, O(1)"""
+        return self.cash + self.holdings_value
+
+    @property
+    def unrealized_pnl(self) -> float:
+        """Gain of open positions over their average cost"""
+        self._require_prices()
+        return self._holdings_value - self._cost_value
+
+    def exposure(self, symbol: str) -> float:
+        """Market value of the position in symbol at its latest mark"""
+        quantity = self.holdings.get(symbol, 0)
+        if not quantity:
+            return 0.0
+        if symbol not in self.prices:
+            raise ValueError(f"Missing prices for: {symbol}")
+        return quantity * self.prices[symbol]
+
+    def get_total_value(self, current_prices: Optional[Dict[str, float]] = None) -> float:
          #current_prices is stock symbol, curr_price taken from Alpha
+         #without it, use the incrementally maintained marks
+        if current_prices is None:
+            return self.total_value
         
         missing = set(self.holdings) - set(current_prices)
         if missing:
@@ -1,16 +1,131 @@
-import redis
 import os
+import asyncio
+import logging
+import weakref
+from typing import Dict, Tuple
+
+import redis
+import redis.asyncio
+from redis.asyncio.retry import Retry as AsyncRetry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, TimeoutError
+from redis.retry import Retry
 from dotenv import load_dotenv
 
 load_dotenv()
 
-class RedisClient: 
-    _instance = None
+logger = logging.getLogger('redis_client')
+
+# pool roles: commands and publishes share one pool, subscriptions get their
+# own so a blocking subscriber never holds a connection publishers need
+ROLE_COMMANDS = 'commands'
+ROLE_PUBSUB = 'pubsub'
+
+def _env_float(name, default):
+    value = os.getenv(name)
+    return float(value) if value not in (None, '') else default
+
+class RedisClient:
+    """
+    Process-wide Redis clients backed by tuned connection pools
+
+    Clients are shared per (role, decode_responses): decoded clients return
+    str like before, raw clients (decode_responses=False) hand binary payloads
+    over as bytes without a UTF-8 pass. Pools are thread-safe and hand each
+    caller its own connection, and pub/sub connections come from a separate
+    pool, so publishers and subscribers in one process do not wait on each
+    other. Connections are health-checked when idle and commands are retried
+    with backoff across reconnects.
+
+    Settings come from the environment: REDIS_HOST, REDIS_PORT, REDIS_DB,
+    REDIS_PASSWORD, REDIS_MAX_CONNECTIONS, REDIS_SOCKET_TIMEOUT,
+    REDIS_CONNECT_TIMEOUT, REDIS_HEALTH_CHECK_INTERVAL and REDIS_RETRIES.
+    """
+    _instance = None  # the decoded command client, kept for existing callers
+    _pools: Dict[Tuple[str, bool], redis.ConnectionPool] = {}
+    _clients: Dict[Tuple[str, bool], redis.Redis] = {}
+    _async_clients = weakref.WeakKeyDictionary()  # event loop -> {decode_responses: client}
+
+    @classmethod
+    def settings(cls) -> dict:
+        """Connection and pool keyword arguments, shared by sync and async pools"""
+        password = os.getenv('REDIS_PASSWORD') or None
+        return {
+            'host': os.getenv('REDIS_HOST', 'localhost'),
+            'port': int(os.getenv('REDIS_PORT', 6379)),
+            'db': int(os.getenv('REDIS_DB', 0)),
+            'password': password,
+            'max_connections': int(os.getenv('REDIS_MAX_CONNECTIONS', 50)),
+            'socket_timeout': _env_float('REDIS_SOCKET_TIMEOUT', None),
+            'socket_connect_timeout': _env_float('REDIS_CONNECT_TIMEOUT', 5.0),
+            'socket_keepalive': True,
+            'health_check_interval': int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', 30)),
+        }
+
+    @classmethod
+    def _retry_settings(cls, retry_class) -> dict:
+        return {
+            'retry': retry_class(ExponentialBackoff(cap=2.0, base=0.05), int(os.getenv('REDIS_RETRIES', 3))),
+            'retry_on_error': [ConnectionError, TimeoutError],
+        }
+
+    @classmethod
+    def get_pool(cls, decode_responses=True, role=ROLE_COMMANDS) -> redis.ConnectionPool:
+        key = (role, decode_responses)
+        pool = cls._pools.get(key)
+        if pool is None:
+            settings = cls.settings()
+            pool = cls._pools[key] = redis.ConnectionPool(decode_responses=decode_responses,
+                                                          **settings, **cls._retry_settings(Retry))
+            logger.debug(f"Created {role} pool for {settings['host']}:{settings['port']} "
+                         f"(max {settings['max_connections']} connections, decode_responses={decode_responses})")
+        return pool
+
+    @classmethod
+    def get_instance(cls, decode_responses=True, role=ROLE_COMMANDS) -> redis.Redis:
+        """
+        Shared synchronous client
+
+        Args:
+            decode_responses: False for a raw client that returns bytes
+            role: ROLE_COMMANDS, or ROLE_PUBSUB for a client that only subscribes
+        """
+        key = (role, decode_responses)
+        client = cls._clients.get(key)
+        if client is None:
+            client = cls._clients[key] = redis.Redis(connection_pool=cls.get_pool(decode_responses, role))
+            if key == (ROLE_COMMANDS, True):
+                cls._instance = client
+        return client
+
+    @classmethod
+    def get_pubsub(cls, decode_responses=True, **kwargs) -> redis.client.PubSub:
+        """New PubSub on the dedicated subscription pool"""
+        return cls.get_instance(decode_responses, ROLE_PUBSUB).pubsub(**kwargs)
+
+    @classmethod
+    def get_async_instance(cls, decode_responses=True) -> redis.asyncio.Redis:
+        """
+        Shared asyncio client for the running event loop
+
+        asyncio connections belong to the loop that opened them, so each loop
+        gets its own pool; call this from inside a coroutine.
+        """
+        loop = asyncio.get_running_loop()
+        clients = cls._async_clients.setdefault(loop, {})
+        client = clients.get(decode_responses)
+        if client is None:
+            pool = redis.asyncio.ConnectionPool(decode_responses=decode_responses,
+                                                **cls.settings(), **cls._retry_settings(AsyncRetry))
+            client = clients[decode_responses] = redis.asyncio.Redis(connection_pool=pool)
+        return client
 
     @classmethod
-    def get_instance(cls): 
-        if cls._instance is None:
-            redis_host = os.getenv('REDIS_HOST', 'localhost')
-            redis_port = int(os.getenv('REDIS_PORT', 6379))
-            cls._instance = redis.Redis(host=redis_host, port=redis_port, decode_responses=True)
-        return cls._instance
\ No newline at end of file
+    def reset(cls) -> None:
+        """Drop the shared clients and close their pools (e.g. after fork or a settings change)"""
+        for pool in cls._pools.values():
+            pool.disconnect()
+        cls._pools = {}
+        cls._clients = {}
+        cls._async_clients = weakref.WeakKeyDictionary()
+        cls._instance = None
@@ -0,0 +1,319 @@
+"""
+Redis Streams transport for the event channels
+
+Pub/sub drops every message published while a subscriber is down or slow.
+With MESSAGE_TRANSPORT=streams the services XADD to one stream per channel
+instead (trimmed to about STREAM_MAXLEN entries) and read through consumer
+groups, so entries wait for consumers and unacknowledged ones are delivered
+again after a restart.
+
+Market data is split into STREAM_SHARDS streams by symbol. Each processing
+worker reads one shard, so every symbol's ticks reach the same SMA state in
+order, and adding shards scales processing horizontally. Every other channel
+is a single stream.
+
+Consumers should keep their name across restarts so they pick up their own
+unacknowledged entries. Entries another consumer left pending for longer than
+claim_idle_ms (say it was renamed or never came back) are claimed with
+XAUTOCLAIM and handled like this consumer's own.
+"""
+import os
+import time
+import zlib
+import logging
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from redis.exceptions import ResponseError
+
+from .events import MARKET_DATA_CHANNEL
+from .models import Tick
+from .wire import FORMAT_JSON, encode_ticks
+
+logger = logging.getLogger('streams')
+
+TRANSPORT_PUBSUB = 'pubsub'
+TRANSPORT_STREAMS = 'streams'
+TRANSPORTS = (TRANSPORT_PUBSUB, TRANSPORT_STREAMS)
+
+DATA_FIELD = 'data'  # the single field holding the encoded message
+DEFAULT_MAXLEN = 100000
+DEFAULT_CLAIM_IDLE_MS = 60000
+
+
+def get_transport() -> str:
+    """Transport configured through the MESSAGE_TRANSPORT environment variable"""
+    transport = os.getenv('MESSAGE_TRANSPORT', TRANSPORT_PUBSUB).lower()
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Invalid MESSAGE_TRANSPORT: {transport}. Must be one of {', '.join(TRANSPORTS)}")
+    return transport
+
+
+def get_shards() -> int:
+    return max(1, int(os.getenv('STREAM_SHARDS', 1)))
+
+
+def get_maxlen() -> Optional[int]:
+    maxlen = int(os.getenv('STREAM_MAXLEN', DEFAULT_MAXLEN))
+    return maxlen if maxlen > 0 else None
+
+
+def stream_key(channel: str, shard: Optional[int] = None) -> str:
+    return f"stream:{channel}" if shard is None else f"stream:{channel}:{shard}"
+
+
+def shard_for(symbol: str, shards: int) -> int:
+    # crc32 rather than hash() so every process agrees on the shard
+    return zlib.crc32(symbol.encode('utf-8')) % shards if shards > 1 else 0
+
+
+def market_data_streams(shards: int, only: Optional[Iterable[int]] = None) -> List[str]:
+    """Market data stream keys, for every shard or just the ones in only"""
+    return [stream_key(MARKET_DATA_CHANNEL, shard) for shard in (range(shards) if only is None else only)]
+
+
+def _text(value) -> str:
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def _id_key(entry_id: str) -> Tuple[int, int]:
+    ms, _, seq = entry_id.partition('-')
+    return int(ms), int(seq or 0)
+
+
+class StreamPublisher:
+    """Appends encoded messages to the channel streams through a caller's pipeline"""
+
+    def __init__(self, shards: int = 1, maxlen: Optional[int] = DEFAULT_MAXLEN):
+        """
+        Args:
+            shards: Number of market data streams
+            maxlen: Approximate entries kept per stream, None to never trim
+        """
+        self.shards = max(1, shards)
+        self.maxlen = maxlen
+
+    def key_for(self, channel: str, symbol: Optional[str] = None) -> str:
+        if channel == MARKET_DATA_CHANNEL:
+            return stream_key(channel, shard_for(symbol or '', self.shards))
+        return stream_key(channel)
+
+    def publish(self, pipe, channel: str, payload, symbol: Optional[str] = None) -> None:
+        self.add(pipe, self.key_for(channel, symbol), payload)
+
+    def add(self, pipe, key: str, payload) -> None:
+        # approximate trimming lets Redis drop whole macro nodes, which is much cheaper
+        pipe.xadd(key, {DATA_FIELD: payload}, maxlen=self.maxlen, approximate=True)
+
+    def encode_ticks(self, ticks: Iterable[Tick], fmt: str = FORMAT_JSON,
+                     frame_size: int = 256, stamp_origin: bool = False) -> Iterator[Tuple[str, bytes]]:
+        """
+        Encode ticks for MARKET_DATA_CHANNEL split by shard, see wire.encode_ticks
+
+        Yields:
+            (stream key, payload); binary frames only hold ticks of one shard
+        """
+        if self.shards == 1:
+            key = stream_key(MARKET_DATA_CHANNEL, 0)
+            for payload in encode_ticks(ticks, fmt, frame_size, stamp_origin):
+                yield key, payload
+            return
+
+        pending: Dict[int, List[Tick]] = {}
+        for tick in ticks:
+            shard = shard_for(tick.symbol, self.shards)
+            frame = pending.setdefault(shard, [])
+            frame.append(tick)
+            if len(frame) >= frame_size:
+                for payload in encode_ticks(frame, fmt, frame_size, stamp_origin):
+                    yield stream_key(MARKET_DATA_CHANNEL, shard), payload
+                frame.clear()
+
+        for shard, frame in pending.items():
+            for payload in encode_ticks(frame, fmt, frame_size, stamp_origin):
+                yield stream_key(MARKET_DATA_CHANNEL, shard), payload
+
+
+class StreamEntry(NamedTuple):
+    stream: str
+    id: str
+    payload: object
+
+
+class StreamConsumer:
+    """
+    One consumer in a consumer group reading one or more streams
+
+    After a restart the consumer first re-reads the entries it was given but
+    never acknowledged, then moves on to new ones. Every claim_idle_ms it also
+    claims entries other consumers have left pending that long, and reads them
+    the same way. Entries from several streams in one read are ordered by
+    entry id, i.e. by arrival time.
+    """
+
+    def __init__(self, redis_client, streams: List[str], group: str, consumer: str,
+                 count: int = 500, block_ms: int = 1000, start_id: str = '0',
+                 claim_idle_ms: Optional[int] = DEFAULT_CLAIM_IDLE_MS):
+        """
+        Args:
+            redis_client: Redis client to read and acknowledge with
+            streams: Stream keys to read
+            group: Consumer group name, created on every stream if missing
+            consumer: Name of this consumer within the group
+            count: Maximum entries per stream per read (XREADGROUP COUNT)
+            block_ms: Milliseconds a read waits for new entries
+            start_id: Where a newly created group starts, '0' for everything retained
+            claim_idle_ms: Claim entries pending on other consumers for this long, None to never
+        """
+        self.redis_client = redis_client
+        self.streams = list(streams)
+        self.group = group
+        self.consumer = consumer
+        self.count = max(1, count)
+        self.block_ms = block_ms
+        self.start_id = start_id
+        self.claim_idle_ms = claim_idle_ms if claim_idle_ms and claim_idle_ms > 0 else None
+        self._recovering = True
+        self._next_claim = 0.0
+
+    def ensure_groups(self) -> None:
+        for stream in self.streams:
+            try:
+                self.redis_client.xgroup_create(stream, self.group, id=self.start_id, mkstream=True)
+                logger.info(f"Created consumer group {self.group} on {stream}")
+            except ResponseError as e:
+                if 'BUSYGROUP' not in str(e):
+                    raise
+
+    def claim_idle(self) -> int:
+        """
+        XAUTOCLAIM entries pending for at least claim_idle_ms, returns how many
+
+        Claimed entries join this consumer's pending list, so the next reads
+        deliver them before new entries.
+        """
+        claimed = 0
+        for stream in self.streams:
+            start = '0-0'
+            while True:
+                reply = self.redis_client.xautoclaim(stream, self.group, self.consumer, self.claim_idle_ms,
+                                                     start_id=start, count=self.count)
+                claimed += len(reply[1])
+                start = _text(reply[0])
+                if start in ('0-0', '0'):
+                    break
+
+        if claimed:
+            logger.warning(f"{self.consumer} claimed {claimed} entries pending for over {self.claim_idle_ms}ms")
+            self._recovering = True
+        return claimed
+
+    def peers(self) -> List[str]:
+        """Other consumers of the group that read one of these streams within claim_idle_ms"""
+        idle_ms = self.claim_idle_ms or DEFAULT_CLAIM_IDLE_MS
+        names = set()
+        for stream in self.streams:
+            for info in self.redis_client.xinfo_consumers(stream, self.group):
+                name = _text(info['name'])
+                if name != self.consumer and info['idle'] < idle_ms:
+                    names.add(name)
+        return sorted(names)
+
+    def acked_after(self, positions: Dict[str, str]) -> List[StreamEntry]:
+        """
+        Entries the group delivered and acknowledged after positions
+
+        State saved at positions (stream -> entry id, e.g. in a snapshot) is
+        missing these, and as they were acknowledged they are never delivered
+        again, so they have to be replayed. Entries still pending are left out;
+        reads deliver those as usual.
+        """
+        entries = []
+        for stream in self.streams:
+            after = positions.get(stream)
+            if after is None:
+                continue
+            group = next((g for g in self.redis_client.xinfo_groups(stream) if _text(g['name']) == self.group), None)
+            if group is None:
+                continue
+            last = _text(group['last-delivered-id'])
+            if _id_key(last) <= _id_key(after):
+                continue
+
+            pending = set()
+            start = after
+            while True:
+                page = self.redis_client.xpending_range(stream, self.group, min=start, max=last, count=self.count)
+                pending.update(_text(p['message_id']) for p in page)
+                if len(page) < self.count:
+                    break
+                start = '(' + _text(page[-1]['message_id'])
+
+            start = '(' + after
+            while True:
+                page = self.redis_client.xrange(stream, min=start, max=last, count=self.count)
+                for entry_id, fields in page:
+                    entry_id = _text(entry_id)
+                    if entry_id not in pending:
+                        entries.append(StreamEntry(stream, entry_id, fields.get(DATA_FIELD.encode(),
+                                                                                fields.get(DATA_FIELD))))
+                if len(page) < self.count:
+                    break
+                start = '(' + _text(page[-1][0])
+
+        if len(self.streams) > 1:
+            entries.sort(key=lambda entry: _id_key(entry.id))
+        return entries
+
+    def read(self) -> List[StreamEntry]:
+        """Read the next batch: pending entries first after a restart or a claim, then new ones"""
+        if self.claim_idle_ms is not None and time.monotonic() >= self._next_claim:
+            self._next_claim = time.monotonic() + self.claim_idle_ms / 1000
+            try:
+                self.claim_idle()
+            except ResponseError as e:
+                # XAUTOCLAIM needs Redis 6.2
+                logger.warning(f"Not claiming idle entries: {str(e)}")
+                self.claim_idle_ms = None
+
+        cursor = '0' if self._recovering else '>'
+        reply = self.redis_client.xreadgroup(
+            self.group, self.consumer, {stream: cursor for stream in self.streams},
+            count=self.count, block=None if self._recovering else self.block_ms
+        )
+
+        entries = []
+        trimmed = []
+        for stream, messages in reply or []:
+            stream = _text(stream)
+            for entry_id, fields in messages:
+                entry_id = _text(entry_id)
+                if not fields:
+                    # pending entry already trimmed out of the stream
+                    trimmed.append(StreamEntry(stream, entry_id, None))
+                    continue
+                payload = fields.get(DATA_FIELD.encode(), fields.get(DATA_FIELD))
+                entries.append(StreamEntry(stream, entry_id, payload))
+
+        if trimmed:
+            self.ack(trimmed)
+        if self._recovering and not entries and not trimmed:
+            self._recovering = False
+            logger.debug(f"{self.consumer} caught up on pending entries")
+
+        if len(self.streams) > 1:
+            entries.sort(key=lambda entry: _id_key(entry.id))
+        return entries
+
+    def ack(self, entries: Iterable[StreamEntry], pipe=None) -> None:
+        """Acknowledge entries, one XACK per stream, queued on pipe when given"""
+        by_stream: Dict[str, List[str]] = {}
+        for entry in entries:
+            by_stream.setdefault(entry.stream, []).append(entry.id)
+        if not by_stream:
+            return
+
+        target = pipe if pipe is not None else self.redis_client.pipeline(transaction=False)
+        for stream, ids in by_stream.items():
+            target.xack(stream, self.group, *ids)
+        if pipe is None:
+            target.execute()
@@ -0,0 +1,95 @@
+from typing import Iterator, List, Optional, Union
+
+import numpy as np
+
+from .models import Tick
+
+
+class TickColumns:
+    """
+    Columnar tick history for one symbol
+
+    Holds timestamp/OHLC/volume as typed NumPy arrays and only builds Tick
+    objects when they are indexed or iterated, so it can stand in for the
+    List[Tick] returned by the data feeds.
+    """
+
+    def __init__(self, symbol: str, timestamps, open_prices, high_prices, low_prices, close_prices, volumes):
+        self.symbol = symbol
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.open_prices = np.asarray(open_prices, dtype=np.float64)
+        self.high_prices = np.asarray(high_prices, dtype=np.float64)
+        self.low_prices = np.asarray(low_prices, dtype=np.float64)
+        self.close_prices = np.asarray(close_prices, dtype=np.float64)
+        self.volumes = np.asarray(volumes, dtype=np.int64)
+
+    @classmethod
+    def empty(cls, symbol: str) -> 'TickColumns':
+        return cls(symbol, [], [], [], [], [], [])
+
+    @property
+    def prices(self) -> np.ndarray:
+        """Main price of each tick (the close), same as Tick.price"""
+        return self.close_prices
+
+    def __len__(self) -> int:
+        return self.timestamps.shape[0]
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Tick, 'TickColumns']:
+        if isinstance(index, slice):
+            # basic slicing returns views, no copy
+            return self.take(index)
+
+        return Tick(
+            symbol=self.symbol,
+            price=float(self.close_prices[index]),
+            timestamp=int(self.timestamps[index]),
+            open_price=float(self.open_prices[index]),
+            high_price=float(self.high_prices[index]),
+            low_price=float(self.low_prices[index]),
+            volume=int(self.volumes[index])
+        )
+
+    def __iter__(self) -> Iterator[Tick]:
+        # tolist() converts to Python scalars in one go instead of per element
+        symbol = self.symbol
+        for ts, o, h, l, c, v in zip(self.timestamps.tolist(), self.open_prices.tolist(),
+                                     self.high_prices.tolist(), self.low_prices.tolist(),
+                                     self.close_prices.tolist(), self.volumes.tolist()):
+            yield Tick(symbol=symbol, price=c, timestamp=ts, open_price=o,
+                       high_price=h, low_price=l, volume=v)
+
+    def to_ticks(self) -> List[Tick]:
+        return list(self)
+
+    def is_sorted(self) -> bool:
+        return len(self) < 2 or bool(np.all(self.timestamps[1:] >= self.timestamps[:-1]))
+
+    def sorted(self) -> 'TickColumns':
+        """Return self if already in timestamp order, else a stably sorted copy"""
+        if self.is_sorted():
+            return self
+        return self.take(np.argsort(self.timestamps, kind='stable'))
+
+    def between(self, start: Optional[int] = None, end: Optional[int] = None) -> 'TickColumns':
+        """
+        Ticks with start <= timestamp <= end, as views (requires sorted timestamps)
+
+        Args:
+            start: First timestamp to include, None for no lower bound
+            end: Last timestamp to include, None for no upper bound
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.timestamps, start, side='left'))
+        hi = len(self) if end is None else int(np.searchsorted(self.timestamps, end, side='right'))
+        return self[lo:hi]
+
+    def take(self, indices) -> 'TickColumns':
+        return TickColumns(
+            self.symbol,
+            self.timestamps[indices],
+            self.open_prices[indices],
+            self.high_prices[indices],
+            self.low_prices[indices],
+            self.close_prices[indices],
+            self.volumes[indices]
+        )
@@ -0,0 +1,353 @@
+"""
+Wire formats for messages on the Redis channels
+
+JSON stays the default and is easy to read with redis-cli. The binary format
+packs fields with struct behind an 8-byte header (magic, version, message
+type, record count); tick frames carry many ticks per message with a shared
+symbol table. Publishers pick the format from the MESSAGE_FORMAT setting and
+subscribers detect it per message, so both can be switched independently.
+
+Binary payloads are bytes, so subscribers need a raw connection, e.g.
+RedisClient.get_pubsub(decode_responses=False); JSON decodes from either.
+
+Messages can carry origin_ns, the wall-clock time in ns the tick they stem
+from was published, for end-to-end latency metrics. It is only written when
+given: binary messages then use header version 2 (the origin follows the
+header) and JSON ones an origin_ns key. decode_envelope returns it.
+"""
+import os
+import json
+import math
+import time
+import struct
+from dataclasses import asdict
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .models import Execution, Order, OrderCancel, Signal, Tick
+
+FORMAT_JSON = 'json'
+FORMAT_BINARY = 'binary'
+FORMATS = (FORMAT_JSON, FORMAT_BINARY)
+
+# first byte is outside ASCII so it can never be mistaken for a JSON document
+MAGIC = b'\xa7M'
+VERSION = 1
+VERSION_ORIGIN = 2  # header followed by ORIGIN
+
+MSG_TICKS = 1
+MSG_SIGNAL = 2
+MSG_ORDER = 3
+MSG_EXECUTION = 4
+MSG_CANCEL = 5
+
+HEADER = struct.Struct('<2sBBI')  # magic, version, message type, record count
+ORIGIN = struct.Struct('<q')  # origin_ns, version 2 only
+TICK_RECORD = struct.Struct('<Hqddddq')  # symbol index, timestamp, price, open, high, low, volume
+SIGNAL_RECORD = struct.Struct('<bq')  # side, timestamp
+ORDER_RECORD = struct.Struct('<bbqqd')  # side, order type, quantity, timestamp, limit price
+EXECUTION_RECORD = struct.Struct('<bqdqd')  # side, quantity, price, timestamp, pnl
+
+SIDE_CODES = {'BUY': 1, 'SELL': -1, '': 0}
+SIDE_NAMES = {code: side for side, code in SIDE_CODES.items()}
+ORDER_TYPE_CODES = {'MARKET': 0, 'LIMIT': 1}
+ORDER_TYPE_NAMES = {code: name for name, code in ORDER_TYPE_CODES.items()}
+
+MAX_FRAME_TICKS = 0xFFFF  # symbol indexes are 16-bit
+
+Payload = Union[str, bytes]
+
+
+def get_message_format() -> str:
+    """Message format configured through the MESSAGE_FORMAT environment variable"""
+    fmt = os.getenv('MESSAGE_FORMAT', FORMAT_JSON).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Invalid MESSAGE_FORMAT: {fmt}. Must be one of {', '.join(FORMATS)}")
+    return fmt
+
+
+@lru_cache(maxsize=1 << 16)
+def format_tick_date(timestamp):
+    # daily bars share a handful of timestamps across symbols, so cache the formatting
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+
+
+# --- JSON ---
+
+def tick_to_dict(tick: Tick) -> dict:
+    return {
+        'type': 'tick',
+        'symbol': tick.symbol,
+        'price': tick.price,
+        'timestamp': tick.timestamp,
+        'date': format_tick_date(tick.timestamp),
+        'open': tick.open_price,
+        'high': tick.high_price,
+        'low': tick.low_price,
+        'volume': tick.volume
+    }
+
+
+def _to_json(message_type: str, obj, origin_ns: Optional[int] = None) -> str:
+    data = {'type': message_type}
+    data.update(asdict(obj))
+    if origin_ns is not None:
+        data['origin_ns'] = origin_ns
+    return json.dumps(data)
+
+
+def _from_json(data: dict) -> list:
+    message_type = data.pop('type', None)
+    data.pop('origin_ns', None)
+    if message_type == 'tick':
+        return [Tick(symbol=data['symbol'], price=data['price'], timestamp=data['timestamp'],
+                     open_price=data.get('open'), high_price=data.get('high'),
+                     low_price=data.get('low'), volume=data.get('volume'))]
+    if message_type == 'signal':
+        return [Signal(**data)]
+    if message_type == 'order':
+        return [Order(**data)]
+    if message_type == 'execution':
+        return [Execution(**data)]
+    if message_type == 'cancel':
+        return [OrderCancel(**data)]
+    raise ValueError(f"Unknown message type: {message_type}")
+
+
+# --- binary ---
+
+def _pack_str(value: str) -> bytes:
+    raw = value.encode('utf-8')
+    if len(raw) > 0xFF:
+        raise ValueError(f"String too long for binary encoding: {value[:20]}...")
+    return bytes((len(raw),)) + raw
+
+
+def _unpack_str(payload: bytes, pos: int):
+    length = payload[pos]
+    start = pos + 1
+    return payload[start:start + length].decode('utf-8'), start + length
+
+
+def _opt_float(value):
+    return math.nan if value is None else value
+
+
+def _from_opt_float(value):
+    return None if math.isnan(value) else value
+
+
+def _header(message_type: int, count: int, origin_ns: Optional[int]) -> bytes:
+    if origin_ns is None:
+        return HEADER.pack(MAGIC, VERSION, message_type, count)
+    return HEADER.pack(MAGIC, VERSION_ORIGIN, message_type, count) + ORIGIN.pack(origin_ns)
+
+
+def _encode_tick_frame(ticks: List[Tick], origin_ns: Optional[int] = None) -> bytes:
+    symbols = {}
+    records = []
+    for tick in ticks:
+        index = symbols.setdefault(tick.symbol, len(symbols))
+        records.append(TICK_RECORD.pack(
+            index, tick.timestamp, tick.price,
+            _opt_float(tick.open_price), _opt_float(tick.high_price), _opt_float(tick.low_price),
+            -1 if tick.volume is None else tick.volume
+        ))
+
+    parts = [_header(MSG_TICKS, len(records), origin_ns), struct.pack('<H', len(symbols))]
+    parts.extend(_pack_str(symbol) for symbol in symbols)
+    parts.extend(records)
+    return b''.join(parts)
+
+
+def _decode_tick_frame(payload: bytes, pos: int, count: int) -> List[Tick]:
+    (n_symbols,) = struct.unpack_from('<H', payload, pos)
+    pos += 2
+    symbols = []
+    for _ in range(n_symbols):
+        symbol, pos = _unpack_str(payload, pos)
+        symbols.append(symbol)
+
+    if len(payload) - pos < count * TICK_RECORD.size:
+        raise ValueError(f"Tick frame holds {(len(payload) - pos) // TICK_RECORD.size} of its {count} records")
+
+    ticks = []
+    for index, timestamp, price, open_price, high_price, low_price, volume in TICK_RECORD.iter_unpack(
+            payload[pos:pos + count * TICK_RECORD.size]):
+        ticks.append(Tick(
+            symbol=symbols[index],
+            price=price,
+            timestamp=timestamp,
+            open_price=_from_opt_float(open_price),
+            high_price=_from_opt_float(high_price),
+            low_price=_from_opt_float(low_price),
+            volume=None if volume < 0 else volume
+        ))
+    return ticks
+
+
+def _encode_binary(obj, origin_ns: Optional[int] = None) -> bytes:
+    if isinstance(obj, Signal):
+        data = json.dumps(obj.data).encode('utf-8') if obj.data else b''
+        return b''.join((
+            _header(MSG_SIGNAL, 1, origin_ns),
+            _pack_str(obj.symbol),
+            SIGNAL_RECORD.pack(SIDE_CODES[obj.signal], obj.timestamp),
+            struct.pack('<I', len(data)),
+            data
+        ))
+    if isinstance(obj, Order):
+        return b''.join((
+            _header(MSG_ORDER, 1, origin_ns),
+            _pack_str(obj.id),
+            _pack_str(obj.symbol),
+            ORDER_RECORD.pack(SIDE_CODES[obj.side], ORDER_TYPE_CODES[obj.order_type],
+                              obj.quantity, obj.timestamp, _opt_float(obj.price))
+        ))
+    if isinstance(obj, Execution):
+        return b''.join((
+            _header(MSG_EXECUTION, 1, origin_ns),
+            _pack_str(obj.order_id),
+            _pack_str(obj.symbol),
+            EXECUTION_RECORD.pack(SIDE_CODES[obj.side], obj.quantity, obj.price, obj.timestamp, obj.pnl)
+        ))
+    if isinstance(obj, OrderCancel):
+        return _header(MSG_CANCEL, 1, origin_ns) + _pack_str(obj.order_id)
+    raise TypeError(f"Cannot encode {type(obj).__name__}")
+
+
+def _decode_binary(payload: bytes) -> Tuple[list, Optional[int]]:
+    magic, version, message_type, count = HEADER.unpack_from(payload)
+    pos = HEADER.size
+    if version == VERSION:
+        origin_ns = None
+    elif version == VERSION_ORIGIN:
+        (origin_ns,) = ORIGIN.unpack_from(payload, pos)
+        pos += ORIGIN.size
+    else:
+        raise ValueError(f"Unsupported binary message version: {version}")
+    return _decode_binary_body(payload, pos, message_type, count), origin_ns
+
+
+def _decode_binary_body(payload: bytes, pos: int, message_type: int, count: int) -> list:
+    if message_type == MSG_TICKS:
+        return _decode_tick_frame(payload, pos, count)
+
+    if message_type == MSG_SIGNAL:
+        symbol, pos = _unpack_str(payload, pos)
+        side, timestamp = SIGNAL_RECORD.unpack_from(payload, pos)
+        pos += SIGNAL_RECORD.size
+        (length,) = struct.unpack_from('<I', payload, pos)
+        pos += 4
+        data = json.loads(payload[pos:pos + length]) if length else {}
+        return [Signal(symbol=symbol, signal=SIDE_NAMES[side], timestamp=timestamp, data=data)]
+
+    if message_type == MSG_ORDER:
+        order_id, pos = _unpack_str(payload, pos)
+        symbol, pos = _unpack_str(payload, pos)
+        side, order_type, quantity, timestamp, price = ORDER_RECORD.unpack_from(payload, pos)
+        return [Order(symbol=symbol, side=SIDE_NAMES[side], quantity=quantity, id=order_id,
+                      timestamp=timestamp, order_type=ORDER_TYPE_NAMES[order_type],
+                      price=_from_opt_float(price))]
+
+    if message_type == MSG_EXECUTION:
+        order_id, pos = _unpack_str(payload, pos)
+        symbol, pos = _unpack_str(payload, pos)
+        side, quantity, price, timestamp, pnl = EXECUTION_RECORD.unpack_from(payload, pos)
+        return [Execution(order_id=order_id, symbol=symbol, side=SIDE_NAMES[side], quantity=quantity,
+                          price=price, timestamp=timestamp, pnl=pnl)]
+
+    if message_type == MSG_CANCEL:
+        order_id, pos = _unpack_str(payload, pos)
+        return [OrderCancel(order_id=order_id)]
+
+    raise ValueError(f"Unknown binary message type: {message_type}")
+
+
+# --- public API ---
+
+def encode_ticks(ticks: Iterable[Tick], fmt: str = FORMAT_JSON, frame_size: int = 256,
+                 stamp_origin: bool = False) -> Iterator[Payload]:
+    """
+    Encode ticks as messages for MARKET_DATA_CHANNEL
+
+    Args:
+        ticks: Ticks to encode, in publish order
+        fmt: FORMAT_JSON (one message per tick) or FORMAT_BINARY
+        frame_size: Ticks per binary frame, ignored for JSON
+        stamp_origin: Stamp each message with the wall-clock time it is encoded as its origin_ns
+
+    Yields:
+        One payload per message
+    """
+    if fmt == FORMAT_JSON:
+        for tick in ticks:
+            data = tick_to_dict(tick)
+            if stamp_origin:
+                data['origin_ns'] = time.time_ns()
+            yield json.dumps(data)
+        return
+
+    frame_size = min(max(1, frame_size), MAX_FRAME_TICKS)
+    frame = []
+    for tick in ticks:
+        frame.append(tick)
+        if len(frame) >= frame_size:
+            yield _encode_tick_frame(frame, time.time_ns() if stamp_origin else None)
+            frame = []
+    if frame:
+        yield _encode_tick_frame(frame, time.time_ns() if stamp_origin else None)
+
+
+def encode_message(obj: Union[Tick, Signal, Order, OrderCancel, Execution], fmt: str = FORMAT_JSON,
+                   origin_ns: Optional[int] = None) -> Payload:
+    """Encode a single tick, signal, order, cancel or execution, optionally carrying origin_ns"""
+    if isinstance(obj, Tick):
+        if fmt == FORMAT_BINARY:
+            return _encode_tick_frame([obj], origin_ns)
+        data = tick_to_dict(obj)
+        if origin_ns is not None:
+            data['origin_ns'] = origin_ns
+        return json.dumps(data)
+    if fmt == FORMAT_BINARY:
+        return _encode_binary(obj, origin_ns)
+    if isinstance(obj, Signal):
+        return _to_json('signal', obj, origin_ns)
+    if isinstance(obj, Order):
+        return _to_json('order', obj, origin_ns)
+    if isinstance(obj, Execution):
+        return _to_json('execution', obj, origin_ns)
+    if isinstance(obj, OrderCancel):
+        return _to_json('cancel', obj, origin_ns)
+    raise TypeError(f"Cannot encode {type(obj).__name__}")
+
+
+def decode_envelope(payload: Payload) -> Tuple[list, Optional[int]]:
+    """
+    Decode a message in either format along with its origin
+
+    Returns:
+        (model objects, origin_ns or None if the message carries none)
+    """
+    if isinstance(payload, bytes) and payload[:2] == MAGIC:
+        try:
+            return _decode_binary(payload)
+        except (struct.error, IndexError) as e:
+            # truncated or corrupt frame, reported like any other undecodable message
+            raise ValueError(f"Malformed binary message: {str(e)}") from e
+    data = json.loads(payload)
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+    origin_ns = data.get('origin_ns')
+    return _from_json(data), origin_ns
+
+
+def decode_message(payload: Payload) -> list:
+    """
+    Decode a message in either format
+
+    Returns:
+        List of model objects, several for a binary tick frame, otherwise one
+    """
+    return decode_envelope(payload)[0]
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+from .live_feed import AlphaVantageDataFeed
+
+logger = logging.getLogger('async_live_feed')
+
+# Alpha Vantage answers with a 200 carrying one of these keys when it will not
+# serve a request; only the per-minute throttle is worth retrying, premium-only
+# endpoints and a used-up daily quota are not going to succeed this run
+RATE_LIMIT_KEYS = ("Note", "Information")
+PER_MINUTE_WORDING = ("per minute", "call frequency")
+
+
+def _throttle_message(data):
+    """The Note or Information message of a response, None if it has neither"""
+    for key in RATE_LIMIT_KEYS:
+        if key in data:
+            return str(data[key])
+    return None
+
+
+def _is_per_minute_throttle(message: str) -> bool:
+    message = message.lower()
+    return any(wording in message for wording in PER_MINUTE_WORDING)
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter shared by every request of a feed
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Waiters
+    are served in arrival order. pause() lets a 429 hold back all requests,
+    not just the one that was rejected.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Withhold tokens for `seconds` so every pending request backs off
+
+        Pauses do not add up: several requests rejected at once still back
+        off for `seconds`, not once per rejection.
+        """
+        self._refill()
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class AsyncAlphaVantageDataFeed(AlphaVantageDataFeed):
+    """
+    Alpha Vantage feed that fetches symbols concurrently with asyncio
+
+    All requests share one token bucket sized to the API quota and one pooled
+    aiohttp session. Rate-limited symbols are retried after a back-off instead
+    of being dropped.
+    """
+
+    def __init__(self, symbols=None, api_key=None, base_url=None, watermarks=None, requests_per_minute=75,
+                 burst=5, max_concurrency=8, max_retries=5, timeout=30):
+        """
+        Initialize the async Alpha Vantage data feed
+
+        Args:
+            symbols: List of stock symbols to track
+            api_key: Alpha Vantage API key
+            base_url: API endpoint, defaults to the public Alpha Vantage URL
+            watermarks: Optional WatermarkStore, see AlphaVantageDataFeed
+            requests_per_minute: API quota shared by all requests
+            burst: Requests allowed back-to-back before the quota rate applies
+            max_concurrency: Maximum requests in flight (also the connection pool size)
+            max_retries: Attempts per symbol after rate limiting or connection errors
+            timeout: Total seconds allowed per request
+        """
+        super().__init__(symbols=symbols, api_key=api_key, base_url=base_url, watermarks=watermarks)
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+    def _retry_delay(self, attempt):
+        return min(self.backoff_time * (2 ** attempt), self.max_backoff)
+
+    async def get_daily_data_async(self, session, limiter, semaphore, symbol, outputsize='compact'):
+        params = self.daily_params(symbol, outputsize)
+
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire()
+            try:
+                async with semaphore:
+                    logger.info(f"Fetching {outputsize} data for {symbol}")
+                    async with session.get(self.base_url, params=params) as response:
+                        status = response.status
+                        body = await response.text()
+                        data = await response.json(content_type=None) if status == 200 else None
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                wait_time = self._retry_delay(attempt)
+                logger.warning(f"Error fetching data for {symbol}: {str(e)}. Retrying in {wait_time} seconds.")
+                await asyncio.sleep(wait_time)
+                continue
+
+            message = _throttle_message(data) if isinstance(data, dict) else None
+            if message is not None and not _is_per_minute_throttle(message):
+                logger.error(f"Alpha Vantage refused {symbol}: {message}")
+                return None
+
+            if status == 429 or message is not None:
+                wait_time = self._retry_delay(attempt)
+                logger.warning(f"Rate limited on {symbol}. Retrying in {wait_time} seconds.")
+                limiter.pause(wait_time)
+                continue
+
+            if status != 200:
+                logger.error(f"API request failed with status code {status}: {body}")
+                return None
+
+            return self.validate_daily_data(data)
+
+        logger.error(f"Giving up on {symbol} after {self.max_retries + 1} attempts")
+        return None
+
+    async def fetch_data_async(self):
+        """
+        Fetch every symbol concurrently
+
+        Returns:
+            Dictionary of symbol -> list of Tick objects, in self.symbols order
+        """
+        limiter = TokenBucket(self.requests_per_minute / 60.0, self.burst)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            results = await asyncio.gather(*(
+                self.get_daily_data_async(session, limiter, semaphore, symbol) for symbol in self.symbols
+            ))
+
+            fetched = {}
+            for symbol, data in zip(self.symbols, results):
+                if not data:
+                    logger.warning(f"No data available for {symbol}")
+                    continue
+                fetched[symbol] = self.process_daily_data(data, symbol)
+
+            # second round only for symbols whose compact window leaves a gap
+            gaps = [symbol for symbol, ticks in fetched.items() if self.needs_backfill(symbol, ticks)]
+            if gaps:
+                logger.info(f"Fetching full history to fill gaps for {', '.join(gaps)}")
+                full_results = await asyncio.gather(*(
+                    self.get_daily_data_async(session, limiter, semaphore, symbol, 'full') for symbol in gaps
+                ))
+                for symbol, data in zip(gaps, full_results):
+                    full_ticks = self.process_daily_data(data, symbol) if data else []
+                    if full_ticks:
+                        fetched[symbol] = full_ticks
+                    else:
+                        # publishing the compact window would move the watermark past the gap for good
+                        logger.error(f"Backfill for {symbol} failed, skipping it this run and keeping its watermark")
+                        del fetched[symbol]
+
+        all_ticks = {}
+        for symbol, ticks in fetched.items():
+            if not ticks:
+                logger.warning(f"No ticks extracted for {symbol}")
+                continue
+
+            ticks = self.new_ticks(symbol, ticks)
+            if not ticks:
+                logger.info(f"No new ticks for {symbol} since last publish")
+                continue
+
+            logger.info(f"Processed {len(ticks)} ticks for {symbol}")
+            all_ticks[symbol] = ticks
+
+        return all_ticks
+
+    def fetch_data(self):
+        return asyncio.run(self.fetch_data_async())
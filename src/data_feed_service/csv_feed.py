@@ -1,8 +1,17 @@
 import csv
 import os
+import heapq
 import logging
+from array import array
+from operator import attrgetter
+from typing import Dict, Iterator
 from datetime import datetime
+from functools import lru_cache
+from multiprocessing import Pool
+from src.common.metrics import metrics
 from src.common.models import Tick
+from src.common.tick_columns import TickColumns
+from .tick_cache import TickCache, from_records, to_records
 
 # Configure logging
 logging.basicConfig(
@@ -11,6 +20,86 @@ logging.basicConfig(
 )
 logger = logging.getLogger('csv_feed')
 
+@lru_cache(maxsize=1 << 16)
+def parse_date_timestamp(date_str):
+    """
+    Convert a '%Y-%m-%d' date string to a local-time Unix timestamp
+
+    Fixed-width dates are built directly instead of going through strptime,
+    and results are cached since every symbol shares the same trading days.
+    Anything else falls back to strptime so accepted input is unchanged.
+    """
+    if (len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-'
+            and date_str[:4].isdigit() and date_str[5:7].isdigit() and date_str[8:].isdigit()):
+        date_obj = datetime(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:]))
+    else:
+        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+    return int(date_obj.timestamp())
+
+# bytes read per step when walking a file backwards
+REVERSE_BLOCK_SIZE = 1 << 16
+
+def reverse_lines(f, start=0, block_size=REVERSE_BLOCK_SIZE):
+    """
+    Yield the lines of a binary file from last to first, without the newline
+
+    Only the bytes from offset start onward are read, one block at a time,
+    so memory stays bounded by the block size and the longest line.
+    """
+    f.seek(0, os.SEEK_END)
+    pos = f.tell()
+    tail = b''
+    while pos > start:
+        size = min(block_size, pos - start)
+        pos -= size
+        f.seek(pos)
+        lines = (f.read(size) + tail).split(b'\n')
+        tail = lines[0]  # may continue in the previous block
+        for line in reversed(lines[1:]):
+            yield line
+    yield tail
+
+def _row_values(row, columns):
+    # (timestamp, open, high, low, close, volume) for one csv row
+    return (
+        parse_date_timestamp(row[columns['date']]),
+        float(row[columns['open']]),
+        float(row[columns['high']]),
+        float(row[columns['low']]),
+        float(row[columns['close']]),
+        int(row[columns['volume']])
+    )
+
+class _RecordCollector(logging.Handler):
+    """Keeps log records so a pool worker can hand them back to the parent"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        # format now: args and tracebacks may not pickle
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        self.records.append(record)
+
+def _load_in_worker(task):
+    # parse one file in a pool worker, returns (symbol, TICK_DTYPE records, log records)
+    symbol, file_path, cache_dir = task
+    loggers = [logger, logging.getLogger('tick_cache')]
+    collector = _RecordCollector()
+    for log in loggers:
+        log.addHandler(collector)
+        log.propagate = False
+    try:
+        columns = CSVDataFeed(columnar=True, cache_dir=cache_dir).load_columns(symbol, file_path)
+    finally:
+        for log in loggers:
+            log.removeHandler(collector)
+            log.propagate = True
+    return symbol, to_records(columns), collector.records
+
 class CSVDataFeed:
     """
     Data feed that reads historical data from CSV files for backtesting
@@ -19,15 +108,24 @@ class CSVDataFeed:
     2025-08-29,245.23,245.46,241.72,243.49,2967558
     """
     
-    def __init__(self, csv_files=None):
+    def __init__(self, csv_files=None, columnar=False, cache_dir=None, workers=1):
         """
         Initialize the CSV data feed
         
         Args:
             csv_files: Dict mapping symbol to CSV file path
                        e.g. {'IBM': 'data/IBM.csv'}
+            columnar: If True, fetch_data returns TickColumns (typed arrays)
+                      per symbol instead of lists of Tick objects
+            cache_dir: Directory for the binary tick cache. When set, CSVs are
+                       parsed once and memory-mapped on later runs (implies columnar)
+            workers: Processes fetch_data parses files with, 1 reads them in
+                     this process, None uses every core
         """
         self.csv_files = csv_files or {}
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.cache = TickCache(cache_dir) if cache_dir else None
+        self.columnar = columnar or self.cache is not None
         
     def read_csv_data(self, symbol, file_path):
         """
@@ -81,17 +179,235 @@ class CSVDataFeed:
             logger.error(f"Error reading CSV file {file_path}: {str(e)}")
             return ticks
             
+    def read_csv_columns(self, symbol, file_path):
+        """
+        Read historical data from a CSV file straight into typed arrays
+        
+        Args:
+            symbol: Stock symbol (e.g., 'IBM')
+            file_path: Path to the CSV file
+            
+        Returns:
+            TickColumns sorted by timestamp, Tick objects are built on access
+        """
+        if not os.path.exists(file_path):
+            logger.error(f"CSV file not found: {file_path}")
+            return TickColumns.empty(symbol)
+
+        timestamps, volumes = array('q'), array('q')
+        opens, highs, lows, closes = array('d'), array('d'), array('d'), array('d')
+
+        try:
+            with open(file_path, 'r', newline='') as csvfile:
+                reader = csv.reader(csvfile)
+                header = next(reader, None)
+                if header is None:
+                    return TickColumns.empty(symbol)
+                columns = {name: i for i, name in enumerate(header)}
+
+                for row in reader:
+                    if not row:
+                        continue
+                    try:
+                        # parse the whole row before appending so columns stay aligned
+                        values = _row_values(row, columns)
+                    except (KeyError, ValueError, IndexError) as e:
+                        logger.warning(f"Error processing row {dict(zip(header, row))}: {str(e)}")
+                        continue
+
+                    timestamps.append(values[0])
+                    opens.append(values[1])
+                    highs.append(values[2])
+                    lows.append(values[3])
+                    closes.append(values[4])
+                    volumes.append(values[5])
+
+        except Exception as e:
+            logger.error(f"Error reading CSV file {file_path}: {str(e)}")
+
+        # the sort is skipped when the file is already in ascending order
+        return TickColumns(symbol, timestamps, opens, highs, lows, closes, volumes).sorted()
+
+    def load_columns(self, symbol, file_path):
+        """
+        Columnar read that goes through the binary tick cache when one is configured
+        
+        Returns:
+            TickColumns, memory-mapped from the cache if it is current
+        """
+        if self.cache is None or not os.path.exists(file_path):
+            return self.read_csv_columns(symbol, file_path)
+
+        columns = self.cache.load(symbol, file_path)
+        if columns is not None:
+            logger.debug(f"Loaded {len(columns)} ticks for {symbol} from tick cache")
+            return columns
+
+        stamp = TickCache.source_stamp(file_path)
+        columns = self.read_csv_columns(symbol, file_path)
+        if len(columns):
+            self.cache.store(columns, file_path, stamp)
+        return columns
+
+    def iter_ticks(self, symbol, file_path, chunk_size=1024):
+        """
+        Lazily yield the ticks of one CSV file in ascending timestamp order
+        
+        The file is read forwards when it is ascending and backwards, block
+        by block, when it is descending (as Alpha Vantage exports are), so
+        memory stays constant however large the file is. Rows are parsed
+        chunk_size at a time ahead of the consumer. A current tick cache entry
+        is streamed from its memory map instead.
+        
+        Rows out of order for the file's direction cannot be sorted in
+        constant memory and are skipped with a warning; use fetch_data for
+        unsorted files.
+        
+        Args:
+            symbol: Stock symbol (e.g., 'IBM')
+            file_path: Path to the CSV file
+            chunk_size: Ticks parsed per read-ahead step
+            
+        Yields:
+            Tick objects
+        """
+        if not os.path.exists(file_path):
+            logger.error(f"CSV file not found: {file_path}")
+            return
+
+        if self.cache is not None:
+            columns = self.cache.load(symbol, file_path)
+            if columns is not None:
+                yield from columns
+                return
+
+        try:
+            with open(file_path, 'rb') as csvfile:
+                header = next(csv.reader([csvfile.readline().decode('utf-8')]), None)
+                if not header:
+                    return
+                columns = {name: i for i, name in enumerate(header)}
+                data_start = csvfile.tell()
+
+                lines = self._data_lines(csvfile, data_start, columns)
+                reader = csv.reader(line.rstrip(b'\r\n').decode('utf-8') for line in lines if line.strip())
+
+                chunk = []
+                last = None
+                for row in reader:
+                    try:
+                        timestamp, open_price, high, low, close, volume = _row_values(row, columns)
+                    except (KeyError, ValueError, IndexError) as e:
+                        logger.warning(f"Error processing row {dict(zip(header, row))}: {str(e)}")
+                        continue
+
+                    if last is not None and timestamp < last:
+                        logger.warning(f"Skipping out of order row in {file_path}: {dict(zip(header, row))}")
+                        continue
+                    last = timestamp
+
+                    chunk.append(Tick(symbol=symbol, price=close, timestamp=timestamp, open_price=open_price,
+                                      high_price=high, low_price=low, volume=volume))
+                    if len(chunk) >= chunk_size:
+                        yield from chunk
+                        chunk = []
+                yield from chunk
+
+        except OSError:
+            # e.g. too many open files while stream() merges every symbol: fail
+            # loudly rather than drop the symbol from the stream
+            raise
+        except Exception as e:
+            logger.error(f"Error reading CSV file {file_path}: {str(e)}")
+
+    def _data_lines(self, csvfile, data_start, columns):
+        # data lines in ascending order: compare the first and last dates to
+        # find the file's direction, then read it forwards or backwards
+        first = next((line for line in csvfile if line.strip()), None)
+        last = next((line for line in reverse_lines(csvfile, data_start) if line.strip()), None)
+
+        descending = False
+        if first is not None and last is not None:
+            try:
+                date = columns['date']
+                first_row = next(csv.reader([first.decode('utf-8')]))
+                last_row = next(csv.reader([last.decode('utf-8')]))
+                descending = parse_date_timestamp(first_row[date]) > parse_date_timestamp(last_row[date])
+            except (KeyError, ValueError, IndexError):
+                pass  # bad rows are reported while streaming
+
+        if descending:
+            return reverse_lines(csvfile, data_start)
+        csvfile.seek(data_start)
+        return csvfile
+
+    def stream_by_symbol(self, chunk_size=1024) -> Dict[str, Iterator[Tick]]:
+        """
+        Per-symbol lazy tick iterators; no file is opened until its iterator is
+        
+        Returns:
+            Dictionary of symbol -> iterator of ticks in timestamp order
+        """
+        return {symbol: self.iter_ticks(symbol, file_path, chunk_size)
+                for symbol, file_path in self.csv_files.items()}
+
+    def stream(self, chunk_size=1024) -> Iterator[Tick]:
+        """
+        All symbols merged into one timestamp-ordered stream, in constant memory
+        
+        Ticks sharing a timestamp come out in csv_files order. The first tick
+        is available once every file has produced its first chunk.
+
+        Every symbol's CSV file stays open for the whole merge, so this needs
+        one file descriptor per symbol (see ulimit -n). Past the limit the
+        OSError propagates instead of the symbol silently dropping out; use
+        fetch_data, which reads one file at a time, for very large universes.
+        """
+        return heapq.merge(*self.stream_by_symbol(chunk_size).values(), key=attrgetter('timestamp'))
+
+    def _load_parallel(self):
+        """
+        Parse files across a process pool, yielding (symbol, ticks) in csv_files order
+        
+        Workers send back one packed record array per file instead of pickled
+        Tick lists, and the warnings they logged are re-emitted here, in file
+        order, as each file's result arrives.
+        """
+        tasks = [(symbol, path, self.cache.cache_dir if self.cache else None)
+                 for symbol, path in self.csv_files.items()]
+        workers = min(self.workers, len(tasks))
+
+        with Pool(processes=workers) as pool:
+            for symbol, records, log_records in pool.imap(_load_in_worker, tasks):
+                for record in log_records:
+                    logging.getLogger(record.name).handle(record)
+
+                columns = from_records(symbol, records)
+                yield symbol, columns if self.columnar else columns.to_ticks()
+
+    def _load_sequential(self):
+        read = self.load_columns if self.columnar else self.read_csv_data
+        for symbol, path in self.csv_files.items():
+            with metrics.timer('feed.parse'):
+                ticks = read(symbol, path)
+            yield symbol, ticks
+
     def fetch_data(self):
         """
         Fetch and process data from all configured CSV files
         
         Returns:
-            Dictionary of symbol -> list of Tick objects
+            Dictionary of symbol -> list of Tick objects (TickColumns in columnar mode)
         """
         all_ticks = {}
+        if self.workers > 1 and len(self.csv_files) > 1:
+            loaded = self._load_parallel()
+        else:
+            loaded = self._load_sequential()
         
-        for symbol, file_path in self.csv_files.items():
-            ticks = self.read_csv_data(symbol, file_path)
+        for symbol, ticks in loaded:
+            file_path = self.csv_files[symbol]
+            metrics.incr('feed.ticks_parsed', len(ticks))
             
             if not ticks:
                 logger.warning(f"No ticks extracted for {symbol} from {file_path}")
@@ -1,9 +1,11 @@
 import os
 import time
 import logging
+from bisect import bisect_right
 from datetime import datetime
 import requests
 from dotenv import load_dotenv
+from src.common.metrics import metrics
 from src.common.models import Tick
 
 logging.basicConfig(
@@ -19,33 +21,53 @@ API_KEY = os.getenv('ALPHA_VANTAGE_API_KEY')
 BASE_URL = 'https://www.alphavantage.co/query'
 
 class AlphaVantageDataFeed:
-    def __init__(self, symbols=None, api_key=None):
+    def __init__(self, symbols=None, api_key=None, base_url=None, watermarks=None):
         """
         Initialize the Alpha Vantage data feed
         
         Args:
             symbols: List of stock symbols to track
             api_key: Alpha Vantage API key
+            base_url: API endpoint, defaults to the public Alpha Vantage URL
+            watermarks: Optional WatermarkStore. When set, fetch_data only
+                        returns ticks newer than each symbol's last published tick
         """
         self.api_key = api_key or API_KEY
         if not self.api_key:
             raise ValueError("Alpha Vantage API key is required")
             
         self.symbols = symbols or ['IBM']
+        self.base_url = base_url or BASE_URL
+        self.watermarks = watermarks
         self.backoff_time = 5  
         self.max_backoff = 60  
 
-    def get_daily_data(self, symbol):
-        params = {
+    def daily_params(self, symbol, outputsize='compact'):
+        return {
             'function': 'TIME_SERIES_DAILY',
             'symbol': symbol,
-            'outputsize': 'compact',  # Get the latest 100 data points
+            'outputsize': outputsize,  # compact is the latest 100 data points, full is the whole history
             'apikey': self.api_key
         }
 
+    def validate_daily_data(self, data):
+        """Return data if it is a usable daily time series response, else log and return None"""
+        if "Error Message" in data:
+            logger.error(f"API returned an error: {data['Error Message']}")
+            return None
+            
+        if "Time Series (Daily)" not in data:
+            logger.error(f"Unexpected response format: {data}")
+            return None
+            
+        return data
+
+    def get_daily_data(self, symbol, outputsize='compact'):
+        params = self.daily_params(symbol, outputsize)
+
         try:
-            logger.info(f"Fetching data for {symbol}")
-            response = requests.get(BASE_URL, params=params)
+            logger.info(f"Fetching {outputsize} data for {symbol}")
+            response = requests.get(self.base_url, params=params)
             
             # Handle rate limiting
             if response.status_code == 429:
@@ -62,18 +84,8 @@ class AlphaVantageDataFeed:
                 logger.error(f"API request failed with status code {response.status_code}: {response.text}")
                 return None
                 
-            data = response.json()
-            
             # Validate the response structure
-            if "Error Message" in data:
-                logger.error(f"API returned an error: {data['Error Message']}")
-                return None
-                
-            if "Time Series (Daily)" not in data:
-                logger.error(f"Unexpected response format: {data}")
-                return None
-                
-            return data
+            return self.validate_daily_data(response.json())
             
         except Exception as e:
             logger.error(f"Error fetching data for {symbol}: {str(e)}")
@@ -96,6 +108,8 @@ class AlphaVantageDataFeed:
             return ticks
             
         time_series = data["Time Series (Daily)"]
+        timed = metrics.enabled
+        start = time.perf_counter_ns() if timed else 0
         
         for date_str, values in time_series.items():
             # Convert date string to timestamp
@@ -128,8 +142,39 @@ class AlphaVantageDataFeed:
                 
         # Sort by timestamp (ascending)
         ticks.sort(key=lambda x: x.timestamp)
+        if timed:
+            metrics.observe('feed.parse', time.perf_counter_ns() - start)
+            metrics.incr('feed.ticks_parsed', len(ticks))
         return ticks
     
+    def needs_backfill(self, symbol, ticks):
+        """
+        True if the compact window starts after the symbol's watermark, meaning
+        bars between the last published tick and the window could be missing
+        """
+        if self.watermarks is None or not ticks:
+            return False
+        mark = self.watermarks.get(symbol)
+        return mark is not None and ticks[0].timestamp > mark
+
+    def new_ticks(self, symbol, ticks):
+        """Ticks strictly newer than the symbol's watermark (all of them if it has none)"""
+        if self.watermarks is None:
+            return ticks
+        mark = self.watermarks.get(symbol)
+        if mark is None:
+            return ticks
+        return ticks[bisect_right(ticks, mark, key=lambda t: t.timestamp):]
+
+    def commit_watermarks(self, ticks_dict):
+        """Record the newest tick of each symbol as published and persist the marks"""
+        if self.watermarks is None:
+            return
+        for symbol, ticks in ticks_dict.items():
+            if len(ticks):
+                self.watermarks.advance(symbol, ticks[-1].timestamp)
+        self.watermarks.save()
+
     def fetch_data(self):
         all_ticks = {}
         
@@ -140,10 +185,25 @@ class AlphaVantageDataFeed:
                 continue
                 
             ticks = self.process_daily_data(data, symbol)
-            
+
+            if self.needs_backfill(symbol, ticks):
+                logger.info(f"Gap since last published tick for {symbol}, fetching full history")
+                full_data = self.get_daily_data(symbol, outputsize='full')
+                full_ticks = self.process_daily_data(full_data, symbol) if full_data else []
+                if not full_ticks:
+                    # publishing the compact window would move the watermark past the gap for good
+                    logger.error(f"Backfill for {symbol} failed, skipping it this run and keeping its watermark")
+                    continue
+                ticks = full_ticks
+
             if not ticks:
                 logger.warning(f"No ticks extracted for {symbol}")
                 continue
+
+            ticks = self.new_ticks(symbol, ticks)
+            if not ticks:
+                logger.info(f"No new ticks for {symbol} since last publish")
+                continue
                 
             logger.info(f"Processed {len(ticks)} ticks for {symbol}")
             all_ticks[symbol] = ticks
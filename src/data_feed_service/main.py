@@ -1,14 +1,20 @@
 import os
-import json
 import time
 import logging
 from datetime import datetime
 import argparse
+from dataclasses import dataclass
+from typing import Mapping
 from dotenv import load_dotenv
 
 from ..common.events import MARKET_DATA_CHANNEL
+from ..common.metrics import get_metrics_file, get_metrics_port, metrics
 from ..common.redis_client import RedisClient
+from ..common.streams import TRANSPORT_STREAMS, TRANSPORTS, StreamPublisher, get_maxlen, get_shards, get_transport
+from ..common.wire import FORMATS, encode_ticks, get_message_format
 from .live_feed import AlphaVantageDataFeed
+from .async_live_feed import AsyncAlphaVantageDataFeed
+from .watermarks import WatermarkStore
 from .csv_feed import CSVDataFeed
 
 logging.basicConfig(
@@ -19,28 +25,106 @@ logger = logging.getLogger('data_feed_service')
 
 load_dotenv()
 
-def publish_ticks_to_redis(ticks_dict, redis_client=None): 
+@dataclass
+class PublishStats:
+    """Throughput of one publish_ticks_to_redis call"""
+    ticks: int = 0
+    messages: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / self.elapsed if self.elapsed > 0 else 0.0
+
+def publish_ticks_to_redis(ticks_dict, redis_client=None, batch_size=1, message_format=None, frame_size=256,
+                           streams=None): 
+    """
+    Publish ticks to MARKET_DATA_CHANNEL
+
+    Args:
+        ticks_dict: Dictionary of symbol -> list of Tick objects, or an
+                    iterable of ticks already in publish order (e.g. CSVDataFeed.stream())
+        redis_client: Redis client, defaults to RedisClient.get_instance()
+        batch_size: Messages sent per pipeline round-trip, 1 publishes each
+                    message on its own like a plain PUBLISH loop
+        message_format: 'json' or 'binary', defaults to the MESSAGE_FORMAT setting
+        frame_size: Ticks per message in binary format
+        streams: StreamPublisher to XADD to the sharded market data streams
+                 instead of publishing on the channel
+
+    Returns:
+        PublishStats with tick/message/batch counts and throughput
+    """
     if not redis_client: 
         redis_client = RedisClient.get_instance()
 
-    for symbol, ticks in ticks_dict.items(): 
-        for tick in ticks: 
-            tick_data = {
-                'type': 'tick',
-                'symbol': tick.symbol,
-                'price': tick.price,
-                'timestamp': tick.timestamp,
-                'date': datetime.fromtimestamp(tick.timestamp).strftime('%Y-%m-%d'),
-                'open': tick.open_price,
-                'high': tick.high_price,
-                'low': tick.low_price,
-                'volume': tick.volume
-            }
-
-            message = json.dumps(tick_data)
-            redis_client.publish(MARKET_DATA_CHANNEL, message)
+    message_format = message_format or get_message_format()
+    batch_size = max(1, batch_size)
+    debug = logger.isEnabledFor(logging.DEBUG)
+    timed = metrics.enabled
+    stats = PublishStats()
+    start = time.perf_counter()
+
+    # transaction=False: a plain pipeline, no MULTI/EXEC wrapping
+    sender = redis_client.pipeline(transaction=False) if batch_size > 1 else redis_client
+    pending = 0
+
+    sources = ticks_dict.values() if isinstance(ticks_dict, Mapping) else (ticks_dict,)
+
+    def all_ticks():
+        for ticks in sources:
+            for tick in ticks:
+                stats.ticks += 1
+                yield tick
+
+    if streams is not None:
+        messages = streams.encode_ticks(all_ticks(), message_format, frame_size, stamp_origin=timed)
+    else:
+        messages = ((MARKET_DATA_CHANNEL, m)
+                    for m in encode_ticks(all_ticks(), message_format, frame_size, stamp_origin=timed))
+
+    sent = time.perf_counter_ns() if timed else 0
+    for target, message in messages: 
+        if streams is not None:
+            streams.add(sender, target, message)
+        else:
+            sender.publish(target, message)
+        stats.messages += 1
+        if debug:
             logger.debug(f"Published: {message}")
 
+        if batch_size > 1:
+            pending += 1
+            if pending >= batch_size:
+                sender.execute()
+                stats.batches += 1
+                pending = 0
+        else:
+            stats.batches += 1
+        if timed and not pending:
+            # encode and round-trip time of the messages just sent
+            metrics.observe('feed.publish', time.perf_counter_ns() - sent)
+            sent = time.perf_counter_ns()
+
+    if pending:
+        sender.execute()
+        stats.batches += 1
+        if timed:
+            metrics.observe('feed.publish', time.perf_counter_ns() - sent)
+
+    metrics.incr('feed.ticks_published', stats.ticks)
+    metrics.incr('feed.messages_published', stats.messages)
+
+    stats.elapsed = time.perf_counter() - start
+    logger.info(f"Published {stats.ticks} ticks as {stats.messages} {message_format} messages in "
+                f"{stats.batches} round-trips ({stats.ticks_per_second:,.0f} ticks/s)")
+    return stats
+
 def print_ticks(ticks_dict):
     for symbol, ticks in ticks_dict.items():
         logger.info(f"Data for {symbol} ({len(ticks)} data points):")
@@ -60,14 +144,60 @@ def main():
         help='Publish data to Redis (default is just print to console)')
     parser.add_argument('--symbols', type=str, default='IBM,AAPL,MSFT',
         help='Comma-separated list of stock symbols to fetch data for')
+    parser.add_argument('--async-fetch', action='store_true',
+        help='Fetch live symbols concurrently under a shared rate limit')
+    parser.add_argument('--requests-per-minute', type=int,
+        default=int(os.getenv('ALPHA_VANTAGE_REQUESTS_PER_MINUTE', 75)),
+        help='Alpha Vantage quota used by --async-fetch')
+    parser.add_argument('--incremental', action='store_true',
+        help='Only emit live ticks newer than the last published tick per symbol')
+    parser.add_argument('--watermark-file', type=str, default=os.getenv('WATERMARK_FILE', 'data/watermarks.json'),
+        help='Local file holding the last published timestamp per symbol (--incremental)')
+    parser.add_argument('--watermarks-in-redis', action='store_true',
+        help='Also keep the --incremental watermarks in a Redis hash')
+    parser.add_argument('--batch-size', type=int, default=500,
+        help='Ticks per Redis pipeline round-trip when publishing (1 disables batching)')
+    parser.add_argument('--format', choices=FORMATS, default=None,
+        help='Wire format for published ticks (default: $MESSAGE_FORMAT, else json)')
+    parser.add_argument('--transport', choices=TRANSPORTS, default=None,
+        help='Pub/sub or Redis Streams for published ticks (default: $MESSAGE_TRANSPORT, else pubsub)')
+    parser.add_argument('--shards', type=int, default=None,
+        help='Market data stream shards with --transport streams (default: $STREAM_SHARDS, else 1)')
+    parser.add_argument('--stream', action='store_true',
+        help='In csv mode, publish ticks lazily merged across symbols in timestamp order (constant memory)')
+    parser.add_argument('--workers', type=int, default=1,
+        help='Processes used to parse CSV files in csv mode (0 uses every core)')
+    parser.add_argument('--cache-dir', type=str, default=os.getenv('TICK_CACHE_DIR'),
+        help='Directory for the binary tick cache used in csv mode (default: $TICK_CACHE_DIR, off if unset)')
+    parser.add_argument('--metrics-file', type=str, default=get_metrics_file(),
+        help='Write parse/publish metrics to this JSON file (default: $METRICS_FILE, off if unset)')
+    parser.add_argument('--metrics-port', type=int, default=get_metrics_port(),
+        help='Serve metrics for scraping on this port (default: $METRICS_PORT, off if unset)')
     args = parser.parse_args()
+    if args.stream and (args.mode != 'csv' or not args.publish):
+        parser.error("--stream requires --mode csv and --publish")
+
+    metrics.configure(args.metrics_file, args.metrics_port)
 
     symbols = [s.strip() for s in args.symbols.split(',')]
+    streams = None
+    if (args.transport or get_transport()) == TRANSPORT_STREAMS:
+        streams = StreamPublisher(shards=args.shards or get_shards(), maxlen=get_maxlen())
     all_ticks = {}
+    live_feed = None
+    live_ticks = {}
 
     if args.mode in ['live', 'both']: 
         logger.info("Fetching live data from Alpha Vantage")
-        live_feed = AlphaVantageDataFeed(symbols=symbols)
+        watermarks = None
+        if args.incremental:
+            redis_client = RedisClient.get_instance() if args.watermarks_in_redis else None
+            watermarks = WatermarkStore(path=args.watermark_file, redis_client=redis_client)
+        if args.async_fetch:
+            live_feed = AsyncAlphaVantageDataFeed(symbols=symbols, watermarks=watermarks,
+                                                  requests_per_minute=args.requests_per_minute)
+        else:
+            live_feed = AlphaVantageDataFeed(symbols=symbols, watermarks=watermarks)
         live_ticks = live_feed.fetch_data()
         all_ticks.update(live_ticks)
 
@@ -76,7 +206,13 @@ def main():
         logger.info("Reading data from CSV files...")
         csv_dir = os.getenv('CSV_DATA_DIR', 'data')
         csv_files = {symbol: f"{csv_dir}/{symbol}.csv" for symbol in symbols}
-        csv_feed = CSVDataFeed(csv_files=csv_files)
+        csv_feed = CSVDataFeed(csv_files=csv_files, cache_dir=args.cache_dir,
+                               workers=args.workers or None)
+        if args.stream:
+            logger.info("Publishing CSV ticks to Redis as they are read...")
+            publish_ticks_to_redis(csv_feed.stream(), batch_size=args.batch_size, message_format=args.format,
+                                   streams=streams)
+            return
         csv_ticks = csv_feed.fetch_data()
         all_ticks.update(csv_ticks)
     
@@ -86,8 +222,15 @@ def main():
     # Publish to Redis if requested
     if args.publish:
         logger.info("Publishing data to Redis...")
-        publish_ticks_to_redis(all_ticks)
+        publish_ticks_to_redis(all_ticks, batch_size=args.batch_size, message_format=args.format,
+                               streams=streams)
         logger.info("Data published to Redis channel")
+
+        # watermarks only move once the ticks have actually gone out
+        # (in both mode a CSV history can replace a symbol's live ticks)
+        if live_feed is not None:
+            published = {s: t for s, t in live_ticks.items() if all_ticks.get(s) is t}
+            live_feed.commit_watermarks(published)
     
 if __name__ == "__main__":
     main()
@@ -0,0 +1,137 @@
+import os
+import struct
+import logging
+from typing import Optional
+
+import numpy as np
+
+from src.common.tick_columns import TickColumns
+
+logger = logging.getLogger('tick_cache')
+
+# fixed-width little-endian record, 48 bytes per bar
+TICK_DTYPE = np.dtype([
+    ('timestamp', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<i8'),
+])
+
+CACHE_MAGIC = b'MRCTICKS'
+CACHE_VERSION = 1
+# magic, version, record size, source mtime (ns), source size, record count
+HEADER = struct.Struct('<8sIIqqq')
+HEADER_SIZE = 64  # header is padded so records start aligned
+
+
+def to_records(columns: TickColumns) -> np.ndarray:
+    """Pack columns into one TICK_DTYPE record array"""
+    records = np.empty(len(columns), dtype=TICK_DTYPE)
+    records['timestamp'] = columns.timestamps
+    records['open'] = columns.open_prices
+    records['high'] = columns.high_prices
+    records['low'] = columns.low_prices
+    records['close'] = columns.close_prices
+    records['volume'] = columns.volumes
+    return records
+
+
+def from_records(symbol: str, records: np.ndarray) -> TickColumns:
+    """TickColumns viewing the fields of a TICK_DTYPE record array, no copy"""
+    return TickColumns(
+        symbol,
+        records['timestamp'],
+        records['open'],
+        records['high'],
+        records['low'],
+        records['close'],
+        records['volume']
+    )
+
+
+class TickCache:
+    """
+    Binary on-disk tick store, one file per symbol
+
+    Each file is a small header followed by fixed-width records. Reads
+    memory-map the records, so the returned TickColumns are views into the
+    page cache and slicing a date range copies nothing. The header records the
+    source CSV's mtime and size; a mismatch means the cache is stale.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, symbol: str) -> str:
+        return os.path.join(self.cache_dir, f"{symbol}.ticks")
+
+    @staticmethod
+    def source_stamp(source_path: str):
+        """(mtime_ns, size) of the source CSV, used to detect stale caches"""
+        stat = os.stat(source_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self, symbol: str, source_path: str) -> Optional[TickColumns]:
+        """
+        Memory-map the cached ticks for symbol
+
+        Returns:
+            TickColumns backed by the cache file, or None if it is missing,
+            stale or truncated
+        """
+        path = self.path_for(symbol)
+        if not os.path.exists(path) or not os.path.exists(source_path):
+            return None
+
+        with open(path, 'rb') as f:
+            raw = f.read(HEADER.size)
+        if len(raw) < HEADER.size:
+            logger.warning(f"Ignoring truncated tick cache {path}")
+            return None
+
+        magic, version, record_size, mtime_ns, size, count = HEADER.unpack(raw)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION or record_size != TICK_DTYPE.itemsize:
+            logger.warning(f"Ignoring tick cache {path} with unknown format")
+            return None
+
+        if (mtime_ns, size) != self.source_stamp(source_path):
+            logger.info(f"Tick cache for {symbol} is stale, rebuilding from {source_path}")
+            return None
+
+        if os.path.getsize(path) < HEADER_SIZE + count * TICK_DTYPE.itemsize:
+            logger.warning(f"Ignoring truncated tick cache {path}")
+            return None
+
+        if count == 0:
+            return TickColumns.empty(symbol)
+
+        records = np.memmap(path, dtype=TICK_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+        return from_records(symbol, records)
+
+    def store(self, columns: TickColumns, source_path: str, stamp=None) -> None:
+        """
+        Write columns to the cache, stamped with the source file's mtime and size
+
+        Args:
+            columns: Parsed ticks for one symbol
+            source_path: CSV file the ticks were read from
+            stamp: source_stamp() taken before parsing, so an edit made while
+                   parsing leaves the cache stale instead of silently current
+        """
+        mtime_ns, size = stamp or self.source_stamp(source_path)
+
+        records = to_records(columns)
+
+        header = HEADER.pack(CACHE_MAGIC, CACHE_VERSION, TICK_DTYPE.itemsize, mtime_ns, size, len(columns))
+
+        # write to a temp file and rename so readers never see a half-written cache
+        path = self.path_for(columns.symbol)
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(header.ljust(HEADER_SIZE, b'\0'))
+            f.write(records.tobytes())
+        os.replace(tmp_path, path)
+        logger.debug(f"Cached {len(columns)} ticks for {columns.symbol} in {path}")
@@ -0,0 +1,84 @@
+import os
+import json
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger('watermarks')
+
+DEFAULT_REDIS_KEY = 'feed_watermarks'
+
+
+class WatermarkStore:
+    """
+    Per-symbol timestamp of the last published tick
+
+    Marks live in a local JSON file and, if a Redis client is given, in a Redis
+    hash so another host running the feed can pick them up. When both exist the
+    later timestamp wins. Marks only ever move forward.
+    """
+
+    def __init__(self, path: Optional[str] = None, redis_client=None, redis_key: str = DEFAULT_REDIS_KEY):
+        """
+        Initialize the store and load existing marks
+
+        Args:
+            path: Local JSON file holding the marks, None to skip the file
+            redis_client: Optional Redis client to mirror the marks into a hash
+            redis_key: Name of the Redis hash
+        """
+        self.path = path
+        self.redis_client = redis_client
+        self.redis_key = redis_key
+        self._marks: Dict[str, int] = {}
+        self.load()
+
+    def load(self) -> None:
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    for symbol, timestamp in json.load(f).items():
+                        self._advance(symbol, int(timestamp))
+            except (OSError, ValueError) as e:
+                logger.error(f"Error reading watermarks from {self.path}: {str(e)}")
+
+        if self.redis_client is not None:
+            try:
+                for symbol, timestamp in self.redis_client.hgetall(self.redis_key).items():
+                    if isinstance(symbol, bytes):
+                        symbol = symbol.decode('utf-8')
+                    self._advance(symbol, int(timestamp))
+            except Exception as e:
+                logger.error(f"Error reading watermarks from Redis: {str(e)}")
+
+    def get(self, symbol: str) -> Optional[int]:
+        return self._marks.get(symbol)
+
+    def _advance(self, symbol: str, timestamp: int) -> bool:
+        current = self._marks.get(symbol)
+        if current is None or timestamp > current:
+            self._marks[symbol] = timestamp
+            return True
+        return False
+
+    def advance(self, symbol: str, timestamp: int) -> None:
+        """Move symbol's mark forward to timestamp (older timestamps are ignored)"""
+        self._advance(symbol, int(timestamp))
+
+    def save(self) -> None:
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._marks, f, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+        if self.redis_client is not None and self._marks:
+            try:
+                self.redis_client.hset(self.redis_key, mapping=self._marks)
+            except Exception as e:
+                logger.error(f"Error writing watermarks to Redis: {str(e)}")
+
+    def __len__(self) -> int:
+        return len(self._marks)
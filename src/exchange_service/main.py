@@ -0,0 +1,243 @@
+import os
+import time
+import logging
+import argparse
+from typing import List, Optional
+from dotenv import load_dotenv
+
+from ..common.clock import event_clock
+from ..common.execution_log import get_retention, get_spill_dir
+from ..common.events import EXECUTIONS_CHANNEL, MARKET_DATA_CHANNEL, ORDERS_CHANNEL
+from ..common.metrics import get_metrics_file, get_metrics_port, metrics
+from ..common.models import Execution, Order, OrderCancel, Portfolio, Tick
+from ..common.redis_client import RedisClient
+from ..common.streams import (TRANSPORT_STREAMS, TRANSPORTS, StreamConsumer, StreamPublisher,
+                              get_maxlen, get_shards, get_transport, market_data_streams, stream_key)
+from ..common.wire import FORMATS, decode_envelope, encode_message, get_message_format
+from .simulated_exchange import SimulatedExchange
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('exchange_service')
+
+load_dotenv()
+
+class ExchangeService:
+    """
+    Consumes ORDERS_CHANNEL and MARKET_DATA_CHANNEL, runs them through a
+    SimulatedExchange and publishes fills on EXECUTIONS_CHANNEL
+
+    Ticks keep the exchange's prices current and fill resting limit orders
+    they cross; orders are filled or rested as they arrive.
+    """
+
+    def __init__(self, redis_client=None, portfolio: Optional[Portfolio] = None,
+                 batch_size=500, message_format=None, streams: Optional[StreamPublisher] = None,
+                 consumer: Optional[StreamConsumer] = None):
+        """
+        Initialize the exchange service
+
+        Args:
+            redis_client: Redis client, defaults to a raw (bytes) RedisClient with
+                          subscriptions on RedisClient's dedicated pub/sub pool
+            portfolio: Portfolio to trade, defaults to SimulatedExchange's
+            batch_size: Maximum messages drained from the subscription per batch
+            message_format: Format for published executions, defaults to MESSAGE_FORMAT
+            streams: Publish executions to Redis Streams instead of pub/sub
+            consumer: Read ticks and orders from this consumer group instead of subscribing
+        """
+        self.redis_client = redis_client or RedisClient.get_instance(decode_responses=False)
+        self._shared_client = redis_client is None
+        self.exchange = SimulatedExchange(portfolio=portfolio)
+        self.batch_size = max(1, batch_size)
+        self.message_format = message_format or get_message_format()
+        self.streams = streams
+        self.consumer = consumer
+
+        self.messages = 0
+        self.orders = 0
+        self.executions_published = 0
+        self.started = time.monotonic()
+
+    def handle(self, item) -> List[Execution]:
+        """Apply one decoded tick, order or cancel, returns any resulting fills"""
+        if isinstance(item, Tick):
+            event_clock.advance(item.timestamp)
+            return self.exchange.update_market_price(item.symbol, item.price)
+
+        if isinstance(item, Order):
+            self.orders += 1
+            execution = self.exchange.submit_order(item)
+            return [execution] if execution is not None else []
+
+        if isinstance(item, OrderCancel):
+            if self.exchange.cancel_order(item.order_id) is None:
+                logger.warning(f"Cannot cancel order {item.order_id}: not resting")
+            return []
+
+        return []
+
+    def process_batch(self, payloads, acks=()) -> List[Execution]:
+        """
+        Decode and apply a batch of messages, publishing fills in one round-trip
+
+        Acknowledgements for acks (stream entries the batch came from) ride
+        in the same pipeline.
+        """
+        executions = []
+        origins = []  # origin_ns carried by the tick or order message behind each fill
+        for payload in payloads:
+            try:
+                items, origin_ns = decode_envelope(payload)
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping undecodable message: {str(e)}")
+                continue
+
+            for item in items:
+                fills = self.handle(item)
+                if fills:
+                    executions.extend(fills)
+                    origins.extend([origin_ns] * len(fills))
+
+        self.messages += len(payloads)
+
+        if executions or acks:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for execution, origin_ns in zip(executions, origins):
+                payload = encode_message(execution, self.message_format, origin_ns)
+                if self.streams is not None:
+                    self.streams.publish(pipe, EXECUTIONS_CHANNEL, payload)
+                else:
+                    pipe.publish(EXECUTIONS_CHANNEL, payload)
+            if acks:
+                self.consumer.ack(acks, pipe)
+            pipe.execute()
+            self.executions_published += len(executions)
+
+            if metrics.enabled:
+                published = time.time_ns()
+                for origin_ns in origins:
+                    if origin_ns is not None:
+                        metrics.observe('latency.tick_to_execution', published - origin_ns)
+
+        metrics.incr('exchange.messages', len(payloads))
+        metrics.incr('exchange.executions', len(executions))
+
+        return executions
+
+    def drain(self, pubsub, timeout=1.0) -> list:
+        """Wait up to timeout for one message, then take what is buffered, up to batch_size"""
+        batch = []
+        message = pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        while message is not None:
+            if message.get('type') == 'message':
+                batch.append(message['data'])
+                if len(batch) >= self.batch_size:
+                    break
+            message = pubsub.get_message(ignore_subscribe_messages=True, timeout=0.0)
+        return batch
+
+    def log_stats(self) -> None:
+        elapsed = time.monotonic() - self.started
+        rate = self.messages / elapsed if elapsed > 0 else 0.0
+        resting = sum(len(book) for book in self.exchange.order_books.values())
+        logger.info(f"{self.messages} messages ({rate:,.0f} msg/s), {self.orders} orders, "
+                    f"{self.executions_published} executions, {self.exchange.rejections} rejected, "
+                    f"{resting} resting limit orders")
+
+    def run(self, stats_interval=60.0) -> None:
+        if self.consumer is not None:
+            return self.run_streams(stats_interval)
+
+        if self._shared_client:
+            pubsub = RedisClient.get_pubsub(decode_responses=False, ignore_subscribe_messages=True)
+        else:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(MARKET_DATA_CHANNEL, ORDERS_CHANNEL)
+        logger.info(f"Subscribed to {MARKET_DATA_CHANNEL} and {ORDERS_CHANNEL}, "
+                    f"publishing executions to {EXECUTIONS_CHANNEL}")
+
+        next_report = time.monotonic() + stats_interval
+        try:
+            while True:
+                batch = self.drain(pubsub)
+                if batch:
+                    self.process_batch(batch)
+
+                if time.monotonic() >= next_report:
+                    self.log_stats()
+                    next_report = time.monotonic() + stats_interval
+        except KeyboardInterrupt:
+            logger.info("Shutting down exchange service")
+        finally:
+            self.log_stats()
+            pubsub.close()
+
+    def run_streams(self, stats_interval=60.0) -> None:
+        """Consume ticks and orders through the stream consumer group until interrupted"""
+        self.consumer.ensure_groups()
+        logger.info(f"Reading {', '.join(self.consumer.streams)} as {self.consumer.group}/{self.consumer.consumer}")
+
+        next_report = time.monotonic() + stats_interval
+        try:
+            while True:
+                entries = self.consumer.read()
+                if entries:
+                    self.process_batch([entry.payload for entry in entries], acks=entries)
+
+                if time.monotonic() >= next_report:
+                    self.log_stats()
+                    next_report = time.monotonic() + stats_interval
+        except KeyboardInterrupt:
+            logger.info("Shutting down exchange service")
+        finally:
+            self.log_stats()
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated Exchange Service")
+    parser.add_argument('--cash', type=float, default=float(os.getenv('INITIAL_CASH', 10000.0)),
+        help='Starting cash of the simulated portfolio')
+    parser.add_argument('--history-retention', type=int, default=get_retention(),
+        help='Executions kept in memory, older ones are spilled or dropped (default: $EXECUTION_RETENTION, else no limit)')
+    parser.add_argument('--history-spill-dir', type=str, default=get_spill_dir(),
+        help='Directory to spill executions beyond the retention to (default: $EXECUTION_SPILL_DIR, else drop them)')
+    parser.add_argument('--batch-size', type=int, default=500,
+        help='Maximum messages handled per batch')
+    parser.add_argument('--stats-interval', type=float, default=60.0,
+        help='Seconds between throughput reports')
+    parser.add_argument('--format', choices=FORMATS, default=None,
+        help='Wire format for published executions (default: $MESSAGE_FORMAT, else json)')
+    parser.add_argument('--transport', choices=TRANSPORTS, default=None,
+        help='Pub/sub or Redis Streams (default: $MESSAGE_TRANSPORT, else pubsub)')
+    parser.add_argument('--shards', type=int, default=None,
+        help='Market data stream shards (default: $STREAM_SHARDS, else 1)')
+    parser.add_argument('--metrics-file', type=str, default=get_metrics_file(),
+        help='Write order handling and latency metrics to this JSON file (default: $METRICS_FILE, off if unset)')
+    parser.add_argument('--metrics-port', type=int, default=get_metrics_port(),
+        help='Serve metrics for scraping on this port (default: $METRICS_PORT, off if unset)')
+    args = parser.parse_args()
+    metrics.configure(args.metrics_file, args.metrics_port)
+
+    streams = consumer = None
+    if (args.transport or get_transport()) == TRANSPORT_STREAMS:
+        # one exchange owns the portfolio, so it reads every shard
+        shards = args.shards or get_shards()
+        streams = StreamPublisher(shards=shards, maxlen=get_maxlen())
+        consumer = StreamConsumer(RedisClient.get_instance(decode_responses=False),
+                                  market_data_streams(shards) + [stream_key(ORDERS_CHANNEL)],
+                                  group='exchange', consumer='exchange', count=args.batch_size)
+
+    service = ExchangeService(
+        portfolio=Portfolio(cash=args.cash, history_retention=args.history_retention,
+                            history_spill_dir=args.history_spill_dir),
+        batch_size=args.batch_size,
+        message_format=args.format,
+        streams=streams,
+        consumer=consumer
+    )
+    service.run(stats_interval=args.stats_interval)
+
+if __name__ == "__main__":
+    main()
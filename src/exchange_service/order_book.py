@@ -0,0 +1,111 @@
+import heapq
+import itertools
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from src.common.models import Order
+
+logger = logging.getLogger('order_book')
+
+
+class LimitOrderBook:
+    """
+    Resting limit orders for one symbol, kept in price-time priority
+
+    Bids and asks are binary heaps, so adding an order is O(log n). Cancels
+    drop the order from the live index in O(1) and leave its heap entry to be
+    skipped when it surfaces; the heaps are rebuilt once stale entries
+    outnumber live ones, keeping the amortized cost at O(log n).
+
+    Orders rest until the market trades through them: a BUY fills once the
+    price is at or below its limit, a SELL once it is at or above.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self._bids: List[Tuple[float, int, str]] = []  # (-price, seq, order_id), max-heap on price
+        self._asks: List[Tuple[float, int, str]] = []  # (price, seq, order_id)
+        self._orders: Dict[str, Tuple[Order, int]] = {}  # order_id -> (order, seq) for live orders
+        self._seq = itertools.count()
+        self._stale = 0
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self._orders
+
+    def add(self, order: Order) -> None:
+        if order.order_type != 'LIMIT' or order.price is None:
+            raise ValueError(f"Only limit orders can rest in the book: {order.id}")
+        if order.symbol != self.symbol:
+            raise ValueError(f"Order for {order.symbol} sent to the {self.symbol} book")
+        if order.id in self._orders:
+            raise ValueError(f"Duplicate order id: {order.id}")
+
+        seq = next(self._seq)
+        self._orders[order.id] = (order, seq)
+        if order.side == 'BUY':
+            heapq.heappush(self._bids, (-order.price, seq, order.id))
+        else:
+            heapq.heappush(self._asks, (order.price, seq, order.id))
+
+    def cancel(self, order_id: str) -> Optional[Order]:
+        entry = self._orders.pop(order_id, None)
+        if entry is None:
+            return None
+
+        self._stale += 1
+        if self._stale > len(self._orders) and self._stale > 64:
+            self._compact()
+        return entry[0]
+
+    def _compact(self) -> None:
+        live = self._orders
+        self._bids = [e for e in self._bids if live.get(e[2], (None, -1))[1] == e[1]]
+        self._asks = [e for e in self._asks if live.get(e[2], (None, -1))[1] == e[1]]
+        heapq.heapify(self._bids)
+        heapq.heapify(self._asks)
+        self._stale = 0
+
+    def _top(self, heap) -> Optional[Tuple[float, int, str]]:
+        # discard cancelled entries sitting at the top
+        while heap:
+            entry = heap[0]
+            live = self._orders.get(entry[2])
+            if live is not None and live[1] == entry[1]:
+                return entry
+            heapq.heappop(heap)
+            self._stale = max(0, self._stale - 1)
+        return None
+
+    def best_bid(self) -> Optional[float]:
+        entry = self._top(self._bids)
+        return -entry[0] if entry else None
+
+    def best_ask(self) -> Optional[float]:
+        entry = self._top(self._asks)
+        return entry[0] if entry else None
+
+    def match(self, price: float) -> List[Order]:
+        """
+        Remove and return every order the market price has crossed
+
+        Returns:
+            Filled orders, bids before asks, each side in price-time priority
+        """
+        filled = []
+
+        entry = self._top(self._bids)
+        while entry is not None and -entry[0] >= price:
+            heapq.heappop(self._bids)
+            filled.append(self._orders.pop(entry[2])[0])
+            entry = self._top(self._bids)
+
+        entry = self._top(self._asks)
+        while entry is not None and entry[0] <= price:
+            heapq.heappop(self._asks)
+            filled.append(self._orders.pop(entry[2])[0])
+            entry = self._top(self._asks)
+
+        return filled
@@ -1,37 +1,111 @@
+import time
 import logging
+from collections import deque
+from src.common.metrics import metrics
 from src.common.models import Portfolio, Order, Execution
-from typing import Optional, Dict
+from typing import Deque, Optional, Dict, Iterable, List, Tuple
+from .order_book import LimitOrderBook
 
 logger = logging.getLogger('simulated_exchange')
 
+REJECTION_HISTORY = 1000  # most recent rejections kept for reporting
+
 class SimulatedExchange: 
-    " All orders immediately at current market price"
+    " Market orders fill immediately at current market price, limit orders rest until a tick crosses them"
     def __init__(self, portfolio: Optional[Portfolio]) -> None:
         self.portfolio = portfolio or Portfolio(cash=10000.0)
         self.latest_prices : Dict[str, float] = {} #stock -> price
+        self.order_books : Dict[str, LimitOrderBook] = {} #stock -> resting limit orders
+        self._resting : Dict[str, str] = {} #order id -> stock
+        self.rejections = 0
+        self.recent_rejections : Deque[Tuple[Order, str]] = deque(maxlen=REJECTION_HISTORY)
 
-    def update_market_price(self, symbol : str, price : float) -> None: 
+    def update_market_price(self, symbol : str, price : float) -> List[Execution]: 
         self.latest_prices[symbol] = price
+        self.portfolio.mark_price(symbol, price)
+
+        # fill resting limit orders the new price has crossed
+        book = self.order_books.get(symbol)
+        if not book:
+            return []
+
+        executions = []
+        for order in book.match(price):
+            del self._resting[order.id]
+            execution = self.execute_order(order)
+            if execution is not None:
+                executions.append(execution)
+            else:
+                logger.warning("Dropped resting %s limit order %s for %s: crossed at $%.2f but could not fill",
+                               order.side, order.id, symbol, price)
+        return executions
+
+    def submit_order(self, order: Order) -> Optional[Execution]:
+        """
+        Route an order: market orders and marketable limits fill now, other
+        limit orders rest in the symbol's book until a tick crosses their price
+        """
+        if order.order_type == 'MARKET':
+            return self.execute_order(order)
+
+        current_price = self.latest_prices.get(order.symbol)
+        if current_price is not None:
+            marketable = (current_price <= order.price) if order.side == 'BUY' else (current_price >= order.price)
+            if marketable:
+                return self.execute_order(order)
+
+        if order.id in self._resting:
+            self._reject(order, "duplicate order id")
+            return None
+
+        book = self.order_books.get(order.symbol)
+        if book is None:
+            book = self.order_books[order.symbol] = LimitOrderBook(order.symbol)
+        try:
+            book.add(order)
+        except ValueError as e:
+            self._reject(order, str(e))
+            return None
+        self._resting[order.id] = order.symbol
+        return None
+
+    def cancel_order(self, order_id: str) -> Optional[Order]:
+        """Cancel a resting limit order, returns it or None if it is not resting"""
+        symbol = self._resting.pop(order_id, None)
+        if symbol is None:
+            return None
+        return self.order_books[symbol].cancel(order_id)
+
+    def _reject(self, order: Order, reason: str) -> None:
+        # log and count an order that will not fill, keeping the latest for reporting
+        logger.error("Cannot execute %s order %s: %s", order.side, order.id, reason)
+        self.rejections += 1
+        self.recent_rejections.append((order, reason))
+        metrics.incr('exchange.rejections')
+
+    def _rejection(self, order: Order, price: Optional[float], cash: float, held: int) -> Optional[str]:
+        # why order cannot fill against the given cash and holdings, None if it can
+        if price is None:
+            return f"no price available for {order.symbol}"
+        if order.side == 'SELL' and held < order.quantity:
+            return f"insufficient shares of {order.symbol}"
+        if order.side == 'BUY' and cash < price * order.quantity:
+            return "insufficient cash"
+        return None
 
     def execute_order(self, order: Order) -> Optional[Execution]: 
         symbol = order.symbol
+        current_price = self.latest_prices.get(symbol)
 
-        if symbol not in self.latest_prices: 
-            logger.error(f"Can't execute order: no price available for {symbol}")
+        timed = metrics.enabled
+        if timed:
+            start = time.perf_counter_ns()
+        reason = self._rejection(order, current_price, self.portfolio.cash, self.portfolio.holdings.get(symbol, 0))
+        if timed:
+            metrics.observe('exchange.validate', time.perf_counter_ns() - start)
+        if reason is not None:
+            self._reject(order, reason)
             return None
-    
-        current_price = self.latest_prices[symbol]
-
-        if order.side == 'SELL': 
-            if symbol not in self.portfolio.holdings or self.portfolio.holdings[symbol] <= order.quantity:
-                logger.error(f"Cannot execute SELL order: insufficient shares of {symbol}")
-                return None
-        
-        if order.side == 'BUY': 
-            cost = current_price * order.quantity
-            if self.portfolio.cash < cost: 
-                logger.error("Cannot execut BUY order: insufficient cash")
-                return None
             
         #successful order, create execution recordd and publish to redis
 
@@ -43,12 +117,68 @@ class SimulatedExchange:
             price=current_price
         )
 
-        #update portfolio
         # Update portfolio
         try:
-            self.portfolio.update_after_execution(execution)
-            logger.info(f"Executed {order.side} order for {order.quantity} shares of {symbol} at ${current_price:.2f}")
+            if timed:
+                start = time.perf_counter_ns()
+                self.portfolio.update_after_execution(execution)
+                metrics.observe('portfolio.update', time.perf_counter_ns() - start)
+            else:
+                self.portfolio.update_after_execution(execution)
+            logger.info("Executed %s order for %d shares of %s at $%.2f", order.side, order.quantity, symbol, current_price)
             return execution
         except ValueError as e:
-            logger.error(f"Failed to update portfolio: {e}")
-            return None
\ No newline at end of file
+            logger.error("Failed to update portfolio: %s", e)
+            return None
+
+    def execute_orders(self, batch: Iterable[Order]) -> Tuple[List[Execution], List[Tuple[Order, str]]]:
+        """
+        Execute a batch of market orders at current prices
+
+        The whole batch is validated in one pass against running cash and
+        holdings, with sells applied before buys so the cash they free can fund
+        buys in the same batch. Within each side orders keep their batch order,
+        so the outcome is the same as calling execute_order on the sells and
+        then on the buys.
+
+        Returns:
+            (executions in the order applied, (order, reason) for each rejected order)
+        """
+        orders = list(batch)
+        ordered = [o for o in orders if o.side == 'SELL'] + [o for o in orders if o.side != 'SELL']
+
+        prices = self.latest_prices
+        holdings = self.portfolio.holdings
+        cash = self.portfolio.cash
+        held: Dict[str, int] = {}  # running holdings for symbols the batch touches
+
+        executions = []
+        rejections = []
+        for order in ordered:
+            symbol = order.symbol
+            price = prices.get(symbol)
+            quantity = held.get(symbol)
+            if quantity is None:
+                quantity = holdings.get(symbol, 0)
+
+            reason = self._rejection(order, price, cash, quantity)
+            if reason is not None:
+                rejections.append((order, reason))
+                continue
+
+            if order.side == 'SELL':
+                cash += price * order.quantity
+                held[symbol] = quantity - order.quantity
+            elif order.side == 'BUY':
+                cash -= price * order.quantity
+                held[symbol] = quantity + order.quantity
+            executions.append(Execution(order_id=order.id, symbol=symbol, side=order.side,
+                                        quantity=order.quantity, price=price))
+
+        for execution in executions:
+            self.portfolio.update_after_execution(execution)
+
+        for order, reason in rejections:
+            self._reject(order, reason)
+        logger.info("Executed %d of %d orders in batch", len(executions), len(orders))
+        return executions, rejections
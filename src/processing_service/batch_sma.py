@@ -0,0 +1,199 @@
+import logging
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger('batch_sma')
+
+# crossover flags returned per update, mirrors SMACalculator.detect_crossover
+SIGNAL_NONE = 0
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+
+SIGNAL_NAMES = {SIGNAL_NONE: '', SIGNAL_BUY: 'BUY', SIGNAL_SELL: 'SELL'}
+
+
+class BatchSMAEngine:
+    """
+    Multi-symbol SMA engine backed by NumPy ring buffers
+
+    Every symbol gets a slot (row) in one 2-D array per window, so a batch of
+    (symbol, price) updates is applied with a handful of array operations
+    instead of one SMACalculator.update call per tick. The running sums are
+    updated in the same order as SMACalculator (subtract evicted price, then
+    add the new one), so per-symbol results are bit-for-bit identical.
+    """
+
+    def __init__(self, short_window: int = 50, long_window: int = 100, initial_capacity: int = 64):
+        """
+        Initialize the engine
+
+        Args:
+            short_window: Number of prices in the short SMA window
+            long_window: Number of prices in the long SMA window
+            initial_capacity: Number of symbol slots to preallocate (grows on demand)
+        """
+        if short_window < 1 or long_window < 1:
+            raise ValueError("SMA windows must be at least 1")
+
+        self.short_window = short_window
+        self.long_window = long_window
+
+        self._slots: Dict[str, int] = {}
+        self.symbols: List[str] = []
+
+        capacity = max(1, initial_capacity)
+        self._short_buf = np.zeros((capacity, short_window), dtype=np.float64)
+        self._long_buf = np.zeros((capacity, long_window), dtype=np.float64)
+        self._short_sum = np.zeros(capacity, dtype=np.float64)
+        self._long_sum = np.zeros(capacity, dtype=np.float64)
+        self._count = np.zeros(capacity, dtype=np.int64)  # total prices seen per slot
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._slots
+
+    @property
+    def capacity(self) -> int:
+        return self._count.shape[0]
+
+    def slot(self, symbol: str) -> int:
+        """Return the slot index for symbol, allocating a new one if needed"""
+        slot = self._slots.get(symbol)
+        if slot is None:
+            slot = len(self.symbols)
+            if slot >= self.capacity:
+                self._grow(slot + 1)
+            self._slots[symbol] = slot
+            self.symbols.append(symbol)
+        return slot
+
+    def slots_for(self, symbols: Iterable[str]) -> np.ndarray:
+        """Resolve a sequence of symbols to a slot array, useful to do once up front"""
+        return np.fromiter((self.slot(s) for s in symbols), dtype=np.int64)
+
+    def _grow(self, min_capacity: int) -> None:
+        capacity = self.capacity
+        while capacity < min_capacity:
+            capacity *= 2
+
+        def resized(arr):
+            new = np.zeros((capacity,) + arr.shape[1:], dtype=arr.dtype)
+            new[:arr.shape[0]] = arr
+            return new
+
+        self._short_buf = resized(self._short_buf)
+        self._long_buf = resized(self._long_buf)
+        self._short_sum = resized(self._short_sum)
+        self._long_sum = resized(self._long_sum)
+        self._count = resized(self._count)
+        logger.debug(f"Grew SMA engine capacity to {capacity} symbols")
+
+    def update_batch(self, symbols: Sequence[str], prices: Sequence[float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Apply a batch of (symbol, price) updates in arrival order
+
+        Args:
+            symbols: Symbol for each update
+            prices: Price for each update
+
+        Returns:
+            Tuple of (short_sma, long_sma, signals) arrays aligned with the input,
+            where signals holds SIGNAL_BUY / SIGNAL_SELL / SIGNAL_NONE
+        """
+        if len(symbols) != len(prices):
+            raise ValueError(f"Got {len(symbols)} symbols but {len(prices)} prices")
+        return self.update_slots(self.slots_for(symbols), prices)
+
+    def update_slots(self, slots, prices) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Same as update_batch but takes slot indices from slot()/slots_for()"""
+        slots = np.asarray(slots, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        n = slots.shape[0]
+
+        short_out = np.empty(n, dtype=np.float64)
+        long_out = np.empty(n, dtype=np.float64)
+        signals = np.empty(n, dtype=np.int8)
+        if n == 0:
+            return short_out, long_out, signals
+
+        # a symbol can appear more than once in a batch, its updates have to be
+        # applied in order so split the batch into rounds of unique slots
+        rank = self._occurrence_rank(slots)
+        if rank is None:
+            self._apply(slots, prices, short_out, long_out, signals, slice(None))
+        else:
+            for r in range(int(rank.max()) + 1):
+                idx = np.flatnonzero(rank == r)
+                self._apply(slots[idx], prices[idx], short_out, long_out, signals, idx)
+
+        return short_out, long_out, signals
+
+    @staticmethod
+    def _occurrence_rank(slots: np.ndarray):
+        # returns None when every slot is unique, else the k-th occurrence of each entry
+        order = np.argsort(slots, kind='stable')
+        sorted_slots = slots[order]
+        is_start = np.empty(len(slots), dtype=bool)
+        is_start[0] = True
+        np.not_equal(sorted_slots[1:], sorted_slots[:-1], out=is_start[1:])
+        if is_start.all():
+            return None
+
+        positions = np.arange(len(slots))
+        group_start = np.maximum.accumulate(np.where(is_start, positions, 0))
+        rank = np.empty(len(slots), dtype=np.int64)
+        rank[order] = positions - group_start
+        return rank
+
+    def _apply(self, slots, prices, short_out, long_out, signals, out_idx) -> None:
+        count = self._count[slots]
+        short_len = np.minimum(count, self.short_window)
+        long_len = np.minimum(count, self.long_window)
+
+        short_sum = self._short_sum[slots]
+        long_sum = self._long_sum[slots]
+
+        # previous SMAs, 0.0 for empty windows like SMACalculator.get_*_sma
+        seen = count > 0
+        prev_short = np.divide(short_sum, short_len, out=np.zeros_like(short_sum), where=seen)
+        prev_long = np.divide(long_sum, long_len, out=np.zeros_like(long_sum), where=seen)
+
+        short_pos = count % self.short_window
+        long_pos = count % self.long_window
+
+        # evict the oldest price once the window is full, then add the new one
+        short_sum = np.where(count >= self.short_window, short_sum - self._short_buf[slots, short_pos], short_sum)
+        long_sum = np.where(count >= self.long_window, long_sum - self._long_buf[slots, long_pos], long_sum)
+        short_sum += prices
+        long_sum += prices
+
+        self._short_buf[slots, short_pos] = prices
+        self._long_buf[slots, long_pos] = prices
+        self._short_sum[slots] = short_sum
+        self._long_sum[slots] = long_sum
+        self._count[slots] = count + 1
+
+        short_sma = short_sum / np.minimum(count + 1, self.short_window)
+        long_sma = long_sum / np.minimum(count + 1, self.long_window)
+
+        golden = (prev_short <= prev_long) & (short_sma > long_sma)
+        death = (prev_short >= prev_long) & (short_sma < long_sma)
+
+        short_out[out_idx] = short_sma
+        long_out[out_idx] = long_sma
+        signals[out_idx] = np.where(golden, SIGNAL_BUY, np.where(death, SIGNAL_SELL, SIGNAL_NONE))
+
+    def get_short_sma(self, symbol: str) -> float:
+        slot = self._slots.get(symbol)
+        if slot is None or self._count[slot] == 0:
+            return 0.0
+        return float(self._short_sum[slot] / min(self._count[slot], self.short_window))
+
+    def get_long_sma(self, symbol: str) -> float:
+        slot = self._slots.get(symbol)
+        if slot is None or self._count[slot] == 0:
+            return 0.0
+        return float(self._long_sum[slot] / min(self._count[slot], self.long_window))
@@ -0,0 +1,444 @@
+"""
+Streaming technical indicators sharing one price/volume history
+
+An IndicatorSet keeps a single ring buffer of recent prices and volumes,
+sized for its longest window, and every windowed indicator reads the value
+leaving its window from that buffer instead of holding its own copy. Each
+update is O(1) (amortized for rolling min/max).
+
+Windowed indicators follow SMACalculator: until a window has filled they
+cover every tick seen so far. Every indicator also has a whole-series form,
+series(), which gives the values the streaming form would produce after
+each tick. EMA, RSI and rolling min/max match exactly; the running-sum
+indicators (SMA, VWAP, variance, Bollinger) match to floating-point rounding.
+"""
+import math
+from collections import deque
+from typing import Dict, Mapping, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ..common.models import Tick
+
+# rows of sliding windows reduced at a time in the series forms
+_SERIES_CHUNK = 1 << 16
+
+
+class RingBuffer:
+    """Last `capacity` values pushed, newest first through ago()"""
+
+    __slots__ = ('capacity', 'count', '_values', '_pos')
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self.count = 0  # values pushed so far, including overwritten ones
+        self._values = [0.0] * self.capacity
+        self._pos = -1
+
+    def push(self, value: float) -> None:
+        pos = self._pos + 1
+        if pos == self.capacity:
+            pos = 0
+        self._values[pos] = value
+        self._pos = pos
+        self.count += 1
+
+    def ago(self, k: int) -> float:
+        """Value pushed k updates ago, 0 being the latest"""
+        return self._values[(self._pos - k) % self.capacity]
+
+
+def _as_series(values) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim != 1:
+        raise ValueError(f"Expected a 1-D array, got shape {values.shape}")
+    return values
+
+
+def _window_sums(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    # sum and length of the (possibly partial) window ending at each index
+    cumsum = np.concatenate(([0.0], np.cumsum(values)))
+    ends = np.arange(1, values.shape[0] + 1)
+    starts = np.maximum(ends - window, 0)
+    return cumsum[ends] - cumsum[starts], ends - starts
+
+
+def _window_reduce(values: np.ndarray, window: int, reduce) -> np.ndarray:
+    # reduce(2-D windows, axis=1) for every window ending at each index
+    n = values.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    head = min(window - 1, n)
+    for i in range(head):
+        out[i] = reduce(values[None, :i + 1], axis=1)[0]
+    if n >= window:
+        windows = sliding_window_view(values, window)
+        for start in range(0, windows.shape[0], _SERIES_CHUNK):
+            chunk = windows[start:start + _SERIES_CHUNK]
+            out[window - 1 + start:window - 1 + start + chunk.shape[0]] = reduce(chunk, axis=1)
+    return out
+
+
+def _recurrence(first: float, inputs: np.ndarray, step) -> np.ndarray:
+    # run step(prev, x) over inputs in Python floats, so the result is
+    # bit-for-bit what the streaming update computes
+    values = np.empty(inputs.shape[0] + 1, dtype=object)
+    values[0] = first
+    values[1:] = inputs.tolist()
+    return np.frompyfunc(step, 2, 1).accumulate(values).astype(np.float64)
+
+
+class Indicator:
+    """
+    Base class: bind() to an IndicatorSet's buffers, then update() once per tick
+
+    The set pushes the tick onto the shared buffers before calling update,
+    so prices.ago(0) is the current price inside update.
+    """
+
+    window = 0  # ticks of history this indicator reads back from the buffers
+
+    def __init__(self):
+        self.prices: Optional[RingBuffer] = None
+        self.volumes: Optional[RingBuffer] = None
+
+    def bind(self, prices: RingBuffer, volumes: RingBuffer) -> None:
+        if self.prices is not None:
+            raise ValueError(f"{type(self).__name__} already belongs to an IndicatorSet")
+        self.prices = prices
+        self.volumes = volumes
+
+    def _windowed(self, window: int) -> int:
+        if window < 1:
+            raise ValueError("Indicator windows must be at least 1")
+        return window
+
+    def update(self, price: float, volume: float) -> None:
+        raise NotImplementedError
+
+    @property
+    def value(self):
+        raise NotImplementedError
+
+    def series(self, prices, volumes=None) -> np.ndarray:
+        raise NotImplementedError
+
+
+class SMA(Indicator):
+    """Simple moving average over the last `window` prices"""
+
+    def __init__(self, window: int):
+        super().__init__()
+        self.window = self._windowed(window)
+        self._sum = 0.0
+
+    def update(self, price, volume):
+        if self.prices.count > self.window:
+            self._sum -= self.prices.ago(self.window)
+        self._sum += price
+
+    @property
+    def value(self) -> float:
+        n = min(self.prices.count, self.window)
+        return self._sum / n if n else math.nan
+
+    def series(self, prices, volumes=None) -> np.ndarray:
+        sums, lengths = _window_sums(_as_series(prices), self.window)
+        return sums / lengths
+
+
+class EMA(Indicator):
+    """Exponential moving average seeded with the first price"""
+
+    def __init__(self, span: Optional[int] = None, alpha: Optional[float] = None):
+        super().__init__()
+        if alpha is None:
+            if span is None or span < 1:
+                raise ValueError("EMA needs a span of at least 1 or an alpha")
+            alpha = 2.0 / (span + 1)
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError(f"EMA alpha must be in (0, 1], got {alpha}")
+        self.alpha = alpha
+        self._ema = math.nan
+
+    def update(self, price, volume):
+        if self.prices.count == 1:
+            self._ema = price
+        else:
+            self._ema += self.alpha * (price - self._ema)
+
+    @property
+    def value(self) -> float:
+        return self._ema
+
+    def series(self, prices, volumes=None) -> np.ndarray:
+        prices = _as_series(prices)
+        if prices.shape[0] == 0:
+            return np.empty(0)
+        alpha = self.alpha
+        return _recurrence(float(prices[0]), prices[1:], lambda prev, x: prev + alpha * (x - prev))
+
+
+class VWAP(Indicator):
+    """Volume-weighted average price, over all ticks or the last `window`"""
+
+    def __init__(self, window: Optional[int] = None):
+        super().__init__()
+        self.window = self._windowed(window) if window is not None else 0
+        self._pv = 0.0
+        self._volume = 0.0
+
+    def update(self, price, volume):
+        if self.window and self.prices.count > self.window:
+            old_volume = self.volumes.ago(self.window)
+            self._pv -= self.prices.ago(self.window) * old_volume
+            self._volume -= old_volume
+        self._pv += price * volume
+        self._volume += volume
+
+    @property
+    def value(self) -> float:
+        return self._pv / self._volume if self._volume > 0 else math.nan
+
+    def series(self, prices, volumes=None) -> np.ndarray:
+        prices = _as_series(prices)
+        volumes = np.zeros_like(prices) if volumes is None else _as_series(volumes)
+        window = self.window or max(prices.shape[0], 1)
+        pv, _ = _window_sums(prices * volumes, window)
+        volume, _ = _window_sums(volumes, window)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(volume > 0, pv / np.where(volume > 0, volume, 1.0), np.nan)
+
+
+class RSI(Indicator):
+    """
+    Wilder's relative strength index
+
+    The first average gain/loss is the plain mean of the first `period`
+    price changes; after that each is smoothed as avg += (x - avg) / period.
+    NaN until `period` changes have been seen.
+    """
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = self._windowed(period)
+        self.window = 1  # reads the previous price
+        self._changes = 0
+        self._gain = 0.0
+        self._loss = 0.0
+
+    def update(self, price, volume):
+        if self.prices.count < 2:
+            return
+        change = price - self.prices.ago(1)
+        gain = change if change > 0.0 else 0.0
+        loss = -change if change < 0.0 else 0.0
+        self._changes += 1
+
+        if self._changes <= self.period:
+            # sums until the first average, then Wilder smoothing
+            self._gain += gain
+            self._loss += loss
+            if self._changes == self.period:
+                self._gain /= self.period
+                self._loss /= self.period
+        else:
+            self._gain += (gain - self._gain) / self.period
+            self._loss += (loss - self._loss) / self.period
+
+    @staticmethod
+    def _rsi(gain, loss):
+        if loss == 0.0:
+            return 100.0 if gain > 0.0 else 50.0
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+
+    @property
+    def value(self) -> float:
+        if self._changes < self.period:
+            return math.nan
+        return self._rsi(self._gain, self._loss)
+
+    def series(self, prices, volumes=None) -> np.ndarray:
+        prices = _as_series(prices)
+        n, period = prices.shape[0], self.period
+        out = np.full(n, np.nan)
+        if n <= period:
+            return out
+
+        changes = np.diff(prices)
+        gains = np.where(changes > 0.0, changes, 0.0)
+        losses = np.where(changes < 0.0, -changes, 0.0)
+
+        # sum() adds left to right like the streaming updates
+        first_gain = sum(gains[:period].tolist()) / period
+        first_loss = sum(losses[:period].tolist()) / period
+        avg_gain = _recurrence(first_gain, gains[period:], lambda prev, x: prev + (x - prev) / period)
+        avg_loss = _recurrence(first_loss, losses[period:], lambda prev, x: prev + (x - prev) / period)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        rsi = np.where(avg_loss == 0.0, np.where(avg_gain > 0.0, 100.0, 50.0), rsi)
+        out[period:] = rsi
+        return out
+
+
+class RollingVariance(Indicator):
+    """
+    Population variance of the last `window` prices via Welford's method
+
+    Welford's running mean/M2 pair (with an in-place replacement step once
+    the window is full) avoids the cancellation of sum-of-squares formulas.
+    """
+
+    def __init__(self, window: int):
+        super().__init__()
+        self.window = self._windowed(window)
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, price, volume):
+        n = self.prices.count
+        if n <= self.window:
+            delta = price - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (price - self._mean)
+        else:
+            old = self.prices.ago(self.window)
+            old_mean = self._mean
+            self._mean += (price - old) / self.window
+            self._m2 += (price - old) * (price - self._mean + old - old_mean)
+            if self._m2 < 0.0:
+                self._m2 = 0.0  # rounding on a flat window
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self.prices.count else math.nan
+
+    @property
+    def variance(self) -> float:
+        n = min(self.prices.count, self.window)
+        return self._m2 / n if n else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def value(self) -> float:
+        return self.variance
+
+    def series(self, prices, volumes=None) -> np.ndarray:
+        return _window_reduce(_as_series(prices), self.window, np.var)
+
+
+class Bollinger(RollingVariance):
+    """Bollinger bands: (middle, upper, lower) = mean and mean +/- k standard deviations"""
+
+    def __init__(self, window: int = 20, k: float = 2.0):
+        super().__init__(window)
+        self.k = k
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        mean, width = self.mean, self.k * self.std
+        return mean, mean + width, mean - width
+
+    def series(self, prices, volumes=None) -> np.ndarray:
+        """Array of shape (n, 3): middle, upper and lower band"""
+        prices = _as_series(prices)
+        mean = _window_reduce(prices, self.window, np.mean)
+        width = self.k * np.sqrt(super().series(prices))
+        return np.column_stack((mean, mean + width, mean - width))
+
+
+class _RollingExtreme(Indicator):
+    # monotonic deque of tick numbers; values are read back from the shared buffer
+
+    def __init__(self, window: int):
+        super().__init__()
+        self.window = self._windowed(window)
+        self._ticks = deque()
+
+    def _at(self, tick: int) -> float:
+        return self.prices.ago(self.prices.count - 1 - tick)
+
+    def _dominated(self, kept: float, price: float) -> bool:
+        raise NotImplementedError
+
+    def update(self, price, volume):
+        current = self.prices.count - 1
+        ticks = self._ticks
+        while ticks and self._dominated(self._at(ticks[-1]), price):
+            ticks.pop()
+        ticks.append(current)
+        if ticks[0] <= current - self.window:
+            ticks.popleft()
+
+    @property
+    def value(self) -> float:
+        return self._at(self._ticks[0]) if self._ticks else math.nan
+
+
+class RollingMin(_RollingExtreme):
+    """Lowest of the last `window` prices"""
+
+    def _dominated(self, kept, price):
+        return kept >= price
+
+    def series(self, prices, volumes=None) -> np.ndarray:
+        return _window_reduce(_as_series(prices), self.window, np.min)
+
+
+class RollingMax(_RollingExtreme):
+    """Highest of the last `window` prices"""
+
+    def _dominated(self, kept, price):
+        return kept <= price
+
+    def series(self, prices, volumes=None) -> np.ndarray:
+        return _window_reduce(_as_series(prices), self.window, np.max)
+
+
+class IndicatorSet:
+    """
+    Named indicators for one symbol, updated together from one shared history
+
+    Example:
+        indicators = IndicatorSet({'fast': EMA(span=12), 'rsi': RSI(14), 'bands': Bollinger(20)})
+        indicators.update_tick(tick)
+        indicators['rsi'].value
+    """
+
+    def __init__(self, indicators: Mapping[str, Indicator]):
+        self.indicators: Dict[str, Indicator] = dict(indicators)
+        capacity = max((ind.window for ind in self.indicators.values()), default=0) + 1
+        self.prices = RingBuffer(capacity)
+        self.volumes = RingBuffer(capacity)
+        for indicator in self.indicators.values():
+            indicator.bind(self.prices, self.volumes)
+        self._update = [indicator.update for indicator in self.indicators.values()]
+
+    def __getitem__(self, name: str) -> Indicator:
+        return self.indicators[name]
+
+    def __len__(self) -> int:
+        return self.prices.count
+
+    def update(self, price: float, volume: Optional[float] = None) -> None:
+        volume = volume or 0.0
+        self.prices.push(price)
+        self.volumes.push(volume)
+        for update in self._update:
+            update(price, volume)
+
+    def update_tick(self, tick: Tick) -> None:
+        self.update(tick.price, tick.volume)
+
+    def values(self) -> Dict[str, object]:
+        return {name: indicator.value for name, indicator in self.indicators.items()}
+
+    def series(self, prices, volumes=None) -> Dict[str, np.ndarray]:
+        """Whole-series form of every indicator, as if each price had been passed to update"""
+        if volumes is not None:
+            volumes = np.nan_to_num(_as_series(volumes), nan=0.0)
+        return {name: indicator.series(prices, volumes) for name, indicator in self.indicators.items()}
@@ -0,0 +1,439 @@
+import os
+import time
+import logging
+import argparse
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+
+from ..common.events import MARKET_DATA_CHANNEL, SIGNALS_CHANNEL
+from ..common.metrics import get_metrics_file, get_metrics_port, metrics
+from ..common.models import Signal, Tick
+from ..common.redis_client import RedisClient
+from ..common.streams import (TRANSPORT_STREAMS, TRANSPORTS, StreamConsumer, StreamPublisher,
+                              get_maxlen, get_shards, get_transport, market_data_streams)
+from ..common.wire import FORMATS, decode_envelope, encode_message, get_message_format
+from .sma_calculator import SMACalculator
+from .snapshot import DEFAULT_REDIS_KEY as SNAPSHOT_REDIS_KEY, SnapshotStore
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('processing_service')
+
+load_dotenv()
+
+@dataclass
+class SymbolStats:
+    """Processing counters for one symbol"""
+    ticks: int = 0
+    signals: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.ticks if self.ticks else 0.0
+
+class ProcessingService:
+    """
+    Consumes MARKET_DATA_CHANNEL, keeps one SMACalculator per symbol and
+    publishes a Signal on SIGNALS_CHANNEL for every crossover
+    """
+
+    def __init__(self, redis_client=None, short_window=50, long_window=100,
+                 batch_size=500, message_format=None, streams: Optional[StreamPublisher] = None,
+                 consumer: Optional[StreamConsumer] = None, compensated=False, resum_interval=None,
+                 snapshots: Optional[SnapshotStore] = None, snapshot_interval=60.0):
+        """
+        Initialize the processing service
+
+        Args:
+            redis_client: Redis client, defaults to a raw (bytes) RedisClient with
+                          subscriptions on RedisClient's dedicated pub/sub pool
+            short_window: Short SMA window for every symbol
+            long_window: Long SMA window for every symbol
+            batch_size: Maximum messages drained from the subscription per batch
+            message_format: Format for published signals, defaults to MESSAGE_FORMAT
+            streams: Publish signals to Redis Streams instead of pub/sub
+            consumer: Read market data from this consumer group instead of subscribing
+            compensated: Use compensated (Neumaier) running sums in every SMACalculator
+            resum_interval: Recompute each calculator's sums exactly every this many ticks
+            snapshots: Restore calculator state from this store on start and save it periodically
+            snapshot_interval: Seconds between snapshots while running
+        """
+        self.redis_client = redis_client or RedisClient.get_instance(decode_responses=False)
+        self._shared_client = redis_client is None
+        self.short_window = short_window
+        self.long_window = long_window
+        self.batch_size = max(1, batch_size)
+        self.message_format = message_format or get_message_format()
+        self.streams = streams
+        self.consumer = consumer
+        self.compensated = compensated
+        self.resum_interval = resum_interval
+        self.snapshots = snapshots
+        self.snapshot_interval = snapshot_interval
+
+        self.calculators: Dict[str, SMACalculator] = {}
+        self.symbol_stats: Dict[str, SymbolStats] = {}
+        self.last_timestamps: Dict[str, int] = {}
+        # restored symbols drop replayed ticks up to their snapshot timestamp
+        self.resume_after: Dict[str, int] = {}
+        self.replayed_skipped = 0
+        # last entry id acknowledged per stream, saved with each snapshot
+        self.stream_positions: Dict[str, str] = {}
+
+        self.messages = 0
+        self.batches = 0
+        self.signals_published = 0
+        self.started = time.monotonic()
+
+    def get_calculator(self, symbol: str) -> SMACalculator:
+        calc = self.calculators.get(symbol)
+        if calc is None:
+            calc = self.calculators[symbol] = SMACalculator(self.short_window, self.long_window,
+                                                            compensated=self.compensated,
+                                                            resum_interval=self.resum_interval)
+            self.symbol_stats[symbol] = SymbolStats()
+        return calc
+
+    def handle_tick(self, tick: Tick) -> Optional[Signal]:
+        """Feed one tick to its symbol's calculator, returns a Signal on a crossover"""
+        if self.resume_after:
+            resume = self.resume_after.get(tick.symbol)
+            if resume is not None:
+                if tick.timestamp <= resume:
+                    self.replayed_skipped += 1
+                    return None
+                del self.resume_after[tick.symbol]
+
+        start = time.perf_counter()
+        calc = self.get_calculator(tick.symbol)
+        if metrics.enabled:
+            begin = time.perf_counter_ns()
+            short_sma, long_sma = calc.update(tick.price)
+            updated = time.perf_counter_ns()
+            crossover = calc.detect_crossover()
+            metrics.observe('sma.update', updated - begin)
+            metrics.observe('sma.crossover', time.perf_counter_ns() - updated)
+        else:
+            short_sma, long_sma = calc.update(tick.price)
+            crossover = calc.detect_crossover()
+
+        signal = None
+        if crossover:
+            signal = Signal(
+                symbol=tick.symbol,
+                signal=crossover,
+                timestamp=tick.timestamp,
+                data={'price': tick.price, 'short_sma': short_sma, 'long_sma': long_sma}
+            )
+
+        self.last_timestamps[tick.symbol] = tick.timestamp
+        latency = time.perf_counter() - start
+        stats = self.symbol_stats[tick.symbol]
+        stats.ticks += 1
+        stats.total_latency += latency
+        if latency > stats.max_latency:
+            stats.max_latency = latency
+        if signal is not None:
+            stats.signals += 1
+        return signal
+
+    def process_batch(self, payloads, acks=()) -> List[Signal]:
+        """
+        Decode a batch of market data messages and publish any resulting signals
+
+        Signals for the whole batch go out in one pipeline round-trip, together
+        with the acknowledgements for acks (stream entries the batch came from).
+        """
+        signals = []
+        origins = []  # origin_ns of the tick message each signal came from
+        for payload in payloads:
+            try:
+                items, origin_ns = decode_envelope(payload)
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping undecodable market data message: {str(e)}")
+                continue
+
+            for item in items:
+                if not isinstance(item, Tick):
+                    continue
+                signal = self.handle_tick(item)
+                if signal is not None:
+                    signals.append(signal)
+                    origins.append(origin_ns)
+
+        self.messages += len(payloads)
+        self.batches += 1
+
+        if signals or acks:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for signal, origin_ns in zip(signals, origins):
+                payload = encode_message(signal, self.message_format, origin_ns)
+                if self.streams is not None:
+                    self.streams.publish(pipe, SIGNALS_CHANNEL, payload)
+                else:
+                    pipe.publish(SIGNALS_CHANNEL, payload)
+                logger.info(f"{signal.signal} signal for {signal.symbol} at {signal.data['price']:.2f}")
+            if acks:
+                self.consumer.ack(acks, pipe)
+            pipe.execute()
+            self.signals_published += len(signals)
+            for entry in acks:
+                self.stream_positions[entry.stream] = entry.id
+
+            if metrics.enabled:
+                published = time.time_ns()
+                for origin_ns in origins:
+                    if origin_ns is not None:
+                        metrics.observe('latency.tick_to_signal', published - origin_ns)
+
+        metrics.incr('processing.messages', len(payloads))
+        metrics.incr('processing.signals', len(signals))
+
+        return signals
+
+    def restore(self) -> int:
+        """
+        Load calculator state from the snapshot store
+
+        Symbols saved with different windows are left to warm up from scratch.
+        When reading streams, entries acknowledged after the snapshot was taken
+        are replayed into the calculators; their signals went out before the
+        restart, so they are not published again.
+
+        Returns:
+            Number of symbols restored
+        """
+        snapshot = self.snapshots.load() if self.snapshots is not None else None
+        if snapshot is None:
+            return 0
+
+        restored = 0
+        for symbol, (calc, timestamp) in snapshot.symbols.items():
+            if (calc.short_window, calc.long_window) != (self.short_window, self.long_window):
+                logger.warning(f"Not restoring {symbol}: snapshot windows {calc.short_window}/{calc.long_window} "
+                               f"differ from {self.short_window}/{self.long_window}")
+                continue
+            if calc.compensated and not self.compensated:
+                calc.short_sum, calc.short_comp = calc.short_sum + calc.short_comp, 0.0
+                calc.long_sum, calc.long_comp = calc.long_sum + calc.long_comp, 0.0
+            calc.compensated = self.compensated
+            calc.resum_interval = self.resum_interval
+
+            self.calculators[symbol] = calc
+            self.symbol_stats.setdefault(symbol, SymbolStats())
+            self.last_timestamps[symbol] = timestamp
+            self.resume_after[symbol] = timestamp
+            restored += 1
+
+        logger.info(f"Restored {restored} symbols from a snapshot taken "
+                    f"{(time.time_ns() - snapshot.created) / 1e9:,.0f}s ago")
+
+        self.stream_positions.update(snapshot.streams)
+        if self.consumer is not None and snapshot.streams:
+            entries = self.consumer.acked_after(snapshot.streams)
+            for entry in entries:
+                try:
+                    items, _ = decode_envelope(entry.payload)
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Skipping undecodable market data message: {str(e)}")
+                    continue
+                for item in items:
+                    if isinstance(item, Tick):
+                        self.handle_tick(item)
+                self.stream_positions[entry.stream] = entry.id
+            if entries:
+                logger.info(f"Replayed {len(entries)} entries acknowledged after the snapshot")
+        return restored
+
+    def save_snapshot(self) -> None:
+        if self.snapshots is None or not self.calculators:
+            return
+        start = time.perf_counter()
+        size = self.snapshots.save({symbol: (calc, self.last_timestamps[symbol])
+                                    for symbol, calc in self.calculators.items()},
+                                   streams=self.stream_positions)
+        logger.debug(f"Saved snapshot of {len(self.calculators)} symbols ({size:,} bytes) "
+                     f"in {(time.perf_counter() - start) * 1e3:.1f}ms")
+
+    def drain(self, pubsub, timeout=1.0) -> list:
+        """
+        Wait up to timeout for one message, then take whatever else is already
+        buffered, up to batch_size messages
+        """
+        batch = []
+        message = pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        while message is not None:
+            if message.get('type') == 'message':
+                batch.append(message['data'])
+                if len(batch) >= self.batch_size:
+                    break
+            message = pubsub.get_message(ignore_subscribe_messages=True, timeout=0.0)
+        return batch
+
+    def messages_per_second(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.messages / elapsed if elapsed > 0 else 0.0
+
+    def log_stats(self) -> None:
+        logger.info(f"{self.messages} messages in {self.batches} batches "
+                    f"({self.messages_per_second():,.0f} msg/s), {self.signals_published} signals published")
+        if self.replayed_skipped:
+            logger.info(f"  {self.replayed_skipped} replayed ticks already covered by the snapshot skipped")
+        if self.resum_interval:
+            drift = max((calc.max_drift for calc in self.calculators.values()), default=0.0)
+            logger.info(f"  largest SMA sum drift corrected by resums: {drift:.3g}")
+        for symbol, stats in sorted(self.symbol_stats.items()):
+            logger.info(f"  {symbol}: {stats.ticks} ticks, {stats.signals} signals, "
+                        f"latency mean {stats.mean_latency * 1e6:.1f}us max {stats.max_latency * 1e6:.1f}us")
+
+    def run(self, stats_interval=60.0) -> None:
+        if self.consumer is not None:
+            return self.run_streams(stats_interval)
+
+        self.restore()
+
+        if self._shared_client:
+            pubsub = RedisClient.get_pubsub(decode_responses=False, ignore_subscribe_messages=True)
+        else:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(MARKET_DATA_CHANNEL)
+        logger.info(f"Subscribed to {MARKET_DATA_CHANNEL}, publishing signals to {SIGNALS_CHANNEL}")
+
+        next_report = time.monotonic() + stats_interval
+        next_snapshot = time.monotonic() + self.snapshot_interval
+        try:
+            while True:
+                batch = self.drain(pubsub)
+                if batch:
+                    self.process_batch(batch)
+
+                if time.monotonic() >= next_report:
+                    self.log_stats()
+                    next_report = time.monotonic() + stats_interval
+                if time.monotonic() >= next_snapshot:
+                    self.save_snapshot()
+                    next_snapshot = time.monotonic() + self.snapshot_interval
+        except KeyboardInterrupt:
+            logger.info("Shutting down processing service")
+        finally:
+            self.save_snapshot()
+            self.log_stats()
+            pubsub.close()
+
+    def run_streams(self, stats_interval=60.0) -> None:
+        """Consume market data through the stream consumer group until interrupted"""
+        self.consumer.ensure_groups()
+        self.restore()
+        logger.info(f"Reading {', '.join(self.consumer.streams)} as {self.consumer.group}/{self.consumer.consumer}")
+        peers = self.consumer.peers()
+        if peers:
+            # the group hands each entry to one consumer, so every worker sees only part of a symbol's ticks
+            logger.warning(f"{', '.join(peers)} also read these streams in group {self.consumer.group}, "
+                           f"splitting each symbol's ticks and SMA state between workers; "
+                           f"give every worker its own --shard")
+
+        next_report = time.monotonic() + stats_interval
+        next_snapshot = time.monotonic() + self.snapshot_interval
+        try:
+            while True:
+                entries = self.consumer.read()
+                if entries:
+                    self.process_batch([entry.payload for entry in entries], acks=entries)
+
+                if time.monotonic() >= next_report:
+                    self.log_stats()
+                    next_report = time.monotonic() + stats_interval
+                if time.monotonic() >= next_snapshot:
+                    self.save_snapshot()
+                    next_snapshot = time.monotonic() + self.snapshot_interval
+        except KeyboardInterrupt:
+            logger.info("Shutting down processing service")
+        finally:
+            self.save_snapshot()
+            self.log_stats()
+
+def main():
+    parser = argparse.ArgumentParser(description="SMA Processing Service")
+    parser.add_argument('--short-window', type=int, default=int(os.getenv('SMA_SHORT_WINDOW', 50)),
+        help='Short SMA window')
+    parser.add_argument('--long-window', type=int, default=int(os.getenv('SMA_LONG_WINDOW', 100)),
+        help='Long SMA window')
+    parser.add_argument('--batch-size', type=int, default=500,
+        help='Maximum market data messages handled per batch')
+    parser.add_argument('--stats-interval', type=float, default=60.0,
+        help='Seconds between throughput/latency reports')
+    parser.add_argument('--format', choices=FORMATS, default=None,
+        help='Wire format for published signals (default: $MESSAGE_FORMAT, else json)')
+    parser.add_argument('--compensated', action='store_true',
+        help='Use compensated running sums so SMAs do not drift on long-lived streams')
+    parser.add_argument('--resum-interval', type=int, default=int(os.getenv('SMA_RESUM_INTERVAL', 0)) or None,
+        help='Recompute SMA sums exactly every N ticks per symbol and report the drift removed')
+    parser.add_argument('--transport', choices=TRANSPORTS, default=None,
+        help='Pub/sub or Redis Streams (default: $MESSAGE_TRANSPORT, else pubsub)')
+    parser.add_argument('--shards', type=int, default=None,
+        help='Market data stream shards (default: $STREAM_SHARDS, else 1)')
+    parser.add_argument('--shard', type=int, action='append', default=None,
+        help='Shard this worker reads, repeatable (default: all shards)')
+    parser.add_argument('--consumer', type=str, default=os.getenv('STREAM_CONSUMER'),
+        help='Consumer name within the processing group, keep it stable across restarts '
+             '(default: $STREAM_CONSUMER, else processing-<shards read>)')
+    parser.add_argument('--snapshot-file', type=str, default=os.getenv('SNAPSHOT_FILE'),
+        help='File to restore SMA state from on start and snapshot it to (default: $SNAPSHOT_FILE, off if unset)')
+    parser.add_argument('--snapshot-in-redis', action='store_true',
+        help='Also keep the SMA state snapshot in Redis')
+    parser.add_argument('--snapshot-interval', type=float, default=float(os.getenv('SNAPSHOT_INTERVAL', 60.0)),
+        help='Seconds between SMA state snapshots')
+    parser.add_argument('--metrics-file', type=str, default=get_metrics_file(),
+        help='Write SMA and latency metrics to this JSON file (default: $METRICS_FILE, off if unset)')
+    parser.add_argument('--metrics-port', type=int, default=get_metrics_port(),
+        help='Serve metrics for scraping on this port (default: $METRICS_PORT, off if unset)')
+    args = parser.parse_args()
+    metrics.configure(args.metrics_file, args.metrics_port)
+
+    shard_label = ','.join(map(str, sorted(set(args.shard)))) if args.shard else None
+    # named after its shards so a restarted worker picks up its own unacknowledged entries
+    consumer_name = args.consumer or f"processing-{shard_label or 'all'}"
+
+    snapshots = None
+    if args.snapshot_file or args.snapshot_in_redis:
+        # each shard set owns different symbols and streams, so it gets its own snapshot
+        snapshot_key, snapshot_file = SNAPSHOT_REDIS_KEY, args.snapshot_file
+        if shard_label:
+            snapshot_key = f"{SNAPSHOT_REDIS_KEY}:{shard_label}"
+            if snapshot_file:
+                root, ext = os.path.splitext(snapshot_file)
+                snapshot_file = f"{root}.{shard_label}{ext}"
+        snapshots = SnapshotStore(path=snapshot_file,
+                                  redis_client=RedisClient.get_instance(decode_responses=False)
+                                  if args.snapshot_in_redis else None,
+                                  redis_key=snapshot_key)
+
+    streams = consumer = None
+    if (args.transport or get_transport()) == TRANSPORT_STREAMS:
+        shards = args.shards or get_shards()
+        streams = StreamPublisher(shards=shards, maxlen=get_maxlen())
+        consumer = StreamConsumer(RedisClient.get_instance(decode_responses=False),
+                                  market_data_streams(shards, args.shard), group='processing',
+                                  consumer=consumer_name, count=args.batch_size)
+
+    service = ProcessingService(
+        short_window=args.short_window,
+        long_window=args.long_window,
+        batch_size=args.batch_size,
+        message_format=args.format,
+        streams=streams,
+        consumer=consumer,
+        compensated=args.compensated,
+        resum_interval=args.resum_interval,
+        snapshots=snapshots,
+        snapshot_interval=args.snapshot_interval
+    )
+    service.run(stats_interval=args.stats_interval)
+
+if __name__ == "__main__":
+    main()
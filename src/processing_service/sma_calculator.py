@@ -1,15 +1,36 @@
+import math
 import logging
 from collections import deque
-from typing import Tuple
+from typing import Optional, Tuple
 
 logger = logging.getLogger('sma_calculator')
 
+def _neumaier_add(total: float, comp: float, value: float) -> Tuple[float, float]:
+    # add value to total, carrying the rounding error in comp
+    t = total + value
+    if abs(total) >= abs(value):
+        comp += (total - t) + value
+    else:
+        comp += (value - t) + total
+    return t, comp
+
 class SMACalculator: 
-    "Simple MA calc using deque algo for O(1) --> runnign window"
+    """
+    Simple MA calc using deque algo for O(1) --> runnign window
+
+    The running sums subtract every evicted price, so rounding error builds
+    up over a long-lived stream. Two drift-free options keep updates O(1):
+    compensated=True carries each sum's rounding error with Neumaier
+    summation, and resum_interval=N recomputes both sums exactly (math.fsum)
+    every N updates, recording the drift it corrected in max_drift.
+    """
 
-    def __init__(self, short_window: int = 50, long_window: int = 100): 
+    def __init__(self, short_window: int = 50, long_window: int = 100,
+                 compensated: bool = False, resum_interval: Optional[int] = None): 
         self.short_window = short_window
         self.long_window = long_window
+        self.compensated = compensated
+        self.resum_interval = resum_interval if resum_interval and resum_interval > 0 else None
 
         self.short_prices = deque(maxlen = short_window)
         self.long_prices = deque(maxlen = long_window)
@@ -17,6 +38,13 @@ class SMACalculator:
         self.short_sum = 0.0
         self.long_sum = 0.0
 
+        # Neumaier compensation terms, only used when compensated
+        self.short_comp = 0.0
+        self.long_comp = 0.0
+
+        self.updates = 0
+        self.max_drift = 0.0  # largest sum error corrected by a periodic resum
+
         #store last SMAs for crossover detecion
         self.prev_short_sma = None
         self.prev_long_sma = None
@@ -28,6 +56,18 @@ class SMACalculator:
         self.prev_short_sma = self.get_short_sma()
         self.prev_long_sma = self.get_long_sma()
 
+        if self.compensated:
+            self._update_compensated(price)
+        else:
+            self._update_plain(price)
+
+        self.updates += 1
+        if self.resum_interval and self.updates % self.resum_interval == 0:
+            self.resum()
+
+        return self.get_short_sma(), self.get_long_sma()
+
+    def _update_plain(self, price: float) -> None:
         #update short window
         if len(self.short_prices) == self.short_window: 
             self.short_sum -= self.short_prices[0]
@@ -40,17 +80,45 @@ class SMACalculator:
 
         self.long_prices.append(price)
         self.long_sum += price
-        
-        return self.get_short_sma(), self.get_long_sma()
+
+    def _update_compensated(self, price: float) -> None:
+        if len(self.short_prices) == self.short_window:
+            self.short_sum, self.short_comp = _neumaier_add(self.short_sum, self.short_comp, -self.short_prices[0])
+        self.short_prices.append(price)
+        self.short_sum, self.short_comp = _neumaier_add(self.short_sum, self.short_comp, price)
+
+        if len(self.long_prices) == self.long_window:
+            self.long_sum, self.long_comp = _neumaier_add(self.long_sum, self.long_comp, -self.long_prices[0])
+        self.long_prices.append(price)
+        self.long_sum, self.long_comp = _neumaier_add(self.long_sum, self.long_comp, price)
+
+    def drift(self) -> Tuple[float, float]:
+        """Current absolute error of the (short, long) running sums against an exact sum, O(window)"""
+        return (abs(self.short_sum + self.short_comp - math.fsum(self.short_prices)),
+                abs(self.long_sum + self.long_comp - math.fsum(self.long_prices)))
+
+    def resum(self) -> Tuple[float, float]:
+        """Replace both running sums with exact ones, returns the drift that was removed"""
+        drift = self.drift()
+        self.max_drift = max(self.max_drift, *drift)
+        self.short_sum, self.short_comp = math.fsum(self.short_prices), 0.0
+        self.long_sum, self.long_comp = math.fsum(self.long_prices), 0.0
+        if drift[0] or drift[1]:
+            logger.debug(f"Resummed SMA windows after {self.updates} updates, drift {drift[0]:.3g}/{drift[1]:.3g}")
+        return drift
         
     def get_short_sma(self) -> float:
         if not self.short_prices:
             return 0.0
+        if self.compensated:
+            return (self.short_sum + self.short_comp) / len(self.short_prices)
         return self.short_sum / len(self.short_prices)
         
     def get_long_sma(self) -> float:
         if not self.long_prices:
             return 0.0
+        if self.compensated:
+            return (self.long_sum + self.long_comp) / len(self.long_prices)
         return self.long_sum / len(self.long_prices)
     
     def detect_crossover(self) -> str:
@@ -0,0 +1,82 @@
+from typing import Tuple
+
+import numpy as np
+
+from .batch_sma import SIGNAL_BUY, SIGNAL_NONE, SIGNAL_SELL
+
+
+def _window_means(prices: np.ndarray, window: int) -> np.ndarray:
+    # replay SMACalculator's running sum: once the window is full each update
+    # subtracts the evicted price and then adds the new one. Interleaving those
+    # terms and accumulating them in order (np.add.accumulate is sequential,
+    # unlike np.sum) rounds exactly as the calculator does, so the means agree
+    # to the last bit.
+    n = prices.shape[0]
+    terms = np.zeros(2 * n, dtype=np.float64)
+    if n > window:
+        terms[2 * window::2] = -prices[:n - window]
+    terms[1::2] = prices
+    sums = np.add.accumulate(terms)[1::2]
+    return sums / np.minimum(np.arange(1, n + 1), window)
+
+
+def sma_series(prices, short_window: int = 50, long_window: int = 100) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute every short/long SMA of a price series in one vectorised pass
+
+    Matches SMACalculator.update (the default, uncompensated mode) called on
+    each price in turn, bit for bit: while a window is not yet full the SMA is
+    the mean of all prices seen so far, and the running sums round the same
+    way, so the strict crossover comparisons fire on the same bars even where
+    the two SMAs are equal, e.g. on flat prices.
+
+    Args:
+        prices: 1-D array of prices, oldest first
+        short_window: Number of prices in the short SMA window
+        long_window: Number of prices in the long SMA window
+
+    Returns:
+        Tuple of (short_sma, long_sma) arrays, same length as prices
+    """
+    if short_window < 1 or long_window < 1:
+        raise ValueError("SMA windows must be at least 1")
+
+    prices = np.asarray(prices, dtype=np.float64)
+    if prices.ndim != 1:
+        raise ValueError(f"Expected a 1-D price array, got shape {prices.shape}")
+    if prices.shape[0] == 0:
+        return np.empty(0), np.empty(0)
+
+    return _window_means(prices, short_window), _window_means(prices, long_window)
+
+
+def crossover_series(short_sma: np.ndarray, long_sma: np.ndarray) -> np.ndarray:
+    """
+    Crossover flag for every index, same rules as SMACalculator.detect_crossover
+
+    Before the first price both SMAs count as 0.0, which is what the incremental
+    calculator compares against on its first update.
+
+    Returns:
+        int8 array of SIGNAL_BUY / SIGNAL_SELL / SIGNAL_NONE
+    """
+    short_sma = np.asarray(short_sma, dtype=np.float64)
+    long_sma = np.asarray(long_sma, dtype=np.float64)
+
+    prev_short = np.concatenate(([0.0], short_sma[:-1]))
+    prev_long = np.concatenate(([0.0], long_sma[:-1]))
+
+    golden = (prev_short <= prev_long) & (short_sma > long_sma)
+    death = (prev_short >= prev_long) & (short_sma < long_sma)
+    return np.where(golden, SIGNAL_BUY, np.where(death, SIGNAL_SELL, SIGNAL_NONE)).astype(np.int8)
+
+
+def crossover_indices(prices, short_window: int = 50, long_window: int = 100) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run a whole-series SMA crossover backtest in one pass
+
+    Returns:
+        Tuple of (golden_cross_indices, death_cross_indices) into prices
+    """
+    signals = crossover_series(*sma_series(prices, short_window, long_window))
+    return np.flatnonzero(signals == SIGNAL_BUY), np.flatnonzero(signals == SIGNAL_SELL)
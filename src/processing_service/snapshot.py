@@ -0,0 +1,207 @@
+"""
+Snapshots of the processing service's per-symbol SMA state
+
+A restarted processing service would otherwise start every SMACalculator
+empty and need long_window ticks per symbol before its signals mean anything.
+A snapshot holds each calculator's price window, running sums and previous
+SMAs together with the timestamp of the last tick it saw, so a restart
+restores them and only has to see the ticks after that timestamp.
+
+When the service reads Redis Streams the snapshot also records the last
+entry id it acknowledged on each stream. Entries acknowledged after the
+snapshot was taken are not delivered again, so a restart replays them from
+there (see StreamConsumer.acked_after) instead of losing them.
+
+The format is a small header followed by one fixed-width record per symbol,
+its name and its window as float64. Both windows are tails of the same price
+stream, so only the longer one is stored. The stream positions follow the
+records.
+"""
+import os
+import math
+import time
+import struct
+import logging
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .sma_calculator import SMACalculator
+
+logger = logging.getLogger('snapshot')
+
+SNAPSHOT_MAGIC = b'MRCSNAPS'
+SNAPSHOT_VERSION = 2  # 2 added the stream positions
+DEFAULT_REDIS_KEY = 'processing_snapshot'
+
+HEADER = struct.Struct('<8sIIq')  # magic, version, symbol count, created (ns since epoch)
+# symbol length, short window, long window, short count, long count, compensated,
+# short sum, long sum, short comp, long comp, previous short SMA, previous long SMA,
+# max drift, updates, last tick timestamp
+RECORD = struct.Struct('<HIIIIBdddddddqq')
+POSITIONS = struct.Struct('<I')  # stream count
+POSITION = struct.Struct('<HH')  # stream key length, entry id length
+
+
+class SymbolState(NamedTuple):
+    calculator: SMACalculator
+    timestamp: int  # last tick folded into the calculator
+
+
+class Snapshot(NamedTuple):
+    created: int
+    symbols: Dict[str, SymbolState]
+    streams: Dict[str, str] = {}  # stream key -> last entry id acknowledged
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+def encode_snapshot(states: Dict[str, Tuple[SMACalculator, int]], created: Optional[int] = None,
+                    streams: Optional[Dict[str, str]] = None) -> bytes:
+    """
+    Pack calculators and their last tick timestamps
+
+    Args:
+        states: symbol -> (calculator, timestamp of its last tick)
+        created: Snapshot time in ns since the epoch, defaults to now
+        streams: stream key -> last entry id acknowledged, if reading streams
+    """
+    parts = [HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(states),
+                         time.time_ns() if created is None else created)]
+    for symbol, (calc, timestamp) in states.items():
+        name = symbol.encode('utf-8')
+        window = calc.long_prices if len(calc.long_prices) >= len(calc.short_prices) else calc.short_prices
+        parts.append(RECORD.pack(
+            len(name), calc.short_window, calc.long_window, len(calc.short_prices), len(calc.long_prices),
+            calc.compensated, calc.short_sum, calc.long_sum, calc.short_comp, calc.long_comp,
+            math.nan if calc.prev_short_sma is None else calc.prev_short_sma,
+            math.nan if calc.prev_long_sma is None else calc.prev_long_sma,
+            calc.max_drift, calc.updates, timestamp
+        ))
+        parts.append(name)
+        parts.append(np.fromiter(window, dtype='<f8', count=len(window)).tobytes())
+
+    streams = streams or {}
+    parts.append(POSITIONS.pack(len(streams)))
+    for stream, entry_id in streams.items():
+        key, entry_id = stream.encode('utf-8'), entry_id.encode('ascii')
+        parts.append(POSITION.pack(len(key), len(entry_id)))
+        parts.append(key)
+        parts.append(entry_id)
+    return b''.join(parts)
+
+
+def decode_snapshot(data: bytes) -> Snapshot:
+    """Unpack a snapshot produced by encode_snapshot, raises ValueError if it is malformed"""
+    if len(data) < HEADER.size:
+        raise ValueError("Truncated snapshot header")
+    magic, version, count, created = HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or version not in (1, SNAPSHOT_VERSION):
+        raise ValueError("Unknown snapshot format")
+
+    symbols = {}
+    streams = {}
+    offset = HEADER.size
+    try:
+        for _ in range(count):
+            (name_len, short_window, long_window, n_short, n_long, compensated, short_sum, long_sum,
+             short_comp, long_comp, prev_short, prev_long, max_drift, updates, timestamp) = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            symbol = data[offset:offset + name_len].decode('utf-8')
+            offset += name_len
+
+            n_window = max(n_short, n_long)
+            window = np.frombuffer(data, dtype='<f8', count=n_window, offset=offset).tolist()
+            offset += n_window * 8
+
+            calc = SMACalculator(short_window, long_window, compensated=bool(compensated))
+            calc.short_prices.extend(window[n_window - n_short:])
+            calc.long_prices.extend(window[n_window - n_long:])
+            calc.short_sum, calc.long_sum = short_sum, long_sum
+            calc.short_comp, calc.long_comp = short_comp, long_comp
+            calc.prev_short_sma, calc.prev_long_sma = _optional(prev_short), _optional(prev_long)
+            calc.max_drift, calc.updates = max_drift, updates
+            symbols[symbol] = SymbolState(calc, timestamp)
+
+        if version >= 2:
+            (stream_count,) = POSITIONS.unpack_from(data, offset)
+            offset += POSITIONS.size
+            for _ in range(stream_count):
+                key_len, id_len = POSITION.unpack_from(data, offset)
+                offset += POSITION.size
+                stream = data[offset:offset + key_len].decode('utf-8')
+                offset += key_len
+                streams[stream] = data[offset:offset + id_len].decode('ascii')
+                offset += id_len
+    except (struct.error, ValueError) as e:
+        raise ValueError(f"Truncated snapshot: {str(e)}")
+
+    if offset > len(data):
+        raise ValueError(f"Truncated snapshot: expected {offset} bytes, got {len(data)}")
+    return Snapshot(created, symbols, streams)
+
+
+class SnapshotStore:
+    """
+    Where snapshots are kept: a local file and, if a Redis client is given, a
+    Redis key so a worker restarted on another host can pick them up. When
+    both hold a snapshot the newer one wins.
+    """
+
+    def __init__(self, path: Optional[str] = None, redis_client=None, redis_key: str = DEFAULT_REDIS_KEY):
+        """
+        Initialize the store
+
+        Args:
+            path: Local snapshot file, None to skip the file
+            redis_client: Optional Redis client to also keep the snapshot in
+            redis_key: Redis key holding the snapshot
+        """
+        self.path = path
+        self.redis_client = redis_client
+        self.redis_key = redis_key
+
+    def save(self, states: Dict[str, Tuple[SMACalculator, int]], streams: Optional[Dict[str, str]] = None) -> int:
+        """Write a snapshot of states and stream positions, returns its size in bytes"""
+        data = encode_snapshot(states, streams=streams)
+
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # write to a temp file and rename so a crash never leaves half a snapshot
+            tmp_path = f"{self.path}.tmp.{os.getpid()}"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+
+        if self.redis_client is not None:
+            try:
+                self.redis_client.set(self.redis_key, data)
+            except Exception as e:
+                logger.error(f"Error writing snapshot to Redis: {str(e)}")
+
+        return len(data)
+
+    def load(self) -> Optional[Snapshot]:
+        """Newest readable snapshot, or None if there is none"""
+        candidates = []
+
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'rb') as f:
+                    candidates.append(decode_snapshot(f.read()))
+            except (OSError, ValueError) as e:
+                logger.error(f"Error reading snapshot from {self.path}: {str(e)}")
+
+        if self.redis_client is not None:
+            try:
+                data = self.redis_client.get(self.redis_key)
+                if data:
+                    candidates.append(decode_snapshot(data))
+            except Exception as e:
+                logger.error(f"Error reading snapshot from Redis: {str(e)}")
+
+        return max(candidates, key=lambda snapshot: snapshot.created, default=None)
@@ -0,0 +1,165 @@
+"""
+In-memory stand-ins for the Redis clients the services are handed in tests
+
+FakeRedis records what was published, keeps plain and hash keys, and counts
+round-trips: one per direct publish, one per pipeline execute().
+FakeStreamsRedis adds the stream and consumer group commands.
+"""
+from redis.exceptions import ResponseError
+
+
+class FakePipeline:
+    """Queues commands and runs them on the client in a single round-trip"""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        self.client.round_trips += 1
+        calls, self.calls = self.calls, []
+        return [self.client.apply(name, *args, **kwargs) for name, args, kwargs in calls]
+
+
+class FakeRedis:
+    """Records what would be published and how many round-trips it took"""
+
+    def __init__(self):
+        self.published = []  # (channel, message)
+        self.round_trips = 0
+        self.values = {}
+        self.hashes = {}
+
+    def publish(self, channel, message):
+        self.round_trips += 1
+        return self.apply('publish', channel, message)
+
+    def apply(self, command, *args, **kwargs):
+        """Run one command without counting a round-trip, as part of a pipeline"""
+        if command == 'publish':
+            self.published.append(args)
+            return 1
+        return getattr(self, command)(*args, **kwargs)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update({k: str(v) for k, v in mapping.items()})
+
+
+def id_key(entry_id):
+    ms, seq = entry_id.split('-')
+    return int(ms), int(seq)
+
+
+def in_range(entry_id, low, high):
+    key = id_key(entry_id)
+    if low != '-':
+        bound = id_key(low.lstrip('('))
+        if key < bound or (low.startswith('(') and key == bound):
+            return False
+    return high == '+' or key <= id_key(high)
+
+
+class FakeStreamsRedis(FakeRedis):
+    """Just enough of the stream and consumer group commands to exercise consumer groups"""
+
+    def __init__(self):
+        super().__init__()
+        self.streams = {}  # key -> [(id, fields)]
+        self.groups = {}  # (key, group) -> {'last': id key, 'pending': {consumer: [ids]}}
+        self.seq = 0
+        self.now_ms = 0  # advanced by tests to age pending entries and consumers
+        self.delivered = {}  # (key, group, id) -> now_ms when delivered
+        self.seen = {}  # (key, group, consumer) -> now_ms of its last read
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        self.seq += 1
+        entry_id = f"{self.seq}-0"
+        entries = self.streams.setdefault(key, [])
+        entries.append((entry_id, dict(fields)))
+        if maxlen is not None:
+            del entries[:-maxlen]
+        return entry_id
+
+    def xgroup_create(self, key, group, id='$', mkstream=False):
+        if (key, group) in self.groups:
+            raise ResponseError("BUSYGROUP Consumer Group name already exists")
+        self.streams.setdefault(key, [])
+        self.groups[(key, group)] = {'last': (0, 0) if id == '0' else (self.seq, 0), 'pending': {}}
+
+    def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        reply = []
+        for key, cursor in streams.items():
+            state = self.groups[(key, group)]
+            pending = state['pending'].setdefault(consumer, [])
+            self.seen[(key, group, consumer)] = self.now_ms
+            if cursor == '>':
+                messages = [(i, f) for i, f in self.streams[key] if id_key(i) > state['last']][:count]
+                if messages:
+                    state['last'] = id_key(messages[-1][0])
+                    pending.extend(i for i, _ in messages)
+                    for i, _ in messages:
+                        self.delivered[(key, group, i)] = self.now_ms
+            else:
+                present = dict(self.streams[key])
+                messages = [(i, present.get(i)) for i in pending][:count]
+            if messages:
+                reply.append([key.encode(), [(i.encode(), f) for i, f in messages]])
+        return reply
+
+    def xack(self, key, group, *ids):
+        pending = self.groups[(key, group)]['pending']
+        for consumer, entries in pending.items():
+            pending[consumer] = [i for i in entries if i not in ids]
+        return len(ids)
+
+    def xautoclaim(self, key, group, consumer, min_idle_time, start_id='0-0', count=None):
+        pending = self.groups[(key, group)]['pending']
+        claimed = []
+        for owner, ids in pending.items():
+            idle = [i for i in ids if self.now_ms - self.delivered[(key, group, i)] >= min_idle_time]
+            pending[owner] = [i for i in ids if i not in idle]
+            claimed.extend(idle)
+        claimed.sort(key=id_key)
+        mine = pending.setdefault(consumer, [])
+        mine.extend(claimed)
+        mine.sort(key=id_key)
+        for i in claimed:
+            self.delivered[(key, group, i)] = self.now_ms
+        present = dict(self.streams[key])
+        return [b'0-0', [(i.encode(), present.get(i)) for i in claimed], []]
+
+    def xinfo_consumers(self, key, group):
+        return [{'name': consumer.encode(), 'pending': len(ids),
+                 'idle': self.now_ms - self.seen.get((key, group, consumer), 0)}
+                for consumer, ids in self.groups[(key, group)]['pending'].items()]
+
+    def xinfo_groups(self, key):
+        return [{'name': group.encode(), 'last-delivered-id': '{}-{}'.format(*state['last']).encode()}
+                for (stream, group), state in self.groups.items() if stream == key]
+
+    def xrange(self, key, min='-', max='+', count=None):
+        entries = [(i.encode(), f) for i, f in self.streams.get(key, []) if in_range(i, min, max)]
+        return entries[:count]
+
+    def xpending_range(self, key, group, min, max, count, consumername=None):
+        pending = self.groups[(key, group)]['pending']
+        ids = sorted((i for ids in pending.values() for i in ids if in_range(i, min, max)), key=id_key)
+        return [{'message_id': i.encode()} for i in ids[:count]]
+
+    def pending_count(self, key, group):
+        return sum(len(ids) for ids in self.groups[(key, group)]['pending'].values())
@@ -0,0 +1,163 @@
+import asyncio
+import time
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.data_feed_service.async_live_feed import AsyncAlphaVantageDataFeed, TokenBucket
+from src.data_feed_service.watermarks import WatermarkStore
+
+
+def daily_response(symbol):
+    return {
+        "Meta Data": {"2. Symbol": symbol},
+        "Time Series (Daily)": {
+            "2025-08-29": {"1. open": "245.23", "2. high": "245.46", "3. low": "241.72",
+                           "4. close": "243.49", "5. volume": "2967558"},
+            "2025-08-28": {"1. open": "241.00", "2. high": "246.00", "3. low": "240.80",
+                           "4. close": "245.10", "5. volume": "2800000"},
+        }
+    }
+
+
+class MockAlphaVantage:
+    """Serves daily data, rate limiting the first request for some symbols"""
+
+    def __init__(self, throttled=(), delay=0.0, full_response=None, refusals=None):
+        self.throttled = set(throttled)
+        self.refusals = refusals or {}  # symbol -> body sent instead of data, on every request
+        self.delay = delay
+        self.full_response = full_response  # body for outputsize=full, default the usual data
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, request):
+        symbol = request.query['symbol']
+        self.requests.append(symbol)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if symbol in self.throttled:
+                self.throttled.discard(symbol)
+                if len(self.requests) % 2:
+                    return web.Response(status=429, text="Too Many Requests")
+                return web.json_response({"Note": "Thank you for using Alpha Vantage! Our standard API "
+                                                   "call frequency is 5 calls per minute and 500 calls per day."})
+            if symbol in self.refusals:
+                return web.json_response(self.refusals[symbol])
+            if symbol == "BAD":
+                return web.json_response({"Error Message": "Invalid API call"})
+            if request.query.get('outputsize') == 'full' and self.full_response is not None:
+                return web.json_response(self.full_response)
+            return web.json_response(daily_response(symbol))
+        finally:
+            self.in_flight -= 1
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/query', self.handle)
+        return app
+
+
+class TestAsyncAlphaVantageDataFeed(unittest.IsolatedAsyncioTestCase):
+    """Tests for the asyncio Alpha Vantage fetcher against a local mock server"""
+
+    async def start(self, mock):
+        server = TestServer(mock.app())
+        await server.start_server()
+        self.addAsyncCleanup(server.close)
+        return str(server.make_url('/query'))
+
+    def make_feed(self, url, symbols, **kwargs):
+        feed = AsyncAlphaVantageDataFeed(symbols=symbols, api_key="test", base_url=url, **kwargs)
+        feed.backoff_time = 0.01
+        return feed
+
+    async def test_fetches_all_symbols_concurrently(self):
+        """Test every symbol is fetched with bounded concurrency"""
+        mock = MockAlphaVantage(delay=0.05)
+        url = await self.start(mock)
+        symbols = [f"SYM{i}" for i in range(20)]
+        feed = self.make_feed(url, symbols, requests_per_minute=60000, burst=20, max_concurrency=5)
+
+        start = time.perf_counter()
+        all_ticks = await feed.fetch_data_async()
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(list(all_ticks), symbols)
+        self.assertEqual(all_ticks["SYM3"][-1].price, 243.49)
+        self.assertLessEqual(mock.max_in_flight, 5)
+        self.assertLess(elapsed, 20 * 0.05)
+
+    async def test_rate_limited_symbols_are_retried(self):
+        """Test 429s and throttle notes are retried instead of dropped"""
+        mock = MockAlphaVantage(throttled={"IBM", "MSFT"})
+        url = await self.start(mock)
+        feed = self.make_feed(url, ["IBM", "AAPL", "MSFT", "BAD"], requests_per_minute=60000)
+
+        all_ticks = await feed.fetch_data_async()
+
+        self.assertEqual(list(all_ticks), ["IBM", "AAPL", "MSFT"])
+        self.assertEqual(mock.requests.count("IBM"), 2)
+        self.assertEqual(mock.requests.count("BAD"), 1)
+
+    async def test_other_information_messages_are_not_retried(self):
+        """Test premium-only and daily quota messages fail the symbol on the first response"""
+        mock = MockAlphaVantage(refusals={
+            "IBM": {"Information": "Thank you for using Alpha Vantage! This is a premium endpoint."},
+            "MSFT": {"Information": "Thank you for using Alpha Vantage! Our standard API rate limit "
+                                    "is 25 requests per day."},
+        })
+        url = await self.start(mock)
+        feed = self.make_feed(url, ["IBM", "AAPL", "MSFT"], requests_per_minute=60000)
+
+        with self.assertLogs('async_live_feed', level='ERROR'):
+            all_ticks = await feed.fetch_data_async()
+
+        self.assertEqual(list(all_ticks), ["AAPL"])
+        self.assertEqual(mock.requests.count("IBM"), 1)
+        self.assertEqual(mock.requests.count("MSFT"), 1)
+
+    async def test_failed_backfill_skips_symbol(self):
+        """Test a symbol whose gap-filling full fetch fails is skipped and keeps its watermark"""
+        mock = MockAlphaVantage(full_response={"Error Message": "Invalid API call"})
+        url = await self.start(mock)
+        watermarks = WatermarkStore()
+        watermarks.advance("IBM", 1_700_000_000)  # long before the compact window
+        feed = self.make_feed(url, ["IBM", "AAPL"], requests_per_minute=60000, watermarks=watermarks)
+
+        with self.assertLogs('async_live_feed', level='ERROR'):
+            all_ticks = await feed.fetch_data_async()
+
+        self.assertEqual(list(all_ticks), ["AAPL"])
+        self.assertEqual(mock.requests.count("IBM"), 2)
+        feed.commit_watermarks(all_ticks)
+        self.assertEqual(watermarks.get("IBM"), 1_700_000_000)
+
+    async def test_token_bucket_rate(self):
+        """Test the limiter spaces requests at the configured rate after the burst"""
+        bucket = TokenBucket(rate=100, capacity=2)
+        start = time.perf_counter()
+        for _ in range(7):
+            await bucket.acquire()
+        # 2 free tokens, then 5 more at 100/s
+        self.assertGreaterEqual(time.perf_counter() - start, 0.045)
+
+    async def test_concurrent_pauses_do_not_stack(self):
+        """Test several 429s at once back off for one pause, not their sum"""
+        bucket = TokenBucket(rate=100, capacity=2)
+        for _ in range(8):
+            bucket.pause(0.05)
+        self.assertGreaterEqual(bucket._tokens, -0.05 * 100 - 1e-9)
+
+        start = time.perf_counter()
+        await bucket.acquire()
+        elapsed = time.perf_counter() - start
+        self.assertGreaterEqual(elapsed, 0.045)
+        self.assertLess(elapsed, 0.2)
+
+if __name__ == "__main__":
+    unittest.main()
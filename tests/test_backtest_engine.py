@@ -0,0 +1,94 @@
+import unittest
+import numpy as np
+
+from src.backtest.engine import BacktestEngine, merge_ticks
+from src.backtest.strategy import order_for_signal
+from src.common.clock import event_clock
+from src.common.models import Portfolio, Signal, Tick
+from src.common.tick_columns import TickColumns
+from src.common.wire import decode_message, encode_message
+from src.exchange_service.main import ExchangeService
+from src.processing_service.main import ProcessingService
+from tests.fakes import FakeRedis
+
+
+def make_ticks(symbols, n, seed=3):
+    rng = np.random.default_rng(seed)
+    ticks = {}
+    for offset, symbol in enumerate(symbols):
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        # staggered starts and shared timestamps exercise the merge order
+        ticks[symbol] = [Tick(symbol=symbol, price=float(p), timestamp=1000 + offset * 7 + i * 10)
+                         for i, p in enumerate(prices)]
+    return ticks
+
+
+class TestBacktestEngine(unittest.TestCase):
+    """Tests for the in-process BacktestEngine"""
+
+    def test_merge_is_timestamp_ordered(self):
+        """Test the k-way merge keeps timestamp order and symbol order on ties"""
+        ticks = {
+            'B': [Tick('B', 1.0, 1), Tick('B', 1.0, 3)],
+            'A': [Tick('A', 1.0, 1), Tick('A', 1.0, 2)],
+        }
+        merged = [(t.timestamp, t.symbol) for t in merge_ticks(ticks)]
+        self.assertEqual(merged, [(1, 'B'), (1, 'A'), (2, 'A'), (3, 'B')])
+
+    def test_matches_services(self):
+        """Test a replay gives the same signals and fills as the Redis services"""
+        ticks = make_ticks(['IBM', 'AAPL', 'MSFT'], 600)
+
+        result = BacktestEngine(short_window=5, long_window=20, initial_cash=10000.0,
+                                trade_quantity=10).run(ticks)
+
+        processing = ProcessingService(redis_client=FakeRedis(), short_window=5, long_window=20,
+                                       message_format='json')
+        exchange = ExchangeService(redis_client=FakeRedis(), portfolio=Portfolio(cash=10000.0),
+                                   message_format='json')
+        signals, executions = [], []
+        with event_clock.replay():
+            for tick in merge_ticks(ticks):
+                payload = encode_message(tick, 'binary')
+                executions.extend(exchange.process_batch([payload]))
+                for signal in processing.process_batch([payload]):
+                    signals.append(signal)
+                    order = order_for_signal(signal.signal, signal.symbol, exchange.exchange.portfolio.holdings,
+                                             10, signal.timestamp)
+                    if order is not None:
+                        executions.extend(exchange.process_batch([encode_message(order)]))
+
+        fills = lambda items: [(e.symbol, e.side, e.quantity, e.price, e.timestamp, e.pnl) for e in items]
+        self.assertGreater(len(result.executions), 4)
+        self.assertEqual(result.signals, signals)
+        self.assertEqual(fills(result.executions), fills(executions))
+        self.assertEqual(result.final_value, exchange.exchange.portfolio.total_value)
+        self.assertEqual(result.ticks, 1800)
+
+    def test_accepts_tick_columns(self):
+        """Test columnar input replays the same as Tick lists"""
+        ticks = make_ticks(['IBM', 'AAPL'], 300, seed=5)
+        columns = {}
+        for symbol, items in ticks.items():
+            n = len(items)
+            columns[symbol] = TickColumns(symbol, np.array([t.timestamp for t in items]),
+                                          np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan),
+                                          np.array([t.price for t in items]), np.zeros(n, dtype=np.int64))
+
+        from_lists = BacktestEngine(short_window=5, long_window=20).run(ticks)
+        from_columns = BacktestEngine(short_window=5, long_window=20).run(columns)
+        self.assertEqual(from_lists.signals, from_columns.signals)
+        self.assertEqual(from_lists.final_value, from_columns.final_value)
+
+    def test_event_clock_restored(self):
+        """Test a replay leaves the process clock as it found it"""
+        ticks = make_ticks(['IBM'], 50)
+        event_clock.set(42)
+        try:
+            BacktestEngine(short_window=5, long_window=20).run(ticks)
+            self.assertEqual(event_clock.now(), 42)
+        finally:
+            event_clock.reset()
+
+if __name__ == '__main__':
+    unittest.main()
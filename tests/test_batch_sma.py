@@ -0,0 +1,85 @@
+import random
+import unittest
+
+import numpy as np
+
+from src.processing_service.batch_sma import BatchSMAEngine, SIGNAL_NAMES
+from src.processing_service.sma_calculator import SMACalculator
+
+
+class TestBatchSMAEngine(unittest.TestCase):
+    """Tests for the BatchSMAEngine class"""
+
+    def assert_matches_calculators(self, engine, calculators, symbols, prices):
+        short_sma, long_sma, signals = engine.update_batch(symbols, prices)
+
+        for i, (symbol, price) in enumerate(zip(symbols, prices)):
+            expected_short, expected_long = calculators[symbol].update(price)
+            # exact equality on purpose, the engine must not drift from SMACalculator
+            self.assertEqual(short_sma[i], expected_short)
+            self.assertEqual(long_sma[i], expected_long)
+            self.assertEqual(SIGNAL_NAMES[int(signals[i])], calculators[symbol].detect_crossover())
+
+    def test_matches_sma_calculator(self):
+        """Test random walks over many symbols match SMACalculator exactly"""
+        rng = random.Random(42)
+        symbols = [f"SYM{i}" for i in range(25)]
+        engine = BatchSMAEngine(short_window=3, long_window=7, initial_capacity=4)
+        calculators = {s: SMACalculator(short_window=3, long_window=7) for s in symbols}
+        last = {s: 100.0 for s in symbols}
+
+        for _ in range(60):
+            batch = rng.sample(symbols, 15)
+            prices = []
+            for s in batch:
+                last[s] = round(last[s] + rng.uniform(-2, 2), 2)
+                prices.append(last[s])
+            self.assert_matches_calculators(engine, calculators, batch, prices)
+
+        self.assertEqual(len(engine), 25)
+        self.assertGreaterEqual(engine.capacity, 25)
+
+    def test_repeated_symbol_in_batch(self):
+        """Test updates for the same symbol within one batch are applied in order"""
+        engine = BatchSMAEngine(short_window=2, long_window=4)
+        calculators = {s: SMACalculator(short_window=2, long_window=4) for s in ("A", "B")}
+
+        symbols = ["A", "A", "B", "A", "B", "A", "A"]
+        prices = [10, 10, 50, 20, 40, 5, 5]
+        self.assert_matches_calculators(engine, calculators, symbols, prices)
+
+        self.assertEqual(engine.get_short_sma("A"), calculators["A"].get_short_sma())
+        self.assertEqual(engine.get_long_sma("B"), calculators["B"].get_long_sma())
+
+    def test_crossover_flags(self):
+        """Test the same golden/death cross sequence as test_sma_calculator"""
+        engine = BatchSMAEngine(short_window=2, long_window=4)
+        flags = [engine.update_batch(["IBM"], [p])[2][0] for p in (10, 10, 20, 5, 5)]
+        self.assertEqual([SIGNAL_NAMES[int(f)] for f in flags], ['', '', 'BUY', '', 'SELL'])
+
+    def test_update_slots(self):
+        """Test pre-resolved slot arrays give the same result as symbol batches"""
+        by_symbol = BatchSMAEngine(short_window=2, long_window=3)
+        by_slot = BatchSMAEngine(short_window=2, long_window=3)
+        slots = by_slot.slots_for(["X", "Y"])
+
+        for prices in ([1.0, 2.0], [3.0, 1.0], [2.0, 5.0], [8.0, 0.5]):
+            expected = by_symbol.update_batch(["X", "Y"], prices)
+            actual = by_slot.update_slots(slots, prices)
+            for e, a in zip(expected, actual):
+                np.testing.assert_array_equal(e, a)
+
+    def test_unknown_symbol(self):
+        """Test SMAs for a symbol that never traded"""
+        engine = BatchSMAEngine(short_window=2, long_window=3)
+        self.assertEqual(engine.get_short_sma("NONE"), 0.0)
+        self.assertNotIn("NONE", engine)
+
+    def test_mismatched_batch(self):
+        """Test symbols and prices must line up"""
+        engine = BatchSMAEngine()
+        with self.assertRaises(ValueError):
+            engine.update_batch(["A", "B"], [1.0])
+
+if __name__ == "__main__":
+    unittest.main()
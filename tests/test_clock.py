@@ -0,0 +1,56 @@
+import unittest
+from src.common.clock import EventClock, event_clock
+from src.common.models import Execution, Order, Tick, next_order_id
+
+class TestEventClock(unittest.TestCase):
+    """Tests for the event clock and the model defaults that read it"""
+
+    def tearDown(self):
+        event_clock.reset()
+
+    def test_advance_is_monotonic(self):
+        """Advancing to an earlier time leaves the clock where it is"""
+        clock = EventClock()
+        self.assertFalse(clock.driven)
+        clock.advance(200)
+        clock.advance(100)
+        self.assertEqual(clock.now(), 200)
+        clock.set(100)
+        self.assertEqual(clock.now(), 100)
+        clock.reset()
+        self.assertGreater(clock.now(), 1_000_000_000)  # wall clock again
+
+    def test_replay_restores_previous_time(self):
+        """A replay starts undriven and puts the earlier time back, even on error"""
+        clock = EventClock()
+        clock.set(500)
+        with self.assertRaises(RuntimeError):
+            with clock.replay():
+                self.assertFalse(clock.driven)
+                clock.advance(900)
+                raise RuntimeError("replay failed")
+        self.assertEqual(clock.now(), 500)
+
+    def test_models_use_event_time(self):
+        """Orders and executions are stamped with the event clock"""
+        event_clock.set(1234)
+        self.assertEqual(Order(symbol="AAPL", side="BUY", quantity=1).timestamp, 1234)
+        self.assertEqual(Execution(order_id="x", symbol="AAPL", side="BUY", quantity=1, price=1.0).timestamp, 1234)
+
+    def test_order_ids_unique_and_increasing(self):
+        """Order ids share a process prefix and count up"""
+        ids = [Order(symbol="AAPL", side="BUY", quantity=1).id for _ in range(3)] + [next_order_id()]
+        prefixes = {i.rsplit('-', 1)[0] for i in ids}
+        counters = [int(i.rsplit('-', 1)[1]) for i in ids]
+        self.assertEqual(len(prefixes), 1)
+        self.assertEqual(counters, sorted(set(counters)))
+
+    def test_models_are_slotted(self):
+        """Hot model types carry no per-instance __dict__"""
+        tick = Tick(symbol="AAPL", price=1.0, timestamp=0)
+        self.assertFalse(hasattr(tick, '__dict__'))
+        with self.assertRaises(AttributeError):
+            tick.extra = 1
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import errno
+import io
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from src.common.tick_columns import TickColumns
+from src.data_feed_service.csv_feed import CSVDataFeed, parse_date_timestamp, reverse_lines
+
+CSV_HEADER = "date,open,high,low,close,volume\n"
+
+
+class TestCSVDataFeed(unittest.TestCase):
+    """Tests for the CSVDataFeed class"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_csv(self, name, rows):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w') as f:
+            f.write(CSV_HEADER + "".join(row + "\n" for row in rows))
+        return path
+
+    def test_columnar_matches_row_reader(self):
+        """Test columnar loading produces the same ticks as read_csv_data"""
+        path = self.write_csv("IBM.csv", [
+            "2025-08-29,245.23,245.46,241.72,243.49,2967558",
+            "2025-08-27,240.00,242.10,239.50,241.00,3100000",
+            "2025-08-28,241.00,246.00,240.80,245.10,2800000",
+        ])
+        feed = CSVDataFeed()
+
+        columns = feed.read_csv_columns("IBM", path)
+        self.assertIsInstance(columns, TickColumns)
+        self.assertEqual(columns.to_ticks(), feed.read_csv_data("IBM", path))
+        self.assertEqual(columns.timestamps.tolist(), sorted(columns.timestamps.tolist()))
+
+    def test_sorted_input_is_not_copied(self):
+        """Test the sort is skipped for files already in ascending order"""
+        columns = TickColumns("X", [1, 2, 3], [1, 1, 1], [1, 1, 1], [1, 1, 1], [1, 2, 3], [5, 5, 5])
+        self.assertIs(columns.sorted(), columns)
+
+    def test_bad_rows_are_reported(self):
+        """Test malformed rows are logged and skipped like the row reader"""
+        path = self.write_csv("BAD.csv", [
+            "2025-08-27,240.00,242.10,239.50,241.00,3100000",
+            "2025-08-28,not-a-price,246.00,240.80,245.10,2800000",
+            "08/29/2025,245.23,245.46,241.72,243.49,2967558",
+        ])
+        with self.assertLogs('csv_feed', level='WARNING') as logs:
+            columns = CSVDataFeed().read_csv_columns("BAD", path)
+
+        self.assertEqual(len(columns), 1)
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn("not-a-price", logs.output[0])
+
+    def test_date_fast_path(self):
+        """Test the cached date parser agrees with strptime, including non-padded dates"""
+        for date_str in ("2025-08-29", "1999-12-31", "2024-2-9"):
+            expected = int(datetime.strptime(date_str, "%Y-%m-%d").timestamp())
+            self.assertEqual(parse_date_timestamp(date_str), expected)
+
+        with self.assertRaises(ValueError):
+            parse_date_timestamp("2025-02-30")
+
+    def test_fetch_data_columnar(self):
+        """Test fetch_data returns TickColumns that behave like tick lists"""
+        path = self.write_csv("MSFT.csv", [
+            "2025-08-27,400.0,402.0,399.0,401.0,100",
+            "2025-08-28,401.0,405.0,400.0,404.0,200",
+        ])
+        all_ticks = CSVDataFeed(csv_files={"MSFT": path, "NONE": "missing.csv"}, columnar=True).fetch_data()
+
+        self.assertEqual(list(all_ticks), ["MSFT"])
+        ticks = all_ticks["MSFT"]
+        self.assertEqual(len(ticks), 2)
+        self.assertEqual(ticks[-1].price, 404.0)
+        self.assertEqual([t.volume for t in ticks[-5:]], [100, 200])
+
+    def daily_rows(self, n, start=date(2020, 1, 1)):
+        return [f"{start + timedelta(days=i)},{i}.5,{i}.9,{i}.1,{i}.7,{1000 + i}" for i in range(n)]
+
+    def test_stream_matches_fetch_data(self):
+        """Test streaming ascending and descending files yields the fetch_data ticks"""
+        rows = self.daily_rows(300)
+        files = {
+            'ASC': self.write_csv("ASC.csv", rows),
+            'DESC': self.write_csv("DESC.csv", rows[::-1]),
+        }
+        feed = CSVDataFeed(csv_files=files)
+        expected = feed.fetch_data()
+
+        streams = feed.stream_by_symbol(chunk_size=7)
+        self.assertEqual(list(streams['ASC']), expected['ASC'])
+        self.assertEqual(list(streams['DESC']), expected['DESC'])
+
+        merged = list(feed.stream(chunk_size=7))
+        self.assertEqual(len(merged), 600)
+        self.assertEqual([t.timestamp for t in merged], sorted(t.timestamp for t in merged))
+        self.assertEqual([t.symbol for t in merged[:2]], ['ASC', 'DESC'])
+
+    def test_stream_raises_when_files_cannot_be_opened(self):
+        """Test running out of file descriptors fails the stream instead of dropping a symbol"""
+        files = {symbol: self.write_csv(f"{symbol}.csv", self.daily_rows(10)) for symbol in ('IBM', 'AAPL')}
+        real_open = open
+
+        def limited_open(path, *args, **kwargs):
+            if path == files['AAPL']:
+                raise OSError(errno.EMFILE, "Too many open files")
+            return real_open(path, *args, **kwargs)
+
+        with mock.patch('builtins.open', side_effect=limited_open):
+            with self.assertRaises(OSError):
+                list(CSVDataFeed(csv_files=files).stream())
+
+    def test_stream_skips_bad_and_out_of_order_rows(self):
+        """Test rows that cannot be streamed in order are reported and skipped"""
+        rows = self.daily_rows(5)
+        path = self.write_csv("IBM.csv", [rows[0], rows[2], "2020-01-02,bad,1,1,1,1", rows[1], rows[3]])
+
+        with self.assertLogs('csv_feed', level='WARNING') as logs:
+            ticks = list(CSVDataFeed().iter_ticks("IBM", path))
+
+        self.assertEqual(len(ticks), 3)
+        self.assertEqual(len(logs.output), 2)
+
+    def test_reverse_lines_across_blocks(self):
+        """Test the backwards reader handles lines split over block boundaries"""
+        lines = [f"line-{i}-" + "x" * (i % 13) for i in range(200)]
+        data = ("header\n" + "\n".join(lines)).encode()
+        result = list(reverse_lines(io.BytesIO(data), start=len("header\n"), block_size=16))
+        self.assertEqual(result, [line.encode() for line in lines[::-1]])
+
+    def test_parallel_fetch_matches_serial(self):
+        """Test parallel loading returns the serial result in csv_files order"""
+        files = {symbol: self.write_csv(f"{symbol}.csv", self.daily_rows(50 + i)[::-1])
+                 for i, symbol in enumerate(["MSFT", "AAPL", "IBM", "GOOG"])}
+
+        serial = CSVDataFeed(csv_files=files).fetch_data()
+        parallel = CSVDataFeed(csv_files=files, workers=3).fetch_data()
+        self.assertEqual(list(parallel), list(files))
+        self.assertEqual(parallel, serial)
+
+        columnar = CSVDataFeed(csv_files=files, columnar=True, workers=2).fetch_data()
+        for symbol, columns in columnar.items():
+            self.assertIsInstance(columns, TickColumns)
+            self.assertEqual(columns.to_ticks(), serial[symbol])
+
+    def test_parallel_fetch_reports_worker_warnings(self):
+        """Test warnings logged in workers come back in file order"""
+        files = {
+            'A': self.write_csv("A.csv", ["2020-01-01,1,1,1,1,1", "2020-01-02,bad,1,1,1,1"]),
+            'B': os.path.join(self.tmpdir.name, "missing.csv"),
+            'C': self.write_csv("C.csv", ["2020-01-03,1,1,1,x,1"]),
+        }
+        with self.assertLogs('csv_feed', level='WARNING') as logs:
+            ticks = CSVDataFeed(csv_files=files, workers=3).fetch_data()
+
+        self.assertEqual(list(ticks), ['A'])
+        messages = logs.output
+        self.assertIn("Error processing row", messages[0])
+        self.assertIn("CSV file not found", messages[1])
+        self.assertIn("No ticks extracted for B", messages[2])
+        self.assertIn("Error processing row", messages[3])
+        self.assertIn("No ticks extracted for C", messages[4])
+
+if __name__ == "__main__":
+    unittest.main()
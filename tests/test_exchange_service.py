@@ -0,0 +1,70 @@
+import unittest
+
+from src.common.events import EXECUTIONS_CHANNEL
+from src.common.models import Execution, Order, OrderCancel, Portfolio, Tick
+from src.common.wire import decode_message, encode_message
+from src.exchange_service.main import ExchangeService
+from tests.fakes import FakeRedis
+
+
+class TestExchangeService(unittest.TestCase):
+    """Tests for the ExchangeService class"""
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.service = ExchangeService(redis_client=self.redis, portfolio=Portfolio(cash=10000.0),
+                                       message_format='json')
+
+    def test_orders_and_ticks(self):
+        """Test market orders fill at the last tick and resting limits fill on a cross"""
+        resting = Order(symbol="IBM", side="BUY", quantity=5, order_type="LIMIT", price=95.0)
+        batch = [
+            encode_message(Tick(symbol="IBM", price=100.0, timestamp=1)),
+            encode_message(Order(symbol="IBM", side="BUY", quantity=10)),
+            encode_message(resting, 'binary'),
+            encode_message(Tick(symbol="IBM", price=94.0, timestamp=2), 'binary'),
+        ]
+        executions = self.service.process_batch(batch)
+
+        self.assertEqual([(e.price, e.quantity) for e in executions], [(100.0, 10), (94.0, 5)])
+        self.assertEqual(self.redis.round_trips, 1)
+        channel, payload = self.redis.published[1]
+        self.assertEqual(channel, EXECUTIONS_CHANNEL)
+        self.assertIsInstance(decode_message(payload)[0], Execution)
+        self.assertEqual(self.service.exchange.portfolio.holdings["IBM"], 15)
+
+    def test_cancel_message(self):
+        """Test cancel messages remove resting orders"""
+        order = Order(symbol="IBM", side="SELL", quantity=1, order_type="LIMIT", price=200.0)
+        self.service.process_batch([encode_message(order), encode_message(OrderCancel(order_id=order.id))])
+        self.assertEqual(len(self.service.exchange.order_books["IBM"]), 0)
+
+        with self.assertLogs('exchange_service', level='WARNING'):
+            self.service.process_batch([encode_message(OrderCancel(order_id="unknown"))])
+
+    def test_non_object_json_is_skipped(self):
+        """Test JSON that is not an object is logged and skipped, not fatal to the batch"""
+        batch = ["123", "[1]", "null", encode_message(Tick(symbol="IBM", price=100.0, timestamp=1)),
+                 encode_message(Order(symbol="IBM", side="BUY", quantity=1))]
+        with self.assertLogs('exchange_service', level='WARNING'):
+            executions = self.service.process_batch(batch)
+        self.assertEqual(len(executions), 1)
+
+    def test_duplicate_order_does_not_stop_batch(self):
+        """Test a redelivered resting order is rejected and the rest of the batch still runs"""
+        resting = Order(symbol="IBM", side="BUY", quantity=5, order_type="LIMIT", price=95.0)
+        batch = [
+            encode_message(Tick(symbol="IBM", price=100.0, timestamp=1)),
+            encode_message(resting),
+            encode_message(resting),
+            encode_message(Order(symbol="IBM", side="BUY", quantity=1)),
+        ]
+        with self.assertLogs('simulated_exchange', level='ERROR'):
+            executions = self.service.process_batch(batch)
+
+        self.assertEqual(len(executions), 1)
+        self.assertEqual(len(self.service.exchange.order_books["IBM"]), 1)
+        self.assertEqual(self.service.exchange.rejections, 1)
+
+if __name__ == "__main__":
+    unittest.main()
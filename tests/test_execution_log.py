@@ -0,0 +1,97 @@
+import gc
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.common.execution_log import ExecutionLog
+from src.common.models import Execution, Portfolio
+
+
+def make_executions(n):
+    return [Execution(order_id=f"order-{i}", symbol=("AAPL", "MSFT", "IBM")[i % 3],
+                      side="BUY" if i % 2 else "SELL", quantity=i + 1, price=100.0 + i,
+                      timestamp=1756440000 + i, pnl=i * 0.5) for i in range(n)]
+
+
+class TestExecutionLog(unittest.TestCase):
+    """Tests for the ExecutionLog class"""
+
+    def test_list_like_api(self):
+        """Test appends read back as the same executions"""
+        executions = make_executions(10)
+        log = ExecutionLog()
+        for execution in executions:
+            log.append(execution)
+
+        self.assertEqual(len(log), 10)
+        self.assertEqual(list(log), executions)
+        self.assertEqual(log[0], executions[0])
+        self.assertEqual(log[-1], executions[-1])
+        self.assertEqual(log[2:5], executions[2:5])
+        self.assertEqual(log, executions)
+        with self.assertRaises(IndexError):
+            log[10]
+
+    def test_symbols_are_interned(self):
+        """Test each symbol is stored once"""
+        log = ExecutionLog(make_executions(300))
+        self.assertEqual(len(log._symbols), 3)
+
+    def test_retention_without_spill_drops_oldest(self):
+        """Test retention bounds memory and drops the oldest fills"""
+        executions = make_executions(25)
+        log = ExecutionLog(executions, retention=10, segment_size=5)
+
+        self.assertLessEqual(log.in_memory, 10)
+        self.assertEqual(log.dropped + len(log), 25)
+        self.assertEqual(list(log), executions[log.dropped:])
+
+    def test_spill_to_disk(self):
+        """Test spilled segments stay readable through iteration and indexing"""
+        executions = make_executions(23)
+        with tempfile.TemporaryDirectory() as spill_dir:
+            log = ExecutionLog(executions, retention=5, spill_dir=spill_dir)
+
+            self.assertLessEqual(log.in_memory, 5)
+            self.assertEqual(len(log), 23)
+            self.assertEqual(list(log), executions)
+            self.assertEqual(log[7], executions[7])
+            self.assertEqual(len(os.listdir(spill_dir)), 4)
+
+            log.close()
+            self.assertEqual(os.listdir(spill_dir), [])
+
+    def test_portfolio_trade_history(self):
+        """Test the portfolio records fills in an ExecutionLog"""
+        portfolio = Portfolio(cash=1000.0)
+        execution = Execution(order_id="a", symbol="AAPL", side="BUY", quantity=2, price=10.0)
+        portfolio.update_after_execution(execution)
+
+        self.assertIsInstance(portfolio.trade_history, ExecutionLog)
+        self.assertEqual(list(portfolio.trade_history), [execution])
+
+    def test_portfolio_history_retention(self):
+        """Test retention and spill_dir come from the Portfolio arguments or the environment"""
+        with tempfile.TemporaryDirectory() as spill_dir:
+            portfolio = Portfolio(cash=1000.0, history_retention=3, history_spill_dir=spill_dir)
+            self.assertEqual((portfolio.trade_history.retention, portfolio.trade_history.spill_dir), (3, spill_dir))
+
+            with mock.patch.dict(os.environ, {'EXECUTION_RETENTION': '7', 'EXECUTION_SPILL_DIR': spill_dir}):
+                history = Portfolio(cash=1000.0).trade_history
+            self.assertEqual((history.retention, history.spill_dir), (7, spill_dir))
+
+        with mock.patch.dict(os.environ, {'EXECUTION_RETENTION': '0'}):
+            self.assertIsNone(Portfolio(cash=1000.0).trade_history.retention)
+
+    def test_spilled_segments_removed_without_close(self):
+        """Test segments are deleted once the log is garbage collected"""
+        with tempfile.TemporaryDirectory() as spill_dir:
+            log = ExecutionLog(make_executions(20), retention=5, spill_dir=spill_dir)
+            self.assertTrue(os.listdir(spill_dir))
+            del log
+            gc.collect()
+            self.assertEqual(os.listdir(spill_dir), [])
+
+if __name__ == "__main__":
+    unittest.main()
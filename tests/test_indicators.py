@@ -0,0 +1,109 @@
+import math
+import unittest
+
+import numpy as np
+
+from src.processing_service.indicators import (EMA, RSI, SMA, VWAP, Bollinger, IndicatorSet, RingBuffer,
+                                               RollingMax, RollingMin, RollingVariance)
+from src.processing_service.sma_calculator import SMACalculator
+
+
+def make_series(n=500, seed=11):
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    prices[100:110] = prices[100]  # a flat stretch
+    volumes = rng.integers(0, 5000, n).astype(float)
+    return prices, volumes
+
+
+def make_set():
+    return IndicatorSet({
+        'sma': SMA(20),
+        'ema': EMA(span=12),
+        'vwap': VWAP(),
+        'vwap20': VWAP(20),
+        'rsi': RSI(14),
+        'var': RollingVariance(30),
+        'bands': Bollinger(20, k=2.0),
+        'min': RollingMin(15),
+        'max': RollingMax(50),
+    })
+
+
+class TestIndicators(unittest.TestCase):
+    """Tests for the streaming indicator library"""
+
+    def stream(self, indicators, prices, volumes):
+        out = {name: [] for name in indicators.indicators}
+        for price, volume in zip(prices.tolist(), volumes.tolist()):
+            indicators.update(price, volume)
+            for name, value in indicators.values().items():
+                out[name].append(value)
+        return {name: np.array(values, dtype=np.float64) for name, values in out.items()}
+
+    def test_streaming_matches_series(self):
+        """Test every indicator's streaming values against its whole-series form"""
+        prices, volumes = make_series()
+        streamed = self.stream(make_set(), prices, volumes)
+        series = make_set().series(prices, volumes)
+
+        # recursive and order-statistic indicators are bit-for-bit
+        for name in ('ema', 'rsi', 'min', 'max'):
+            np.testing.assert_array_equal(streamed[name], series[name], err_msg=name)
+        for name in ('sma', 'vwap', 'vwap20', 'var', 'bands'):
+            np.testing.assert_allclose(streamed[name], series[name], rtol=1e-9, atol=1e-9, err_msg=name)
+
+    def test_against_direct_definitions(self):
+        """Test values against straightforward recomputation from the window"""
+        prices, volumes = make_series(200, seed=4)
+        streamed = self.stream(make_set(), prices, volumes)
+
+        for i in (0, 5, 19, 20, 150, 199):
+            window = prices[max(0, i - 19):i + 1]
+            self.assertAlmostEqual(streamed['sma'][i], window.mean())
+            self.assertAlmostEqual(streamed['bands'][i][1], window.mean() + 2 * window.std())
+            self.assertEqual(streamed['min'][i], prices[max(0, i - 14):i + 1].min())
+            self.assertEqual(streamed['max'][i], prices[max(0, i - 49):i + 1].max())
+            self.assertAlmostEqual(streamed['var'][i], prices[max(0, i - 29):i + 1].var())
+            weights = volumes[:i + 1]
+            if weights.sum() > 0:
+                self.assertAlmostEqual(streamed['vwap'][i], (prices[:i + 1] * weights).sum() / weights.sum())
+
+        self.assertTrue(np.isnan(streamed['rsi'][:14]).all())
+        self.assertTrue(((streamed['rsi'][14:] >= 0) & (streamed['rsi'][14:] <= 100)).all())
+
+    def test_sma_matches_calculator(self):
+        """Test the shared-buffer SMA tracks SMACalculator"""
+        prices, _ = make_series(300, seed=2)
+        indicators = IndicatorSet({'short': SMA(5), 'long': SMA(20)})
+        calc = SMACalculator(5, 20)
+        for price in prices.tolist():
+            indicators.update(price)
+            short_sma, long_sma = calc.update(price)
+            self.assertAlmostEqual(indicators['short'].value, short_sma, places=9)
+            self.assertAlmostEqual(indicators['long'].value, long_sma, places=9)
+
+    def test_shared_history(self):
+        """Test one ring buffer sized for the longest window backs every indicator"""
+        indicators = make_set()
+        self.assertEqual(indicators.prices.capacity, 51)
+        self.assertIs(indicators['sma'].prices, indicators['max'].prices)
+        with self.assertRaises(ValueError):
+            IndicatorSet({'again': indicators['sma']})
+
+        buffer = RingBuffer(3)
+        for value in range(5):
+            buffer.push(float(value))
+        self.assertEqual([buffer.ago(k) for k in range(3)], [4.0, 3.0, 2.0])
+
+    def test_flat_prices(self):
+        """Test a constant series gives zero variance and a neutral RSI"""
+        indicators = IndicatorSet({'var': RollingVariance(5), 'rsi': RSI(3)})
+        for _ in range(20):
+            indicators.update(42.0, 1)
+        self.assertEqual(indicators['var'].value, 0.0)
+        self.assertEqual(indicators['rsi'].value, 50.0)
+        self.assertTrue(math.isnan(IndicatorSet({'v': VWAP()}).series([1.0, 2.0])['v'][0]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from urllib.request import urlopen
+
+from src.common.metrics import Histogram, Metrics, metrics
+from src.common.models import Order, Portfolio, Tick
+from src.common.wire import decode_envelope, encode_message, encode_ticks
+from src.exchange_service.main import ExchangeService
+from src.processing_service.main import ProcessingService
+from tests.fakes import FakeRedis
+
+
+class TestHistogram(unittest.TestCase):
+    """Tests for the log-linear latency histogram"""
+
+    def test_percentiles_within_one_percent(self):
+        """Test reported percentiles stay within 1% of the exact ones"""
+        rng = random.Random(3)
+        values = [int(rng.lognormvariate(10, 2)) for _ in range(20000)]
+        histogram = Histogram()
+        for value in values:
+            histogram.record(value)
+
+        values.sort()
+        for percent in (50, 90, 99, 99.9):
+            exact = values[max(0, int(-(-len(values) * percent // 100)) - 1)]
+            self.assertLessEqual(abs(histogram.percentile(percent) - exact), exact * 0.01 + 1, percent)
+        self.assertEqual((histogram.min, histogram.max, histogram.count), (values[0], values[-1], len(values)))
+        self.assertEqual(histogram.percentile(100), values[-1])
+
+    def test_small_values_exact_and_merge(self):
+        """Test small values are counted exactly and merging adds counts"""
+        first, second = Histogram(), Histogram()
+        for value in range(100):
+            first.record(value)
+        second.record(5000)
+
+        first.merge(second)
+        self.assertEqual(first.count, 101)
+        self.assertEqual(first.percentile(50), 50)
+        self.assertEqual(first.max, 5000)
+        self.assertEqual(Histogram().percentile(99), 0)
+
+
+class TestMetrics(unittest.TestCase):
+    """Tests for the registry, its outputs and the service instrumentation"""
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+
+    def test_disabled_records_nothing(self):
+        """Test counters and timers are no-ops until enabled"""
+        registry = Metrics()
+        registry.incr('calls')
+        with registry.timer('step'):
+            pass
+        self.assertEqual((registry.counters, registry.histograms), ({}, {}))
+
+        registry.enable()
+        registry.incr('calls', 2)
+        with registry.timer('step'):
+            pass
+        self.assertEqual(registry.counters, {'calls': 2})
+        self.assertEqual(registry.histograms['step'].count, 1)
+
+    def test_file_and_scrape_outputs(self):
+        """Test the JSON dump and the Prometheus endpoint"""
+        registry = Metrics()
+        registry.enable()
+        registry.incr('feed.messages_published', 3)
+        registry.observe('sma.update', 1500)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'out', 'metrics.json')
+            registry.dump(path)
+            with open(path) as f:
+                data = json.load(f)
+        self.assertEqual(data['counters'], {'feed.messages_published': 3})
+        self.assertEqual(data['histograms_ns']['sma.update']['p99'], 1500)
+
+        server = registry.serve(0, host='127.0.0.1')
+        try:
+            with urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as response:
+                text = response.read().decode()
+        finally:
+            registry.close()
+        self.assertIn('mercury_feed_messages_published_total 3', text)
+        self.assertIn('mercury_sma_update_seconds_count 1', text)
+
+    def test_origin_propagates_to_signals_and_executions(self):
+        """Test services time their steps and carry the tick's origin forward"""
+        metrics.enable()
+        prices = [10, 10, 20, 5, 5]
+        ticks = [Tick(symbol="IBM", price=p, timestamp=1756440000 + i) for i, p in enumerate(prices)]
+        payloads = list(encode_ticks(ticks, 'binary', frame_size=1, stamp_origin=True))
+        origins = [decode_envelope(p)[1] for p in payloads]
+
+        processing_redis = FakeRedis()
+        processing = ProcessingService(redis_client=processing_redis, short_window=2, long_window=4)
+        signals = processing.process_batch(payloads)
+        signal_origins = [decode_envelope(payload)[1] for _, payload in processing_redis.published]
+        self.assertEqual(signal_origins, [origins[s.timestamp - ticks[0].timestamp] for s in signals])
+
+        exchange_redis = FakeRedis()
+        exchange = ExchangeService(redis_client=exchange_redis, portfolio=Portfolio(cash=1000.0))
+        exchange.process_batch([payloads[0], encode_message(Order(symbol="IBM", side="BUY", quantity=1),
+                                                            origin_ns=signal_origins[0])])
+        self.assertEqual(decode_envelope(exchange_redis.published[0][1])[1], signal_origins[0])
+
+        for name in ('sma.update', 'sma.crossover', 'latency.tick_to_signal',
+                     'exchange.validate', 'portfolio.update', 'latency.tick_to_execution'):
+            self.assertGreater(metrics.histograms[name].count, 0, name)
+        self.assertEqual(metrics.histograms['sma.update'].count, 5)
+        self.assertEqual(metrics.counters['processing.signals'], 2)
+
+if __name__ == "__main__":
+    unittest.main()
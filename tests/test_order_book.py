@@ -0,0 +1,128 @@
+import random
+import unittest
+
+from src.common.models import Order, Portfolio
+from src.exchange_service.order_book import LimitOrderBook
+from src.exchange_service.simulated_exchange import SimulatedExchange
+
+
+def limit(side, price, quantity=1, symbol="AAPL"):
+    return Order(symbol=symbol, side=side, quantity=quantity, order_type="LIMIT", price=price)
+
+
+class TestLimitOrderBook(unittest.TestCase):
+    """Tests for the LimitOrderBook class"""
+
+    def test_price_time_priority(self):
+        """Test crossed orders come out best price first, then oldest first"""
+        book = LimitOrderBook("AAPL")
+        first, second, better = limit("BUY", 100), limit("BUY", 100), limit("BUY", 101)
+        for order in (first, second, better, limit("BUY", 95)):
+            book.add(order)
+
+        self.assertEqual(book.best_bid(), 101)
+        self.assertEqual(book.match(100), [better, first, second])
+        self.assertEqual(len(book), 1)
+        self.assertEqual(book.best_bid(), 95)
+
+    def test_sell_orders_fill_at_or_above_limit(self):
+        """Test asks fill only when the price reaches them"""
+        book = LimitOrderBook("AAPL")
+        low, high = limit("SELL", 150), limit("SELL", 160)
+        book.add(high)
+        book.add(low)
+
+        self.assertEqual(book.match(149.99), [])
+        self.assertEqual(book.match(155), [low])
+        self.assertEqual(book.best_ask(), 160)
+
+    def test_cancel(self):
+        """Test cancelled orders never fill and the heaps get compacted"""
+        book = LimitOrderBook("AAPL")
+        orders = [limit("BUY", 100 + i % 7) for i in range(500)]
+        for order in orders:
+            book.add(order)
+
+        rng = random.Random(1)
+        cancelled = set(o.id for o in rng.sample(orders, 400))
+        for order_id in cancelled:
+            self.assertIsNotNone(book.cancel(order_id))
+        self.assertIsNone(book.cancel("missing"))
+
+        filled = book.match(0)
+        self.assertEqual(len(filled), 100)
+        self.assertFalse(cancelled & {o.id for o in filled})
+        self.assertLess(len(book._bids), 500)
+
+    def test_rejects_market_orders(self):
+        """Test only limit orders for the book's symbol are accepted"""
+        book = LimitOrderBook("AAPL")
+        with self.assertRaises(ValueError):
+            book.add(Order(symbol="AAPL", side="BUY", quantity=1))
+        with self.assertRaises(ValueError):
+            book.add(limit("BUY", 10, symbol="MSFT"))
+
+
+class TestSimulatedExchangeLimitOrders(unittest.TestCase):
+    """Tests for limit order handling in SimulatedExchange"""
+
+    def setUp(self):
+        self.portfolio = Portfolio(cash=10000.0)
+        self.exchange = SimulatedExchange(portfolio=self.portfolio)
+        self.exchange.update_market_price("AAPL", 150.0)
+
+    def test_resting_buy_fills_when_crossed(self):
+        """Test a buy limit below the market rests, then fills at the tick price"""
+        order = limit("BUY", 140.0, quantity=10)
+        self.assertIsNone(self.exchange.submit_order(order))
+        self.assertEqual(self.portfolio.cash, 10000.0)
+
+        self.assertEqual(self.exchange.update_market_price("AAPL", 145.0), [])
+        executions = self.exchange.update_market_price("AAPL", 138.0)
+
+        self.assertEqual(len(executions), 1)
+        self.assertEqual(executions[0].order_id, order.id)
+        self.assertEqual(executions[0].price, 138.0)
+        self.assertEqual(self.portfolio.holdings["AAPL"], 10)
+
+    def test_marketable_limit_fills_immediately(self):
+        """Test a limit order already through the market fills on submission"""
+        execution = self.exchange.submit_order(limit("BUY", 155.0, quantity=2))
+        self.assertIsNotNone(execution)
+        self.assertEqual(execution.price, 150.0)
+
+    def test_cancel_resting_order(self):
+        """Test a cancelled order does not fill"""
+        order = limit("BUY", 140.0)
+        self.exchange.submit_order(order)
+        self.assertEqual(self.exchange.cancel_order(order.id), order)
+        self.assertIsNone(self.exchange.cancel_order(order.id))
+        self.assertEqual(self.exchange.update_market_price("AAPL", 100.0), [])
+
+    def test_duplicate_order_id_rejected(self):
+        """Test resubmitting a resting order id is rejected instead of raising"""
+        order = limit("BUY", 140.0)
+        self.exchange.submit_order(order)
+        with self.assertLogs('simulated_exchange', level='ERROR'):
+            self.assertIsNone(self.exchange.submit_order(order))
+        self.assertEqual(len(self.exchange.order_books["AAPL"]), 1)
+        self.assertEqual(self.exchange.rejections, 1)
+        self.assertEqual(self.exchange.recent_rejections[-1], (order, "duplicate order id"))
+
+    def test_unfillable_resting_order_reported(self):
+        """Test a crossed resting order that fails the cash check is logged and counted"""
+        order = limit("BUY", 140.0, quantity=1000)
+        self.exchange.submit_order(order)
+        with self.assertLogs('simulated_exchange', level='WARNING') as logs:
+            self.assertEqual(self.exchange.update_market_price("AAPL", 130.0), [])
+        self.assertTrue(any("Dropped resting" in line for line in logs.output))
+        self.assertEqual(self.exchange.recent_rejections[-1], (order, "insufficient cash"))
+        self.assertEqual(len(self.exchange.order_books["AAPL"]), 0)
+
+    def test_market_orders_unchanged(self):
+        """Test submit_order routes market orders to execute_order"""
+        execution = self.exchange.submit_order(Order(symbol="AAPL", side="BUY", quantity=1))
+        self.assertEqual(execution.price, 150.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import logging
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.backtest.strategy import order_for_signal
+from src.backtest import sweep
+from src.backtest.sweep import SharedPriceSeries, evaluate_windows, load_price_series, run_sweep, window_grid
+from src.common.clock import event_clock
+from src.common.models import Portfolio
+from src.exchange_service.simulated_exchange import SimulatedExchange
+from src.processing_service.sma_calculator import SMACalculator
+
+
+def write_csv(path, prices, start=datetime(2020, 1, 1)):
+    with open(path, 'w') as f:
+        f.write("date,open,high,low,close,volume\n")
+        for i, price in enumerate(prices):
+            date = (start + timedelta(days=i)).strftime('%Y-%m-%d')
+            f.write(f"{date},{price:.2f},{price:.2f},{price:.2f},{price:.2f},1000\n")
+
+
+class TestParameterSweep(unittest.TestCase):
+    """Tests for the parallel parameter sweep"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(3)
+        self.csv_files = {}
+        for symbol in ("AAA", "BBB", "CCC"):
+            path = os.path.join(self.tmpdir.name, f"{symbol}.csv")
+            write_csv(path, 50.0 * np.exp(np.cumsum(rng.normal(0, 0.02, 300))))
+            self.csv_files[symbol] = path
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def replay_with_calculators(self, short_window, long_window, cash=10000.0, quantity=10):
+        # reference: tick-by-tick SMACalculator replay in timestamp order
+        all_ticks = load_price_series(self.csv_files)
+        events = []
+        for rank, (symbol, (timestamps, prices)) in enumerate(all_ticks.items()):
+            for ts, price in zip(timestamps, prices):
+                events.append((int(ts), rank, symbol, float(price)))
+        events.sort()
+
+        calculators = {s: SMACalculator(short_window, long_window) for s in all_ticks}
+        portfolio = Portfolio(cash=cash)
+        exchange = SimulatedExchange(portfolio=portfolio)
+        trades = 0
+        for ts, _, symbol, price in events:
+            calc = calculators[symbol]
+            calc.update(price)
+            signal = calc.detect_crossover()
+            if not signal:
+                continue
+            exchange.update_market_price(symbol, price)
+            order = order_for_signal(signal, symbol, portfolio.holdings, quantity, ts)
+            if order is not None and exchange.execute_order(order) is not None:
+                trades += 1
+
+        last_prices = {s: float(p[-1]) for s, (_, p) in all_ticks.items()}
+        return portfolio.get_total_value(last_prices), trades
+
+    def test_window_grid(self):
+        """Test pairs where the short window is not shorter are dropped"""
+        self.assertEqual(window_grid([5, 50], [20, 50]), [(5, 20), (5, 50)])
+
+    def test_matches_incremental_replay(self):
+        """Test a sweep result matches replaying ticks through SMACalculator"""
+        shared = SharedPriceSeries.create(load_price_series(self.csv_files))
+        event_clock.set(42)
+        try:
+            result = evaluate_windows(shared, 5, 20, 10000.0, 10)
+            self.assertEqual(event_clock.now(), 42)  # left as it was before the replay
+        finally:
+            shared.close()
+            event_clock.reset()
+
+        final_value, trades = self.replay_with_calculators(5, 20)
+        self.assertAlmostEqual(result.final_value, final_value, places=6)
+        self.assertEqual(result.trade_count, trades)
+        self.assertGreater(result.trade_count, 0)
+
+    def test_process_pool_matches_in_process(self):
+        """Test the pool returns the same ranked table as a single process"""
+        grid = window_grid([3, 5, 10], [20, 30])
+        serial = run_sweep(self.csv_files, grid, workers=1)
+        parallel = run_sweep(self.csv_files, grid, workers=2)
+
+        self.assertEqual(serial, parallel)
+        self.assertEqual(len(serial), 6)
+        values = [r.final_value for r in serial]
+        self.assertEqual(values, sorted(values, reverse=True))
+
+    def test_worker_closes_its_attachment(self):
+        """Test the worker's handle on the shared block is closed by its exit finalizer"""
+        shared = SharedPriceSeries.create(load_price_series(self.csv_files))
+        level = logging.getLogger('simulated_exchange').level
+        try:
+            sweep._init_worker(shared.shm.name, shared.layout, 10000.0, 10)
+            attached = sweep._worker_series
+            sweep._close_worker()
+
+            self.assertIsNone(sweep._worker_series)
+            self.assertIsNone(attached.shm.buf)
+            self.assertGreater(len(shared.prices), 0)  # the parent's block is still there
+        finally:
+            sweep._close_worker()
+            shared.close()
+            logging.getLogger('simulated_exchange').setLevel(level)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from src.common.models import Execution, Portfolio
+from src.exchange_service.simulated_exchange import SimulatedExchange
+
+class TestPortfolioValuation(unittest.TestCase):
+    """Tests for incremental mark-to-market valuation in Portfolio"""
+
+    def setUp(self):
+        self.portfolio = Portfolio(cash=10000.0)
+        self.exchange = SimulatedExchange(portfolio=self.portfolio)
+
+    def fill(self, side, symbol, quantity, price):
+        execution = Execution(order_id=f"o{len(self.portfolio.trade_history)}", symbol=symbol,
+                              side=side, quantity=quantity, price=price, timestamp=0)
+        self.portfolio.update_after_execution(execution)
+        return execution
+
+    def test_marks_update_total_value(self):
+        """Total value follows prices arriving through the exchange"""
+        self.fill('BUY', 'AAPL', 10, 100.0)
+        self.fill('BUY', 'MSFT', 5, 200.0)
+        self.assertEqual(self.portfolio.total_value, 10000.0)
+
+        self.exchange.update_market_price('AAPL', 110.0)
+        self.exchange.update_market_price('MSFT', 190.0)
+        self.exchange.update_market_price('GOOG', 1000.0)  # not held
+
+        self.assertAlmostEqual(self.portfolio.total_value, 10000.0 + 100.0 - 50.0)
+        self.assertAlmostEqual(self.portfolio.exposure('AAPL'), 1100.0)
+        self.assertEqual(self.portfolio.exposure('GOOG'), 0.0)
+        self.assertAlmostEqual(self.portfolio.unrealized_pnl, 50.0)
+        self.assertAlmostEqual(self.portfolio.get_total_value(),
+                               self.portfolio.get_total_value({'AAPL': 110.0, 'MSFT': 190.0}))
+
+    def test_sell_fills_realized_pnl(self):
+        """Sells record PnL against the average cost of the position"""
+        self.fill('BUY', 'AAPL', 10, 100.0)
+        self.fill('BUY', 'AAPL', 10, 120.0)
+        self.assertAlmostEqual(self.portfolio.cost_basis['AAPL'], 110.0)
+
+        execution = self.fill('SELL', 'AAPL', 5, 130.0)
+        self.assertAlmostEqual(execution.pnl, 100.0)
+        self.assertAlmostEqual(self.portfolio.trade_history[-1].pnl, 100.0)
+        self.assertAlmostEqual(self.portfolio.realized_pnl, 100.0)
+        self.assertAlmostEqual(self.portfolio.unrealized_pnl, 15 * 20.0)
+
+        self.fill('SELL', 'AAPL', 15, 100.0)
+        self.assertNotIn('AAPL', self.portfolio.holdings)
+        self.assertNotIn('AAPL', self.portfolio.cost_basis)
+        self.assertAlmostEqual(self.portfolio.realized_pnl, 100.0 - 150.0)
+        self.assertAlmostEqual(self.portfolio.unrealized_pnl, 0.0)
+        self.assertAlmostEqual(self.portfolio.total_value, self.portfolio.cash)
+
+    def test_rejected_sell_leaves_cash(self):
+        """Selling a symbol that is not held raises before touching cash"""
+        with self.assertRaises(ValueError):
+            self.fill('SELL', 'AAPL', 5, 100.0)
+        self.assertEqual(self.portfolio.cash, 10000.0)
+        self.assertEqual(len(self.portfolio.trade_history), 0)
+
+    def test_unpriced_holdings(self):
+        """Holdings without a mark cannot be valued until one arrives"""
+        portfolio = Portfolio(cash=0.0, holdings={'AAPL': 10})
+        with self.assertRaises(ValueError):
+            portfolio.total_value
+
+        portfolio.mark_price('AAPL', 50.0)
+        self.assertEqual(portfolio.total_value, 500.0)
+        self.assertEqual(portfolio.unrealized_pnl, 0.0)  # first mark becomes the cost
+
+    def test_fill_on_preexisting_holdings(self):
+        """Positions passed to the constructor take their cost from the first fill"""
+        portfolio = Portfolio(cash=1000.0, holdings={'A': 10})
+        portfolio.update_after_execution(Execution(order_id="o1", symbol='A', side='BUY',
+                                                   quantity=5, price=10.0, timestamp=0))
+        self.assertEqual(portfolio.unrealized_pnl, 0.0)
+        self.assertEqual(portfolio.cost_basis['A'], 10.0)
+        self.assertEqual(portfolio.total_value, 1000.0 - 50.0 + 150.0)
+
+        unrealized = portfolio.unrealized_pnl
+        portfolio.revalue()
+        self.assertEqual(portfolio.unrealized_pnl, unrealized)
+
+        sell = Execution(order_id="o2", symbol='A', side='SELL', quantity=15, price=12.0, timestamp=0)
+        Portfolio(cash=0.0, holdings={'A': 15}).update_after_execution(sell)
+        self.assertEqual(sell.pnl, 0.0)
+
+    def test_revalue_after_direct_edit(self):
+        """revalue() resyncs the running totals after holdings are edited directly"""
+        self.exchange.update_market_price('AAPL', 100.0)
+        self.portfolio.holdings['AAPL'] = 4
+        self.portfolio.revalue()
+        self.assertEqual(self.portfolio.total_value, 10400.0)
+        self.assertEqual(self.portfolio.get_total_value({'AAPL': 100.0}), 10400.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+from collections import deque
+from unittest import mock
+
+from src.common.events import SIGNALS_CHANNEL
+from src.common.models import Signal, Tick
+from src.common.redis_client import RedisClient
+from src.common.wire import decode_message, encode_message, encode_ticks
+from src.processing_service.main import ProcessingService
+from src.processing_service.sma_calculator import SMACalculator
+from tests.fakes import FakeRedis
+
+
+class FakePubSub:
+    def __init__(self, payloads):
+        self.queue = deque({'type': 'message', 'data': p} for p in payloads)
+        self.waits = 0
+
+    def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        if timeout:
+            self.waits += 1
+        return self.queue.popleft() if self.queue else None
+
+
+class InterruptingPubSub(FakePubSub):
+    """Delivers its payloads, then stops run() like Ctrl-C would on the next blocking wait"""
+
+    def subscribe(self, *channels):
+        pass
+
+    def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        if not self.queue and timeout:
+            raise KeyboardInterrupt
+        return super().get_message(ignore_subscribe_messages, timeout)
+
+    def close(self):
+        pass
+
+
+def ticks_for(symbol, prices):
+    return [Tick(symbol=symbol, price=p, timestamp=1756440000 + i * 86400) for i, p in enumerate(prices)]
+
+
+class TestProcessingService(unittest.TestCase):
+    """Tests for the ProcessingService class"""
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.service = ProcessingService(redis_client=self.redis, short_window=2, long_window=4,
+                                         batch_size=4, message_format='json')
+
+    def test_signals_match_calculator(self):
+        """Test per-symbol state produces the same crossovers as SMACalculator"""
+        prices = [10, 10, 20, 5, 5]
+        ticks = ticks_for("IBM", prices) + ticks_for("AAPL", [5, 5, 5, 5, 5])
+
+        signals = self.service.process_batch(list(encode_ticks(ticks)))
+
+        calc = SMACalculator(short_window=2, long_window=4)
+        expected = []
+        for tick in ticks[:5]:
+            calc.update(tick.price)
+            if calc.detect_crossover():
+                expected.append((tick.timestamp, calc.detect_crossover()))
+        self.assertEqual([(s.timestamp, s.signal) for s in signals], expected)
+        self.assertTrue(all(s.symbol == "IBM" for s in signals))
+
+    def test_signals_published_once_per_batch(self):
+        """Test the batch's signals go out in a single round-trip"""
+        self.service.process_batch(list(encode_ticks(ticks_for("IBM", [10, 10, 20, 5, 5]))))
+
+        self.assertEqual(self.redis.round_trips, 1)
+        self.assertEqual(len(self.redis.published), 2)
+        channel, payload = self.redis.published[0]
+        self.assertEqual(channel, SIGNALS_CHANNEL)
+        signal = decode_message(payload)[0]
+        self.assertIsInstance(signal, Signal)
+        self.assertEqual(signal.data['price'], 20)
+
+    def test_drain_batches(self):
+        """Test drain blocks once then takes buffered messages up to batch_size"""
+        payloads = list(encode_ticks(ticks_for("IBM", range(1, 11))))
+        pubsub = FakePubSub(payloads)
+
+        batches = []
+        while True:
+            batch = self.service.drain(pubsub, timeout=0.01)
+            if not batch:
+                break
+            batches.append(batch)
+
+        self.assertEqual([len(b) for b in batches], [4, 4, 2])
+        self.assertEqual(pubsub.waits, 4)
+
+    def test_binary_frames_and_bad_messages(self):
+        """Test binary tick frames are unpacked and undecodable messages skipped"""
+        frame = next(encode_ticks(ticks_for("MSFT", [1, 2, 3]), 'binary'))
+        with self.assertLogs('processing_service', level='WARNING'):
+            self.service.process_batch([frame, "not json", encode_message(Signal("X", "BUY", 1)), frame[:-7],
+                                        "123", "[1]", "null"])
+
+        self.assertEqual(self.service.symbol_stats["MSFT"].ticks, 3)
+        self.assertNotIn("X", self.service.symbol_stats)
+        self.assertEqual(self.service.messages, 7)
+
+    def test_default_clients_are_raw(self):
+        """Test run() with the default clients gets bytes, so binary frames are not UTF-8 decoded"""
+        frame = next(encode_ticks(ticks_for("MSFT", [1, 2, 3]), 'binary'))
+        with mock.patch.object(RedisClient, 'get_instance', return_value=FakeRedis()) as get_instance, \
+                mock.patch.object(RedisClient, 'get_pubsub', return_value=InterruptingPubSub([frame])) as get_pubsub:
+            service = ProcessingService(short_window=2, long_window=4)
+            service.run(stats_interval=3600)
+
+        get_instance.assert_called_once_with(decode_responses=False)
+        self.assertIs(get_pubsub.call_args.kwargs['decode_responses'], False)
+        self.assertEqual(service.symbol_stats["MSFT"].ticks, 3)
+
+    def test_latency_counters(self):
+        """Test per-symbol latency and throughput counters are filled in"""
+        self.service.process_batch(list(encode_ticks(ticks_for("IBM", [1, 2, 3]))))
+        stats = self.service.symbol_stats["IBM"]
+
+        self.assertEqual(stats.ticks, 3)
+        self.assertGreater(stats.max_latency, 0)
+        self.assertGreaterEqual(stats.max_latency, stats.mean_latency)
+        self.assertGreater(self.service.messages_per_second(), 0)
+
+if __name__ == "__main__":
+    unittest.main()
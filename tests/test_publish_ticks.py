@@ -0,0 +1,67 @@
+import json
+import unittest
+
+from src.common.events import MARKET_DATA_CHANNEL
+from src.common.models import Tick
+from src.common.wire import decode_message
+from src.data_feed_service.main import publish_ticks_to_redis
+from tests.fakes import FakeRedis
+
+
+def make_ticks(symbol, count):
+    return [Tick(symbol=symbol, price=100.0 + i, timestamp=1756440000 + i * 86400,
+                 open_price=99.0, high_price=101.0, low_price=98.0, volume=1000) for i in range(count)]
+
+
+class TestPublishTicks(unittest.TestCase):
+    """Tests for publish_ticks_to_redis"""
+
+    def setUp(self):
+        self.ticks = {"IBM": make_ticks("IBM", 7), "AAPL": make_ticks("AAPL", 5)}
+
+    def test_unbatched(self):
+        """Test batch_size=1 publishes one message per round-trip"""
+        client = FakeRedis()
+        stats = publish_ticks_to_redis(self.ticks, redis_client=client, message_format='json')
+
+        self.assertEqual(stats.messages, 12)
+        self.assertEqual(client.round_trips, 12)
+        self.assertEqual(stats.batches, 12)
+
+    def test_batched_matches_unbatched(self):
+        """Test pipelined publishing sends the same messages in fewer round-trips"""
+        plain, batched = FakeRedis(), FakeRedis()
+        publish_ticks_to_redis(self.ticks, redis_client=plain, message_format='json')
+        stats = publish_ticks_to_redis(self.ticks, redis_client=batched, batch_size=5, message_format='json')
+
+        self.assertEqual(batched.published, plain.published)
+        self.assertEqual(batched.round_trips, 3)  # 5 + 5 + 2
+        self.assertEqual(stats.batches, 3)
+        self.assertGreaterEqual(stats.messages_per_second, 0)
+
+    def test_message_format(self):
+        """Test the JSON tick message fields"""
+        client = FakeRedis()
+        publish_ticks_to_redis({"IBM": self.ticks["IBM"][:1]}, redis_client=client, batch_size=10,
+                               message_format='json')
+
+        channel, message = client.published[0]
+        data = json.loads(message)
+        self.assertEqual(channel, MARKET_DATA_CHANNEL)
+        self.assertEqual(data['type'], 'tick')
+        self.assertEqual(data['symbol'], 'IBM')
+        self.assertEqual(data['price'], 100.0)
+        self.assertRegex(data['date'], r'^\d{4}-\d{2}-\d{2}$')
+
+    def test_binary_frames(self):
+        """Test binary format packs many ticks into each message"""
+        client = FakeRedis()
+        stats = publish_ticks_to_redis(self.ticks, redis_client=client, message_format='binary', frame_size=4)
+
+        self.assertEqual(stats.ticks, 12)
+        self.assertEqual(stats.messages, 3)
+        decoded = [t for _, payload in client.published for t in decode_message(payload)]
+        self.assertEqual(decoded, self.ticks["IBM"] + self.ticks["AAPL"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+from src.common.redis_client import ROLE_PUBSUB, RedisClient
+
+
+class TestRedisClient(unittest.TestCase):
+    """Tests for RedisClient pools and clients (no server needed, connections are lazy)"""
+
+    def setUp(self):
+        RedisClient.reset()
+
+    def tearDown(self):
+        RedisClient.reset()
+
+    def test_shared_clients_per_mode(self):
+        """Test decoded, raw and pub/sub clients are shared but kept apart"""
+        decoded = RedisClient.get_instance()
+        raw = RedisClient.get_instance(decode_responses=False)
+
+        self.assertIs(decoded, RedisClient.get_instance())
+        self.assertIs(decoded, RedisClient._instance)
+        self.assertIsNot(decoded.connection_pool, raw.connection_pool)
+        self.assertTrue(decoded.connection_pool.connection_kwargs['decode_responses'])
+        self.assertFalse(raw.connection_pool.connection_kwargs['decode_responses'])
+
+        pubsub = RedisClient.get_pubsub(decode_responses=False)
+        self.assertIs(pubsub.connection_pool, RedisClient.get_pool(False, ROLE_PUBSUB))
+        self.assertIsNot(pubsub.connection_pool, raw.connection_pool)
+
+    def test_settings_from_environment(self):
+        """Test pool size, health checks and retries come from the environment"""
+        env = {'REDIS_HOST': 'redis.internal', 'REDIS_MAX_CONNECTIONS': '7',
+               'REDIS_HEALTH_CHECK_INTERVAL': '11', 'REDIS_RETRIES': '4', 'REDIS_SOCKET_TIMEOUT': '2.5'}
+        with mock.patch.dict(os.environ, env):
+            pool = RedisClient.get_instance().connection_pool
+
+        self.assertEqual(pool.max_connections, 7)
+        kwargs = pool.connection_kwargs
+        self.assertEqual(kwargs['host'], 'redis.internal')
+        self.assertEqual(kwargs['health_check_interval'], 11)
+        self.assertEqual(kwargs['socket_timeout'], 2.5)
+        self.assertEqual(kwargs['retry']._retries, 4)
+
+    def test_async_client_per_loop(self):
+        """Test each event loop gets its own async client"""
+        async def get_twice():
+            client = RedisClient.get_async_instance(decode_responses=False)
+            self.assertIs(client, RedisClient.get_async_instance(decode_responses=False))
+            self.assertIsNot(client, RedisClient.get_async_instance())
+            return client
+
+        first = asyncio.run(get_twice())
+        second = asyncio.run(get_twice())
+        self.assertIsNot(first, second)
+
+if __name__ == '__main__':
+    unittest.main()
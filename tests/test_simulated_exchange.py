@@ -65,6 +65,15 @@ class TestSimulatedExchange(unittest.TestCase):
         self.assertEqual(self.portfolio.holdings["MSFT"], 2)  # 5 bought - 3 sold
         self.assertEqual(len(self.portfolio.trade_history), 2)
     
+    def test_sell_entire_position(self):
+        """Test selling every share held closes the position"""
+        self.exchange.execute_order(Order(symbol="AAPL", side="BUY", quantity=10))
+        execution = self.exchange.execute_order(Order(symbol="AAPL", side="SELL", quantity=10))
+
+        self.assertIsNotNone(execution)
+        self.assertNotIn("AAPL", self.portfolio.holdings)
+        self.assertEqual(self.portfolio.cash, 10000.0)
+
     def test_insufficient_cash(self):
         """Test buying with insufficient cash"""
         # Try to buy more than we can afford
@@ -108,5 +117,51 @@ class TestSimulatedExchange(unittest.TestCase):
         # Verify no execution occurred
         self.assertIsNone(execution)
 
+    def test_execute_orders_sells_fund_buys(self):
+        """Test that sells in a batch free cash for its buys"""
+        self.portfolio.cash = 1500.0
+        self.exchange.execute_order(Order(symbol="AAPL", side="BUY", quantity=10))
+        self.assertEqual(self.portfolio.cash, 0.0)
+
+        batch = [
+            Order(symbol="MSFT", side="BUY", quantity=6),
+            Order(symbol="AAPL", side="SELL", quantity=10),
+            Order(symbol="GOOG", side="BUY", quantity=1),
+            Order(symbol="UNKNOWN", side="BUY", quantity=1),
+        ]
+        executions, rejections = self.exchange.execute_orders(batch)
+
+        # the sell goes first; 1500 funds MSFT but leaves nothing for GOOG
+        self.assertEqual([e.order_id for e in executions], [batch[1].id, batch[0].id])
+        self.assertEqual([(o.id, r) for o, r in rejections],
+                         [(batch[2].id, "insufficient cash"),
+                          (batch[3].id, "no price available for UNKNOWN")])
+        self.assertEqual(self.portfolio.cash, 0.0)
+        self.assertEqual(self.portfolio.holdings, {"MSFT": 6})
+
+    def test_execute_orders_matches_sequential(self):
+        """Test that a batch ends where execute_order on sells, then buys, would"""
+        import random
+        rng = random.Random(7)
+        symbols = ["AAPL", "MSFT", "GOOG", "UNKNOWN"]
+        batch = [Order(symbol=rng.choice(symbols), side=rng.choice(["BUY", "SELL"]), quantity=rng.randint(1, 8))
+                 for _ in range(200)]
+
+        other = SimulatedExchange(portfolio=Portfolio(cash=10000.0))
+        for symbol, price in self.exchange.latest_prices.items():
+            other.update_market_price(symbol, price)
+        expected = [other.execute_order(o) for o in batch if o.side == "SELL"]
+        expected += [other.execute_order(o) for o in batch if o.side == "BUY"]
+        expected = [e for e in expected if e is not None]
+
+        executions, rejections = self.exchange.execute_orders(batch)
+
+        fills = lambda executions: [(e.order_id, e.side, e.quantity, e.price, e.pnl) for e in executions]
+        self.assertEqual(fills(executions), fills(expected))
+        self.assertEqual(len(executions) + len(rejections), len(batch))
+        self.assertEqual(self.portfolio.cash, other.portfolio.cash)
+        self.assertEqual(self.portfolio.holdings, other.portfolio.holdings)
+        self.assertEqual(fills(self.portfolio.trade_history), fills(other.portfolio.trade_history))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
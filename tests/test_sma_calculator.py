@@ -1,3 +1,4 @@
+import math
 import unittest
 from src.processing_service.sma_calculator import SMACalculator
 
@@ -60,5 +61,43 @@ class TestSMACalculator(unittest.TestCase):
         calc.update(5)   # short_sma=5, long_sma=10
         self.assertEqual(calc.detect_crossover(), 'SELL')  # Death cross detected
 
+    def spiky_prices(self, n=100000):
+        import random
+        rng = random.Random(1)
+        # rare huge prints leave rounding error behind once they leave the window
+        return [1e9 if i % 97 == 0 else 100 + rng.random() for i in range(n)]
+
+    def test_compensated_sums_do_not_drift(self):
+        """Test compensated sums stay exact where plain running sums drift"""
+        plain = SMACalculator(short_window=5, long_window=20)
+        compensated = SMACalculator(short_window=5, long_window=20, compensated=True)
+        for price in self.spiky_prices():
+            plain.update(price)
+            compensated.update(price)
+
+        self.assertGreater(max(plain.drift()), 1e-7)
+        self.assertEqual(compensated.drift(), (0.0, 0.0))
+        window = list(compensated.long_prices)
+        self.assertEqual(compensated.get_long_sma(), math.fsum(window) / len(window))
+
+    def test_periodic_resum_reports_drift(self):
+        """Test periodic resums clear the drift and record how large it got"""
+        calc = SMACalculator(short_window=5, long_window=20, resum_interval=1000)
+        for price in self.spiky_prices()[:-1]:
+            calc.update(price)
+
+        self.assertGreater(calc.max_drift, 0.0)
+        self.assertLess(max(calc.drift()), 1e-5)
+        calc.resum()
+        self.assertEqual(calc.drift(), (0.0, 0.0))
+
+    def test_compensated_matches_plain_on_exact_input(self):
+        """Test both modes agree when no rounding occurs"""
+        plain = SMACalculator(short_window=3, long_window=6)
+        compensated = SMACalculator(short_window=3, long_window=6, compensated=True)
+        for price in [10, 11, 12, 13, 20, 5, 5, 5, 40]:
+            self.assertEqual(plain.update(price), compensated.update(price))
+            self.assertEqual(plain.detect_crossover(), compensated.detect_crossover())
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
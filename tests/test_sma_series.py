@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+
+from src.processing_service.batch_sma import SIGNAL_NAMES
+from src.processing_service.sma_calculator import SMACalculator
+from src.processing_service.sma_series import crossover_indices, crossover_series, sma_series
+
+
+def incremental(prices, short_window, long_window):
+    calc = SMACalculator(short_window=short_window, long_window=long_window)
+    shorts, longs, signals = [], [], []
+    for price in prices:
+        short_sma, long_sma = calc.update(price)
+        shorts.append(short_sma)
+        longs.append(long_sma)
+        signals.append(calc.detect_crossover())
+    return shorts, longs, signals
+
+
+class TestSMASeries(unittest.TestCase):
+    """Tests for the whole-series SMA backtest functions"""
+
+    def test_warm_up_values(self):
+        """Test partial windows average everything seen so far"""
+        short_sma, long_sma = sma_series([10, 20, 30, 40, 50, 60], short_window=3, long_window=5)
+        np.testing.assert_allclose(short_sma, [10, 15, 20, 30, 40, 50])
+        np.testing.assert_allclose(long_sma, [10, 15, 20, 25, 30, 40])
+
+    def test_crossover_sequence(self):
+        """Test the same golden/death cross sequence as test_sma_calculator"""
+        signals = crossover_series(*sma_series([10, 10, 20, 5, 5], short_window=2, long_window=4))
+        self.assertEqual([SIGNAL_NAMES[int(s)] for s in signals], ['', '', 'BUY', '', 'SELL'])
+
+    def test_matches_incremental_calculator(self):
+        """Test random walks produce the same signals as SMACalculator"""
+        rng = np.random.default_rng(7)
+        prices = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, 5000)))
+
+        for short_window, long_window in [(5, 20), (20, 50), (50, 100), (1, 3)]:
+            shorts, longs, expected = incremental(prices.tolist(), short_window, long_window)
+            short_sma, long_sma = sma_series(prices, short_window, long_window)
+
+            self.assertEqual(short_sma.tolist(), shorts)
+            self.assertEqual(long_sma.tolist(), longs)
+            signals = crossover_series(short_sma, long_sma)
+            self.assertEqual([SIGNAL_NAMES[int(s)] for s in signals], expected)
+
+    def test_flat_prices_match_incremental_calculator(self):
+        """Test a flat segment, where both SMAs are equal up to rounding, signals like SMACalculator"""
+        rng = np.random.default_rng(3)
+        walk = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, 40)))
+        for level in (100.1, 0.3, 187.37):
+            prices = np.concatenate((walk, np.full(25, level), walk[::-1]))
+            shorts, longs, expected = incremental(prices.tolist(), 5, 20)
+            short_sma, long_sma = sma_series(prices, 5, 20)
+
+            self.assertEqual(short_sma.tolist(), shorts)
+            self.assertEqual(long_sma.tolist(), longs)
+            signals = crossover_series(short_sma, long_sma)
+            self.assertEqual([SIGNAL_NAMES[int(s)] for s in signals], expected)
+
+    def test_crossover_indices(self):
+        """Test golden and death cross indices are split correctly"""
+        golden, death = crossover_indices([10, 10, 20, 5, 5, 30, 40], short_window=2, long_window=4)
+        self.assertEqual(golden.tolist(), [2, 5])
+        self.assertEqual(death.tolist(), [4])
+
+    def test_empty_series(self):
+        """Test an empty price array"""
+        short_sma, long_sma = sma_series([], short_window=2, long_window=4)
+        self.assertEqual(len(short_sma), 0)
+        self.assertEqual(len(crossover_series(short_sma, long_sma)), 0)
+
+if __name__ == "__main__":
+    unittest.main()
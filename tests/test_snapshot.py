@@ -0,0 +1,168 @@
+import os
+import random
+import tempfile
+import unittest
+
+from src.common.models import Tick
+from src.common.streams import StreamConsumer, StreamPublisher, market_data_streams
+from src.common.wire import encode_ticks
+from src.processing_service.main import ProcessingService
+from src.processing_service.sma_calculator import SMACalculator
+from src.processing_service.snapshot import SnapshotStore, decode_snapshot, encode_snapshot
+from tests.fakes import FakeRedis, FakeStreamsRedis
+
+
+def calc_state(calc):
+    return (list(calc.short_prices), list(calc.long_prices), calc.short_sum, calc.long_sum,
+            calc.short_comp, calc.long_comp, calc.prev_short_sma, calc.prev_long_sma, calc.updates)
+
+
+def random_ticks(symbols, n, seed=7):
+    rng = random.Random(seed)
+    prices = {symbol: 100.0 for symbol in symbols}
+    ticks = []
+    for i in range(n):
+        symbol = symbols[i % len(symbols)]
+        prices[symbol] *= 1 + rng.gauss(0, 0.02)
+        ticks.append(Tick(symbol=symbol, price=prices[symbol], timestamp=1756440000 + i))
+    return ticks
+
+
+class TestSnapshot(unittest.TestCase):
+    """Tests for SMA state snapshots"""
+
+    def test_round_trip_is_exact(self):
+        """Test encoded calculators come back bit for bit, including partial windows"""
+        states = {}
+        for symbol, n, options in (("IBM", 250, {}), ("AAPL", 7, {}), ("MSFT", 0, {}),
+                                   ("TSLA", 120, {'compensated': True})):
+            calc = SMACalculator(5, 20, **options)
+            for price in random_ticks([symbol], n):
+                calc.update(price.price)
+            states[symbol] = (calc, 1000 + n)
+
+        positions = {'stream:market_data:0': '1756440000123-0', 'stream:market_data:3': '17-4'}
+        snapshot = decode_snapshot(encode_snapshot(states, created=42, streams=positions))
+
+        self.assertEqual(snapshot.created, 42)
+        self.assertEqual(snapshot.streams, positions)
+        self.assertEqual(list(snapshot.symbols), list(states))
+        for symbol, (calc, timestamp) in states.items():
+            restored, restored_timestamp = snapshot.symbols[symbol]
+            self.assertEqual(calc_state(restored), calc_state(calc))
+            self.assertEqual(restored.compensated, calc.compensated)
+            self.assertEqual(restored_timestamp, timestamp)
+
+    def test_malformed_snapshot(self):
+        """Test truncated or foreign data is rejected"""
+        calc = SMACalculator(2, 4)
+        calc.update(1.0)
+        data = encode_snapshot({"IBM": (calc, 1)})
+
+        for bad in (data[:10], data[:-4], b'X' * len(data)):
+            with self.assertRaises(ValueError):
+                decode_snapshot(bad)
+
+    def test_restart_matches_uninterrupted_run(self):
+        """Test a restored service replaying the whole history emits the same signals"""
+        ticks = random_ticks(["IBM", "AAPL", "MSFT"], 900)
+        payloads = list(encode_ticks(ticks, 'binary', frame_size=50))
+
+        uninterrupted = ProcessingService(redis_client=FakeRedis(), short_window=5, long_window=20)
+        expected = uninterrupted.process_batch(payloads)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SnapshotStore(path=os.path.join(tmp, 'state', 'sma.snap'))
+            first = ProcessingService(redis_client=FakeRedis(), short_window=5, long_window=20, snapshots=store)
+            before = first.process_batch(payloads[:10])
+            first.save_snapshot()
+
+            restarted = ProcessingService(redis_client=FakeRedis(), short_window=5, long_window=20, snapshots=store)
+            self.assertEqual(restarted.restore(), 3)
+            after = restarted.process_batch(payloads)
+
+        self.assertEqual(before + after, expected)
+        self.assertEqual(restarted.replayed_skipped, 500)
+        for symbol, calc in uninterrupted.calculators.items():
+            self.assertEqual(calc_state(restarted.calculators[symbol]), calc_state(calc))
+
+    def test_entries_acked_after_snapshot_are_replayed(self):
+        """Test a worker restarted from an older snapshot replays what it acked since, without re-signalling"""
+        ticks = random_ticks(["IBM", "AAPL", "MSFT"], 900)
+        payloads = list(encode_ticks(ticks, 'binary', frame_size=30))
+
+        uninterrupted = ProcessingService(redis_client=FakeRedis(), short_window=5, long_window=20)
+        expected = uninterrupted.process_batch(payloads)
+
+        redis = FakeStreamsRedis()
+        key = market_data_streams(1)[0]
+        for payload in payloads:
+            redis.xadd(key, {'data': payload})
+
+        def start(store):
+            consumer = StreamConsumer(redis, [key], group='processing', consumer='processing-0', count=4)
+            service = ProcessingService(redis_client=redis, short_window=5, long_window=20,
+                                        streams=StreamPublisher(), consumer=consumer, snapshots=store)
+            consumer.ensure_groups()
+            service.restore()
+            return consumer, service
+
+        signals = []
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SnapshotStore(path=os.path.join(tmp, 'sma.snap'))
+            consumer, first = start(store)
+            consumer.read()  # nothing pending on a fresh group
+            for batch in range(5):
+                entries = consumer.read()
+                signals += first.process_batch([e.payload for e in entries], acks=entries)
+                if batch == 2:
+                    first.save_snapshot()
+            consumer.read()  # dies before handling this batch
+
+            consumer, restarted = start(store)
+            self.assertEqual(len(consumer.acked_after(store.load().streams)), 8)
+            for _ in range(5):  # the pending batch, the empty read ending recovery, then the rest
+                entries = consumer.read()
+                signals += restarted.process_batch([e.payload for e in entries], acks=entries)
+
+        self.assertEqual(signals, expected)
+        self.assertEqual(redis.pending_count(key, 'processing'), 0)
+        for symbol, calc in uninterrupted.calculators.items():
+            self.assertEqual(calc_state(restarted.calculators[symbol]), calc_state(calc))
+
+    def test_newest_snapshot_wins(self):
+        """Test the newer of the file and Redis snapshots is loaded"""
+        redis = FakeRedis()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sma.snap')
+            store = SnapshotStore(path=path, redis_client=redis)
+
+            calc = SMACalculator(2, 4)
+            calc.update(10.0)
+            store.save({"IBM": (calc, 1)})
+            calc.update(20.0)
+            redis.set(store.redis_key, encode_snapshot({"IBM": (calc, 2)}))
+            self.assertEqual(store.load().symbols["IBM"].timestamp, 2)
+
+            with open(path, 'wb') as f:
+                f.write(b'garbage')
+            with self.assertLogs('snapshot', level='ERROR'):
+                self.assertEqual(store.load().symbols["IBM"].timestamp, 2)
+
+        self.assertIsNone(SnapshotStore().load())
+
+    def test_mismatched_windows_not_restored(self):
+        """Test symbols snapshotted with other windows start from scratch"""
+        redis = FakeRedis()
+        store = SnapshotStore(redis_client=redis)
+        calc = SMACalculator(3, 6)
+        calc.update(1.0)
+        store.save({"IBM": (calc, 1)})
+
+        service = ProcessingService(redis_client=redis, short_window=2, long_window=4, snapshots=store)
+        with self.assertLogs('processing_service', level='WARNING'):
+            self.assertEqual(service.restore(), 0)
+        self.assertEqual(service.calculators, {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+
+from src.common.events import SIGNALS_CHANNEL
+from src.common.models import Tick
+from src.common.streams import (StreamConsumer, StreamPublisher, market_data_streams, shard_for,
+                                stream_key)
+from src.common.wire import decode_message
+from src.data_feed_service.main import publish_ticks_to_redis
+from src.processing_service.main import ProcessingService
+from tests.fakes import FakeStreamsRedis
+
+
+def make_ticks(symbols, n):
+    return {symbol: [Tick(symbol=symbol, price=100.0 + (i % 7), timestamp=i) for i in range(n)]
+            for symbol in symbols}
+
+
+class TestStreams(unittest.TestCase):
+    """Tests for the Redis Streams transport"""
+
+    def setUp(self):
+        self.redis = FakeStreamsRedis()
+        self.symbols = ['IBM', 'AAPL', 'MSFT', 'GOOG', 'AMZN', 'TSLA']
+
+    def test_ticks_are_sharded_by_symbol(self):
+        """Test each shard stream only carries its own symbols and nothing is lost"""
+        publisher = StreamPublisher(shards=3, maxlen=None)
+        publish_ticks_to_redis(make_ticks(self.symbols, 40), redis_client=self.redis, batch_size=50,
+                               message_format='binary', frame_size=16, streams=publisher)
+
+        total = 0
+        for shard, key in enumerate(market_data_streams(3)):
+            for _, fields in self.redis.streams.get(key, []):
+                ticks = decode_message(fields['data'])
+                total += len(ticks)
+                self.assertTrue(all(shard_for(t.symbol, 3) == shard for t in ticks))
+        self.assertEqual(total, 240)
+
+    def test_processing_worker_acks_with_signals(self):
+        """Test a worker reads its shard in batches and acks in the signal pipeline"""
+        publisher = StreamPublisher(shards=2)
+        publish_ticks_to_redis(make_ticks(self.symbols, 30), redis_client=self.redis, batch_size=100,
+                               message_format='json', streams=publisher)
+
+        key = market_data_streams(2, [0])
+        consumer = StreamConsumer(self.redis, key, group='processing', consumer='w0', count=25)
+        consumer.ensure_groups()
+        consumer.ensure_groups()  # existing group is fine
+        service = ProcessingService(redis_client=self.redis, short_window=2, long_window=4,
+                                    message_format='json', streams=publisher, consumer=consumer)
+
+        self.assertEqual(consumer.read(), [])  # nothing pending on a fresh group
+        reads = 0
+        entries = consumer.read()
+        while entries:
+            reads += 1
+            before = self.redis.round_trips
+            service.process_batch([e.payload for e in entries], acks=entries)
+            self.assertEqual(self.redis.round_trips, before + 1)
+            entries = consumer.read()
+
+        shard_symbols = {s for s in self.symbols if shard_for(s, 2) == 0}
+        self.assertEqual(set(service.calculators), shard_symbols)
+        self.assertEqual(sum(s.ticks for s in service.symbol_stats.values()), 30 * len(shard_symbols))
+        self.assertGreater(reads, 1)
+        self.assertEqual(self.redis.pending_count(key[0], 'processing'), 0)
+        self.assertTrue(self.redis.streams[stream_key(SIGNALS_CHANNEL)])
+
+    def test_unacked_entries_are_redelivered(self):
+        """Test a restarted consumer gets its unacknowledged entries first"""
+        key = stream_key('orders')
+        for i in range(5):
+            self.redis.xadd(key, {'data': f'm{i}'})
+
+        first = StreamConsumer(self.redis, [key], group='g', consumer='c', count=3)
+        first.ensure_groups()
+        first.read()  # no pending yet, switches to new entries
+        taken = first.read()
+        self.assertEqual([e.payload for e in taken], ['m0', 'm1', 'm2'])
+
+        restarted = StreamConsumer(self.redis, [key], group='g', consumer='c', count=3)
+        self.assertEqual([e.payload for e in restarted.read()], ['m0', 'm1', 'm2'])
+        restarted.ack(restarted.read())  # pending again until acked
+        restarted.read()
+        self.assertEqual([e.payload for e in restarted.read()], ['m3', 'm4'])
+
+    def test_idle_entries_of_other_consumers_are_claimed(self):
+        """Test entries left pending by a consumer that never came back go to a new one"""
+        key = stream_key('orders')
+        for i in range(5):
+            self.redis.xadd(key, {'data': f'm{i}'})
+
+        gone = StreamConsumer(self.redis, [key], group='g', consumer='old', count=3)
+        gone.ensure_groups()
+        gone.read()
+        self.assertEqual(len(gone.read()), 3)
+
+        self.redis.now_ms += 30000
+        early = StreamConsumer(self.redis, [key], group='g', consumer='early', count=3, claim_idle_ms=60000)
+        early.read()  # too soon to claim, nothing of its own pending
+        self.assertEqual([e.payload for e in early.read()], ['m3', 'm4'])
+
+        self.redis.now_ms += 30000
+        renamed = StreamConsumer(self.redis, [key], group='g', consumer='new', count=3, claim_idle_ms=60000)
+        with self.assertLogs('streams', level='WARNING'):
+            entries = renamed.read()
+        self.assertEqual([e.payload for e in entries], ['m0', 'm1', 'm2'])
+        renamed.ack(entries)
+        self.assertEqual(self.redis.pending_count(key, 'g'), 2)  # early's m3, m4 are not idle yet
+
+    def test_peers_reading_the_same_streams(self):
+        """Test other recently active consumers of the group are reported"""
+        keys = market_data_streams(2)
+        workers = {name: StreamConsumer(self.redis, keys, group='processing', consumer=name, claim_idle_ms=None)
+                   for name in ('w0', 'w1', 'w2')}
+        workers['w0'].ensure_groups()
+        self.assertEqual(workers['w0'].peers(), [])
+
+        workers['w1'].read()
+        self.redis.now_ms += 120000  # w1 has not read for two minutes
+        workers['w2'].read()
+        self.assertEqual(workers['w0'].peers(), ['w2'])
+        self.assertEqual(workers['w2'].peers(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.data_feed_service.csv_feed import CSVDataFeed
+from src.data_feed_service.tick_cache import TickCache
+
+
+class TestTickCache(unittest.TestCase):
+    """Tests for the binary tick cache"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmpdir.name, "cache")
+        self.csv_path = os.path.join(self.tmpdir.name, "IBM.csv")
+        self.write_csv([
+            "2025-08-27,240.00,242.10,239.50,241.00,3100000",
+            "2025-08-28,241.00,246.00,240.80,245.10,2800000",
+            "2025-08-29,245.23,245.46,241.72,243.49,2967558",
+        ])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_csv(self, rows):
+        with open(self.csv_path, 'w') as f:
+            f.write("date,open,high,low,close,volume\n" + "".join(r + "\n" for r in rows))
+
+    def feed(self):
+        return CSVDataFeed(csv_files={"IBM": self.csv_path}, cache_dir=self.cache_dir)
+
+    def test_written_on_first_load_and_mapped_after(self):
+        """Test the first load writes the cache and later loads memory-map it"""
+        first = self.feed().fetch_data()["IBM"]
+        self.assertTrue(os.path.exists(TickCache(self.cache_dir).path_for("IBM")))
+
+        second = self.feed().fetch_data()["IBM"]
+        self.assertIsInstance(second.timestamps.base, np.memmap)
+        self.assertEqual(second.to_ticks(), first.to_ticks())
+        self.assertEqual(second.to_ticks(), CSVDataFeed().read_csv_data("IBM", self.csv_path))
+
+    def test_rebuilt_when_source_changes(self):
+        """Test a changed CSV invalidates the cache"""
+        self.feed().fetch_data()
+        self.write_csv([
+            "2025-08-28,241.00,246.00,240.80,245.10,2800000",
+            "2025-08-29,245.23,245.46,241.72,243.49,2967558",
+        ])
+        # make sure the mtime moves even on coarse filesystem clocks
+        stat = os.stat(self.csv_path)
+        os.utime(self.csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        cache = TickCache(self.cache_dir)
+        self.assertIsNone(cache.load("IBM", self.csv_path))
+        self.assertEqual(len(self.feed().fetch_data()["IBM"]), 2)
+        self.assertIsNotNone(cache.load("IBM", self.csv_path))
+
+    def test_date_range_slice(self):
+        """Test between() slices a date range without copying"""
+        self.feed().fetch_data()
+        columns = self.feed().fetch_data()["IBM"]
+
+        window = columns.between(columns.timestamps[1], None)
+        self.assertEqual(len(window), 2)
+        self.assertTrue(np.shares_memory(window.close_prices, columns.close_prices))
+        self.assertEqual(len(columns.between(None, columns.timestamps[0])), 1)
+
+    def test_corrupt_cache_is_ignored(self):
+        """Test an unreadable cache file falls back to parsing the CSV"""
+        cache = TickCache(self.cache_dir)
+        with open(cache.path_for("IBM"), 'wb') as f:
+            f.write(b"garbage")
+
+        with self.assertLogs('tick_cache', level='WARNING'):
+            self.assertEqual(len(self.feed().fetch_data()["IBM"]), 3)
+
+    def test_truncated_body_is_rebuilt(self):
+        """Test a cache cut short after a valid header is treated as a miss"""
+        self.feed().fetch_data()
+        cache = TickCache(self.cache_dir)
+        path = cache.path_for("IBM")
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - 10)
+
+        with self.assertLogs('tick_cache', level='WARNING'):
+            self.assertIsNone(cache.load("IBM", self.csv_path))
+            self.assertEqual(len(self.feed().fetch_data()["IBM"]), 3)
+        self.assertEqual(len(cache.load("IBM", self.csv_path)), 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from src.data_feed_service.live_feed import AlphaVantageDataFeed
+from src.data_feed_service.watermarks import WatermarkStore
+from tests.fakes import FakeRedis
+
+
+def daily_data(start, days):
+    series = {}
+    for i in range(days):
+        date = (start + timedelta(days=i)).strftime('%Y-%m-%d')
+        series[date] = {"1. open": "10", "2. high": "11", "3. low": "9",
+                        "4. close": str(10 + i), "5. volume": "100"}
+    return {"Time Series (Daily)": series}
+
+
+def ts(date):
+    return int(date.timestamp())
+
+
+class TestWatermarkStore(unittest.TestCase):
+    """Tests for the WatermarkStore class"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "marks", "watermarks.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_marks_only_move_forward(self):
+        """Test older timestamps do not roll a mark back"""
+        store = WatermarkStore(path=self.path)
+        store.advance("IBM", 200)
+        store.advance("IBM", 100)
+        self.assertEqual(store.get("IBM"), 200)
+        self.assertIsNone(store.get("AAPL"))
+
+    def test_persisted_to_file_and_redis(self):
+        """Test marks survive a restart and the later of file/Redis wins"""
+        redis_client = FakeRedis()
+        store = WatermarkStore(path=self.path, redis_client=redis_client)
+        store.advance("IBM", 200)
+        store.advance("MSFT", 50)
+        store.save()
+
+        redis_client.hset('feed_watermarks', mapping={"MSFT": 75})
+        reloaded = WatermarkStore(path=self.path, redis_client=redis_client)
+        self.assertEqual(reloaded.get("IBM"), 200)
+        self.assertEqual(reloaded.get("MSFT"), 75)
+
+
+class TestIncrementalLiveFeed(unittest.TestCase):
+    """Tests for AlphaVantageDataFeed with watermarks"""
+
+    def setUp(self):
+        self.start = datetime(2025, 1, 1)
+        self.store = WatermarkStore()
+        self.feed = AlphaVantageDataFeed(symbols=["IBM"], api_key="test", watermarks=self.store)
+
+    def test_first_run_emits_everything(self):
+        """Test a symbol with no mark gets the whole compact window"""
+        with mock.patch.object(self.feed, 'get_daily_data', return_value=daily_data(self.start, 100)):
+            ticks = self.feed.fetch_data()["IBM"]
+        self.assertEqual(len(ticks), 100)
+
+        self.feed.commit_watermarks({"IBM": ticks})
+        self.assertEqual(self.store.get("IBM"), ticks[-1].timestamp)
+
+    def test_only_new_ticks_after_mark(self):
+        """Test ticks at or before the mark are not emitted again"""
+        self.store.advance("IBM", ts(self.start + timedelta(days=98)))
+        with mock.patch.object(self.feed, 'get_daily_data', return_value=daily_data(self.start, 100)) as get:
+            ticks = self.feed.fetch_data()["IBM"]
+
+        self.assertEqual([t.price for t in ticks], [109.0])
+        get.assert_called_once_with("IBM")
+
+    def test_nothing_new(self):
+        """Test a symbol already up to date produces no ticks"""
+        self.store.advance("IBM", ts(self.start + timedelta(days=99)))
+        with mock.patch.object(self.feed, 'get_daily_data', return_value=daily_data(self.start, 100)):
+            self.assertEqual(self.feed.fetch_data(), {})
+
+    def test_gap_falls_back_to_full(self):
+        """Test a mark older than the compact window triggers a full fetch"""
+        self.store.advance("IBM", ts(self.start + timedelta(days=2)))
+        compact = daily_data(self.start + timedelta(days=50), 100)
+        full = daily_data(self.start, 150)
+
+        def get_daily_data(symbol, outputsize='compact'):
+            return full if outputsize == 'full' else compact
+
+        with mock.patch.object(self.feed, 'get_daily_data', side_effect=get_daily_data) as get:
+            ticks = self.feed.fetch_data()["IBM"]
+
+        self.assertEqual(get.call_count, 2)
+        self.assertEqual(len(ticks), 147)
+        self.assertEqual(ticks[0].timestamp, ts(self.start + timedelta(days=3)))
+
+    def test_failed_backfill_skips_symbol(self):
+        """Test a gap whose full fetch fails is not papered over with the compact window"""
+        mark = ts(self.start + timedelta(days=2))
+        self.store.advance("IBM", mark)
+        compact = daily_data(self.start + timedelta(days=50), 100)
+
+        for full in (None, {"Information": "The full outputsize is a premium feature"}):
+            def get_daily_data(symbol, outputsize='compact'):
+                return full if outputsize == 'full' else compact
+
+            with mock.patch.object(self.feed, 'get_daily_data', side_effect=get_daily_data):
+                with self.assertLogs('live_feed', level='ERROR'):
+                    all_ticks = self.feed.fetch_data()
+
+            self.assertEqual(all_ticks, {})
+            self.feed.commit_watermarks(all_ticks)
+            self.assertEqual(self.store.get("IBM"), mark)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+from src.common.models import Execution, Order, OrderCancel, Signal, Tick
+from src.common.wire import (FORMAT_BINARY, FORMAT_JSON, MAGIC, TICK_RECORD, VERSION, decode_envelope,
+                             decode_message, encode_message, encode_ticks, get_message_format)
+
+
+def make_ticks():
+    return [
+        Tick(symbol="IBM", price=243.49, timestamp=1756440000, open_price=245.23,
+             high_price=245.46, low_price=241.72, volume=2967558),
+        Tick(symbol="AAPL", price=230.1, timestamp=1756440000),
+        Tick(symbol="IBM", price=244.0, timestamp=1756526400, open_price=243.5,
+             high_price=244.5, low_price=242.0, volume=0),
+    ]
+
+
+class TestWireFormat(unittest.TestCase):
+    """Tests for the JSON and binary message encodings"""
+
+    def test_tick_round_trip(self):
+        """Test ticks survive both formats, including missing OHLC fields"""
+        ticks = make_ticks()
+        for fmt in (FORMAT_JSON, FORMAT_BINARY):
+            decoded = [t for payload in encode_ticks(ticks, fmt) for t in decode_message(payload)]
+            self.assertEqual(decoded, ticks, fmt)
+
+    def test_multi_tick_frames(self):
+        """Test binary frames carry many ticks per message"""
+        ticks = make_ticks() * 10
+        frames = list(encode_ticks(ticks, FORMAT_BINARY, frame_size=8))
+        self.assertEqual(len(frames), 4)  # 8 + 8 + 8 + 6
+        self.assertEqual([t for f in frames for t in decode_message(f)], ticks)
+
+        json_messages = list(encode_ticks(ticks, FORMAT_JSON))
+        self.assertEqual(len(json_messages), 30)
+        self.assertLess(sum(map(len, frames)), sum(len(m.encode()) for m in json_messages) / 2)
+
+    def test_json_tick_keeps_date(self):
+        """Test the JSON tick format is unchanged for debugging"""
+        data = json.loads(encode_message(make_ticks()[0], FORMAT_JSON))
+        self.assertEqual(data['type'], 'tick')
+        self.assertIn('date', data)
+
+    def test_signal_order_execution_round_trip(self):
+        """Test signals, orders and executions in both formats"""
+        messages = [
+            Signal(symbol="IBM", signal="BUY", timestamp=1756440000, data={'short_sma': 1.5}),
+            Signal(symbol="IBM", signal="SELL", timestamp=1756440000),
+            Order(symbol="MSFT", side="BUY", quantity=5),
+            Order(symbol="MSFT", side="SELL", quantity=5, order_type="LIMIT", price=412.5),
+            Execution(order_id="abc", symbol="MSFT", side="SELL", quantity=5, price=410.0, pnl=12.5),
+        ]
+        for fmt in (FORMAT_JSON, FORMAT_BINARY):
+            for message in messages:
+                self.assertEqual(decode_message(encode_message(message, fmt)), [message], fmt)
+
+    def test_origin_round_trip(self):
+        """Test origin_ns rides in the envelope and is absent unless given"""
+        messages = [make_ticks()[0], Signal(symbol="IBM", signal="BUY", timestamp=1756440000),
+                    Order(symbol="MSFT", side="BUY", quantity=5), OrderCancel(order_id="abc"),
+                    Execution(order_id="abc", symbol="MSFT", side="SELL", quantity=5, price=410.0)]
+        for fmt in (FORMAT_JSON, FORMAT_BINARY):
+            for message in messages:
+                self.assertEqual(decode_envelope(encode_message(message, fmt, 1234567890123)),
+                                 ([message], 1234567890123), fmt)
+                self.assertEqual(decode_envelope(encode_message(message, fmt)), ([message], None), fmt)
+
+        plain = next(encode_ticks(make_ticks(), FORMAT_BINARY))
+        self.assertEqual(plain[:3], MAGIC + bytes((VERSION,)))
+
+    def test_stamped_tick_frames(self):
+        """Test stamped tick messages decode to the same ticks with an origin"""
+        ticks = make_ticks()
+        for fmt in (FORMAT_JSON, FORMAT_BINARY):
+            decoded = [decode_envelope(p) for p in encode_ticks(ticks, fmt, stamp_origin=True)]
+            self.assertEqual([t for items, _ in decoded for t in items], ticks, fmt)
+            self.assertTrue(all(origin > 0 for _, origin in decoded), fmt)
+
+    def test_truncated_binary_raises_value_error(self):
+        """Test cut-off or corrupt binary messages raise ValueError, not struct.error"""
+        frame = next(encode_ticks(make_ticks(), FORMAT_BINARY))
+        signal = encode_message(Signal(symbol="IBM", signal="BUY", timestamp=1756440000), FORMAT_BINARY)
+        for payload in (frame[:len(frame) - 5], frame[:9], frame[:4], signal[:-3]):
+            with self.assertRaises(ValueError):
+                decode_message(payload)
+
+        corrupt = bytearray(frame)
+        corrupt[10] = 200  # first symbol's length now runs past the end
+        with self.assertRaises(ValueError):
+            decode_message(bytes(corrupt))
+
+    def test_frame_missing_whole_records_raises_value_error(self):
+        """Test a frame cut by exactly one record is rejected, not decoded short"""
+        frame = next(encode_ticks(make_ticks(), FORMAT_BINARY))
+        with self.assertRaises(ValueError):
+            decode_message(frame[:-TICK_RECORD.size])
+
+    def test_json_that_is_not_an_object_raises_value_error(self):
+        """Test valid JSON other than an object is rejected like any undecodable message"""
+        for payload in ('123', '[1]', 'null', '"tick"', b'[]'):
+            with self.assertRaises(ValueError):
+                decode_envelope(payload)
+
+    def test_format_from_config(self):
+        """Test MESSAGE_FORMAT selects the format and rejects unknown values"""
+        with mock.patch.dict(os.environ, {'MESSAGE_FORMAT': 'BINARY'}):
+            self.assertEqual(get_message_format(), FORMAT_BINARY)
+        with mock.patch.dict(os.environ, {'MESSAGE_FORMAT': 'xml'}):
+            with self.assertRaises(ValueError):
+                get_message_format()
+
+if __name__ == "__main__":
+    unittest.main()